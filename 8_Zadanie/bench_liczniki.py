@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark wariantów zliczania z liczniki_wielowatkowe.py.
+
+Przegląda rozmiar danych, N, rozkład wartości (jednostajny / Zipf) i liczbę
+wątków. Każdy pomiar to rozgrzewka i kilka powtórzeń mierzonych
+time.perf_counter (zapisywane są mediana i minimum) oraz osobny przebieg
+z tracemalloc mierzący szczytową pamięć alokowaną w Pythonie (pamięć procesów
+potomnych backendu "procesy" nie jest w niej widoczna).
+
+Dane wejściowe generowane są raz i przechowywane w katalogu tymczasowym.
+
+Przykłady:
+    python3 bench_liczniki.py --zapisz bazowy.json
+    python3 bench_liczniki.py --porownaj bazowy.json --prog 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+from dyspozytor import zlicz
+from fork_join import domyslna_pula
+from liczniki_wielowatkowe import (
+    NUMPY_DOSTEPNY,
+    np,
+    zlicz_dwa_watki,
+    zlicz_procesy,
+    zlicz_rekurencyjnie,
+    zlicz_w_fragmencie,
+    zlicz_wiele_watkow,
+)
+
+KATALOG_DANYCH = os.path.join(tempfile.gettempdir(), "liczniki_bench")
+ROZKLADY = ("jednostajny", "zipf")
+# Wykładnik rozkładu Zipfa: P(k) ~ 1 / (k + 1) ** WYKLADNIK_ZIPFA
+WYKLADNIK_ZIPFA = 1.1
+ZIARNO = 42
+
+
+# ===== DANE WEJŚCIOWE =====
+
+
+def generuj_dane(rozmiar: int, N: int, rozklad: str) -> array:
+    """Losuje `rozmiar` liczb 0..N-1 (array('I')) o zadanym rozkładzie"""
+    if NUMPY_DOSTEPNY:
+        generator = np.random.default_rng(ZIARNO)
+        if rozklad == "zipf":
+            wagi = 1.0 / np.arange(1, N + 1) ** WYKLADNIK_ZIPFA
+            wartosci = generator.choice(N, size=rozmiar, p=wagi / wagi.sum())
+        else:
+            wartosci = generator.integers(0, N, size=rozmiar)
+        return array("I", wartosci.astype(np.uint32).tobytes())
+
+    losowe = random.Random(ZIARNO)
+    if rozklad == "zipf":
+        wagi = [1.0 / (k + 1) ** WYKLADNIK_ZIPFA for k in range(N)]
+        return array("I", losowe.choices(range(N), weights=wagi, k=rozmiar))
+    return array("I", losowe.choices(range(N), k=rozmiar))
+
+
+def wczytaj_dane(rozmiar: int, N: int, rozklad: str) -> array:
+    """Dane z pliku w KATALOG_DANYCH; generowane przy pierwszym użyciu"""
+    os.makedirs(KATALOG_DANYCH, exist_ok=True)
+    sciezka = os.path.join(KATALOG_DANYCH, f"{rozklad}_{rozmiar}_{N}_{ZIARNO}.bin")
+    dane = array("I")
+    if os.path.exists(sciezka):
+        with open(sciezka, "rb") as plik:
+            dane.fromfile(plik, rozmiar)
+        return dane
+
+    dane = generuj_dane(rozmiar, N, rozklad)
+    with open(sciezka + ".tmp", "wb") as plik:
+        dane.tofile(plik)
+    os.replace(sciezka + ".tmp", sciezka)
+    return dane
+
+
+# ===== WARIANTY =====
+
+
+def _jako_lista(dane: array):
+    return dane.tolist()
+
+
+def _jako_tablica_numpy(dane: array):
+    return np.frombuffer(dane, dtype=np.uint32).astype(np.intp)
+
+
+# nazwa: (przygotowanie danych - poza pomiarem, wywołanie, stała liczba wątków
+# albo None - przegląd liczby wątków)
+BACKENDY = {
+    "dwa_watki": (_jako_lista, lambda d, N, w: zlicz_dwa_watki(d, N), 2),
+    "wiele_watkow": (
+        _jako_lista,
+        lambda d, N, w: zlicz_wiele_watkow(d, N, w, tryb="gesty"),
+        None,
+    ),
+    "rekurencyjnie": (_jako_lista, lambda d, N, w: zlicz_rekurencyjnie(d, N, w), None),
+    "fork_join": (
+        _jako_lista,
+        lambda d, N, w: zlicz_rekurencyjnie(d, N, w, pula=domyslna_pula()),
+        None,
+    ),
+    "rzadki": (
+        _jako_lista,
+        lambda d, N, w: zlicz_wiele_watkow(d, N, w, tryb="rzadki"),
+        None,
+    ),
+    "bufor": (lambda d: d, lambda d, N, w: zlicz_wiele_watkow(d, N, w), None),
+    "procesy": (_jako_lista, lambda d, N, w: zlicz_procesy(d, N, w), None),
+    # Wątki i procesy wybiera dyspozytor (wątki=0 w wynikach)
+    "auto": (_jako_lista, lambda d, N, w: zlicz(d, N), 0),
+}
+if NUMPY_DOSTEPNY:
+    BACKENDY["numpy"] = (
+        _jako_tablica_numpy,
+        lambda d, N, w: zlicz_wiele_watkow(d, N, w),
+        None,
+    )
+
+
+# ===== POMIARY =====
+
+
+def zmierz(funkcja, powtorzenia: int, rozgrzewka: int):
+    """
+    Mierzy czas wywołania funkcja() po `rozgrzewka` niemierzonych przebiegach.
+
+    Returns:
+        Krotka (lista czasów w sekundach, szczytowa pamięć w bajtach, wynik)
+
+    Raises:
+        ValueError: gdy powtorzenia < 1 (mediana pustej listy czasów)
+    """
+    if powtorzenia < 1:
+        raise ValueError("Liczba powtórzeń musi być >= 1")
+
+    for _ in range(rozgrzewka):
+        funkcja()
+
+    czasy = []
+    for _ in range(powtorzenia):
+        start = time.perf_counter()
+        wynik = funkcja()
+        czasy.append(time.perf_counter() - start)
+
+    # Osobny przebieg - tracemalloc spowalnia alokacje
+    tracemalloc.start()
+    try:
+        funkcja()
+        _, szczyt = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return czasy, szczyt, wynik
+
+
+def bench(
+    rozmiary, wartosci_N, rozklady, liczby_watkow, backendy, powtorzenia, rozgrzewka
+):
+    """
+    Przegląd wszystkich kombinacji parametrów.
+
+    Returns:
+        Lista wierszy wyników (słowniki)
+    """
+    wiersze = []
+    for rozmiar in rozmiary:
+        for N in wartosci_N:
+            for rozklad in rozklady:
+                dane = wczytaj_dane(rozmiar, N, rozklad)
+                oczekiwane = zlicz_w_fragmencie(dane, 0, len(dane), N)
+
+                for nazwa in backendy:
+                    przygotuj, uruchom, stale_watki = BACKENDY[nazwa]
+                    przygotowane = przygotuj(dane)
+                    for watki in (
+                        liczby_watkow if stale_watki is None else [stale_watki]
+                    ):
+                        czasy, pamiec, wynik = zmierz(
+                            lambda: uruchom(przygotowane, N, watki),
+                            powtorzenia,
+                            rozgrzewka,
+                        )
+                        wiersz = {
+                            "backend": nazwa,
+                            "rozmiar": rozmiar,
+                            "N": N,
+                            "rozklad": rozklad,
+                            "watki": watki,
+                            "mediana": statistics.median(czasy),
+                            "min": min(czasy),
+                            "pamiec": pamiec,
+                            "poprawne": list(wynik) == list(oczekiwane),
+                        }
+                        wiersze.append(wiersz)
+                        wypisz_wiersz(wiersz)
+    return wiersze
+
+
+def wypisz_wiersz(wiersz):
+    print(
+        f"{wiersz['backend']:14s} n={wiersz['rozmiar']:<10,} N={wiersz['N']:<8} "
+        f"{wiersz['rozklad']:11s} wątki={wiersz['watki']:<3} "
+        f"mediana {wiersz['mediana']:.4f}s  min {wiersz['min']:.4f}s  "
+        f"pamięć {wiersz['pamiec'] / 2**20:8.1f} MB"
+        + ("" if wiersz["poprawne"] else "  BŁĘDNY WYNIK")
+    )
+
+
+def srodowisko():
+    """Opis maszyny zapisywany razem z wynikami"""
+    return {
+        "python": platform.python_version(),
+        "platforma": platform.platform(),
+        "procesory": os.cpu_count(),
+        "numpy": np.__version__ if NUMPY_DOSTEPNY else None,
+    }
+
+
+def klucz(wiersz):
+    return (
+        wiersz["backend"],
+        wiersz["rozmiar"],
+        wiersz["N"],
+        wiersz["rozklad"],
+        wiersz["watki"],
+    )
+
+
+def porownaj(wiersze, bazowe, prog: float) -> bool:
+    """
+    Porównuje mediany z wynikami bazowymi.
+
+    Returns:
+        True, jeśli żaden wariant nie jest wolniejszy o więcej niż `prog`
+        (np. 0.1 = 10%) i wszystkie wyniki są poprawne
+    """
+    poprzednie = {klucz(wiersz): wiersz for wiersz in bazowe["wyniki"]}
+    w_porzadku = True
+
+    print(f"\n=== Porównanie z wynikami bazowymi (próg {prog:.0%}) ===")
+    for wiersz in wiersze:
+        if not wiersz["poprawne"]:
+            w_porzadku = False
+        bazowy = poprzednie.get(klucz(wiersz))
+        if bazowy is None:
+            continue
+        stosunek = wiersz["mediana"] / bazowy["mediana"]
+        regresja = stosunek > 1 + prog
+        w_porzadku = w_porzadku and not regresja
+        print(
+            f"{wiersz['backend']:14s} n={wiersz['rozmiar']:<10,} N={wiersz['N']:<8} "
+            f"{wiersz['rozklad']:11s} wątki={wiersz['watki']:<3} "
+            f"{bazowy['mediana']:.4f}s -> {wiersz['mediana']:.4f}s "
+            f"({stosunek:.2f}x)" + ("  REGRESJA" if regresja else "")
+        )
+    return w_porzadku
+
+
+def liczba_dodatnia(tekst: str) -> int:
+    """Typ argumentu argparse: liczba całkowita >= 1"""
+    liczba = int(tekst)
+    if liczba < 1:
+        raise argparse.ArgumentTypeError(f"musi być >= 1 (podano {liczba})")
+    return liczba
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark wariantów zliczania")
+    parser.add_argument(
+        "--rozmiary", type=int, nargs="+", default=[1_000_000], help="długości danych"
+    )
+    parser.add_argument("--N", type=int, nargs="+", default=[20, 10_000])
+    parser.add_argument("--rozklady", nargs="+", choices=ROZKLADY, default=ROZKLADY)
+    parser.add_argument("--watki", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--backendy", nargs="+", choices=list(BACKENDY), default=list(BACKENDY)
+    )
+    parser.add_argument("--powtorzenia", type=liczba_dodatnia, default=5)
+    parser.add_argument("--rozgrzewka", type=int, default=1)
+    parser.add_argument("--zapisz", help="zapisz wyniki jako plik bazowy JSON")
+    parser.add_argument("--porownaj", help="plik bazowy JSON do porównania")
+    parser.add_argument(
+        "--prog",
+        type=float,
+        default=0.10,
+        help="dopuszczalne spowolnienie (0.1 = 10%%)",
+    )
+    args = parser.parse_args(argv)
+
+    wiersze = bench(
+        args.rozmiary,
+        args.N,
+        args.rozklady,
+        args.watki,
+        args.backendy,
+        args.powtorzenia,
+        args.rozgrzewka,
+    )
+
+    if args.zapisz:
+        with open(args.zapisz, "w") as plik:
+            json.dump({"srodowisko": srodowisko(), "wyniki": wiersze}, plik, indent=2)
+            plik.write("\n")
+
+    if args.porownaj:
+        with open(args.porownaj) as plik:
+            bazowe = json.load(plik)
+        if bazowe.get("srodowisko") != srodowisko():
+            print("Uwaga: wyniki bazowe pochodzą z innego środowiska")
+        if not porownaj(wiersze, bazowe, args.prog):
+            sys.exit(1)
+    elif not all(wiersz["poprawne"] for wiersz in wiersze):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
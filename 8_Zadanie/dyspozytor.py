@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Automatyczny wybór wariantu zliczania: zlicz(dane, N).
+
+Dla danych wejściowych szacowany jest czas każdej strategii - sekwencyjnie,
+wątki puli fork/join, procesy z pamięcią współdzieloną; liczniki gęste lub
+rzadkie - i wykonywana jest najtańsza. Model kosztów używa stałych
+zmierzonych jednorazowym mikrobenchmarkiem (kalibruj), zapisywanych w pliku
+PLIK_KALIBRACJI dla danej maszyny.
+
+Uzasadnienie wyboru trafia do logu (logging, poziom DEBUG):
+    logging.basicConfig(level=logging.DEBUG)
+    zlicz(dane, N)
+"""
+
+import json
+import logging
+import math
+import os
+import platform
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+from fork_join import domyslna_pula
+from liczniki_wielowatkowe import (
+    MIN_GESTY,
+    NUMPY_DOSTEPNY,
+    czy_numpy,
+    granice_fragmentu,
+    jako_tablica,
+    jako_widok,
+    jako_wynik,
+    kod_typu,
+    np,
+    polacz_liczniki,
+    polacz_liczniki_rzadkie,
+    szacuj_liczbe_wartosci,
+    wytnij,
+    zlicz_procesy,
+    zlicz_w_fragmencie,
+    zlicz_w_fragmencie_rzadko,
+    zlicz_wiele_watkow,
+)
+
+log = logging.getLogger(__name__)
+
+PLIK_KALIBRACJI = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "liczniki_wielowatkowe",
+    "kalibracja.json",
+)
+# Rozmiar danych, na których mierzone są koszty jednostkowe
+ROZMIAR_KALIBRACJI = 1 << 16
+STRATEGIE = ("sekwencyjnie", "watki", "procesy")
+
+
+class Plan(NamedTuple):
+    """Wybrana (lub rozważana) strategia i jej szacowany koszt"""
+
+    strategia: str
+    tryb: str
+    workers: int
+    fragment: int
+    koszt: float
+
+    def __str__(self) -> str:
+        return (
+            f"{self.strategia:12s} {self.tryb:6s} workers={self.workers:<3} "
+            f"fragment={self.fragment:<10} ~{self.koszt * 1e3:.3f} ms"
+        )
+
+
+# ===== KALIBRACJA =====
+
+
+def maszyna() -> Dict[str, Union[str, int, None]]:
+    """Opis maszyny - kalibracja z innej maszyny jest pomijana"""
+    return {
+        "host": platform.node(),
+        "architektura": platform.machine(),
+        "procesory": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__ if NUMPY_DOSTEPNY else None,
+    }
+
+
+def _czas(funkcja: Callable, powtorzenia: int = 3) -> float:
+    """Najkrótszy z kilku czasów wykonania funkcja()"""
+    czasy = []
+    for _ in range(powtorzenia):
+        start = time.perf_counter()
+        funkcja()
+        czasy.append(time.perf_counter() - start)
+    return min(czasy)
+
+
+def _dane_kalibracji(rodzaj: str, rozmiar: int):
+    lista = [(i * 7919) % 64 for i in range(rozmiar)]
+    if rodzaj == "numpy":
+        return jako_tablica(lista)
+    if rodzaj == "bufor":
+        return memoryview(array("I", lista))
+    return lista
+
+
+def kalibruj() -> Dict[str, float]:
+    """
+    Mierzy stałe modelu kosztów (czasy w sekundach):
+
+    - element_<rodzaj> / rzadki_<rodzaj>: zliczenie jednego elementu danych
+      (lista, numpy, bufor) w licznikach gęstych / rzadkich
+    - licznik_<rodzaj>: utworzenie i dodanie jednego licznika przy łączeniu
+    - para: scalenie jednej pary (wartość, liczba) w trybie rzadkim
+    - zadanie: zlecenie fragmentu puli fork/join i odebranie wyniku
+    - przyspieszenie_<rodzaj>: przyspieszenie zliczania na wszystkich
+      procesorach (bez narzutów; GIL ogranicza je dla list)
+    - proces / kopia: uruchomienie procesu roboczego i skopiowanie jednego
+      elementu do pamięci współdzielonej
+    """
+    n = ROZMIAR_KALIBRACJI
+    procesory = os.cpu_count() or 1
+    rodzaje = ["lista", "bufor"] + (["numpy"] if NUMPY_DOSTEPNY else [])
+    pula = domyslna_pula()
+    stale: Dict[str, float] = {}
+
+    for rodzaj in rodzaje:
+        dane = _dane_kalibracji(rodzaj, n)
+        stale[f"element_{rodzaj}"] = (
+            _czas(lambda: zlicz_w_fragmencie(dane, 0, n, 64)) / n
+        )
+        stale[f"rzadki_{rodzaj}"] = (
+            _czas(lambda: zlicz_w_fragmencie_rzadko(dane, 0, n)) / n
+        )
+
+        liczniki = [zlicz_w_fragmencie(dane, 0, 1, n) for _ in range(2)]
+        stale[f"licznik_{rodzaj}"] = _czas(lambda: polacz_liczniki(liczniki)) / n
+
+        przyspieszenie = 1.0
+        if procesory > 1:
+            duze = _dane_kalibracji(rodzaj, 4 * n)
+            sekwencyjnie = _czas(lambda: zlicz_w_fragmencie(duze, 0, 4 * n, 64))
+            rownolegle = _czas(
+                lambda: [
+                    zadanie.wynik()
+                    for zadanie in [
+                        pula.zlec(
+                            zlicz_w_fragmencie,
+                            *wytnij(duze, *granice_fragmentu(i, 4 * n, procesory)),
+                            64,
+                        )
+                        for i in range(procesory)
+                    ]
+                ]
+            )
+            przyspieszenie = min(procesory, max(1.0, sekwencyjnie / rownolegle))
+        stale[f"przyspieszenie_{rodzaj}"] = przyspieszenie
+
+    serie = [[(i, 1) for i in range(0, n, 2)], [(i, 1) for i in range(1, n, 2)]]
+    stale["para"] = _czas(lambda: polacz_liczniki_rzadkie(serie, n)) / n
+    stale["zadanie"] = _czas(lambda: pula.zlec(int).wynik(), 20)
+
+    if procesory > 1:
+        male = list(range(64))
+        stale["proces"] = _czas(lambda: zlicz_procesy(male, 64, 1), 2)
+        lista = _dane_kalibracji("lista", n)
+        stale["kopia"] = _czas(lambda: array(kod_typu(64), lista)) / n
+    return stale
+
+
+_kalibracja: Optional[Dict[str, float]] = None
+_lock_kalibracji = threading.Lock()
+
+
+def wczytaj_kalibracje(
+    plik: Optional[str] = PLIK_KALIBRACJI, odswiez: bool = False
+) -> Dict[str, float]:
+    """
+    Stałe modelu kosztów: z pamięci, z pliku (jeśli zapisano je na tej
+    samej maszynie) albo z nowego pomiaru, który jest zapisywany do pliku.
+
+    Args:
+        plik: Ścieżka pliku kalibracji (None - bez zapisu na dysk)
+        odswiez: Wykonaj pomiar ponownie, ignorując zapisane wyniki
+    """
+    global _kalibracja
+    with _lock_kalibracji:
+        if _kalibracja is not None and not odswiez:
+            return _kalibracja
+
+        if plik is not None and not odswiez:
+            try:
+                with open(plik) as otwarty:
+                    zapisane = json.load(otwarty)
+                if zapisane.get("maszyna") == maszyna():
+                    _kalibracja = zapisane["stale"]
+                    log.debug("Kalibracja wczytana z %s", plik)
+                    return _kalibracja
+            except (OSError, ValueError, KeyError):
+                pass
+
+        start = time.perf_counter()
+        _kalibracja = kalibruj()
+        log.debug("Kalibracja zmierzona w %.3f s", time.perf_counter() - start)
+
+        if plik is not None:
+            try:
+                os.makedirs(os.path.dirname(plik), exist_ok=True)
+                with open(plik + ".tmp", "w") as otwarty:
+                    json.dump({"maszyna": maszyna(), "stale": _kalibracja}, otwarty)
+                os.replace(plik + ".tmp", plik)
+            except OSError as blad:
+                log.debug("Nie zapisano kalibracji: %s", blad)
+        return _kalibracja
+
+
+# ===== MODEL KOSZTÓW =====
+
+
+def rodzaj_danych(dane) -> str:
+    """Rodzaj danych po jako_widok: "numpy", "bufor" lub "lista" """
+    if czy_numpy(dane):
+        return "numpy"
+    if isinstance(dane, (memoryview, bytes, bytearray)):
+        return "bufor"
+    return "lista"
+
+
+def zaplanuj(dane, N: int, stale: Optional[Dict[str, float]] = None) -> List[Plan]:
+    """
+    Szacuje koszt każdej strategii dla danych.
+
+    Koszt wątków to narzut zleceń, zliczanie podzielone przez zmierzone
+    przyspieszenie (dla w wątków interpolowane liniowo między 1 a wartością
+    dla wszystkich procesorów) oraz łączenie w liczników. Procesy dodają
+    uruchomienie procesów i kopię danych do pamięci współdzielonej, ale
+    zliczają w pełni równolegle. Tryb rzadki rozważany jest tylko wtedy, gdy
+    gęste liczniki byłyby duże względem danych.
+
+    Returns:
+        Plany posortowane od najtańszego
+    """
+    if stale is None:
+        stale = wczytaj_kalibracje()
+    dane = jako_widok(dane)
+    dlugosc = len(dane)
+    rodzaj = rodzaj_danych(dane)
+    procesory = os.cpu_count() or 1
+
+    element = stale[f"element_{rodzaj}"]
+    licznik = stale[f"licznik_{rodzaj}"]
+    przyspieszenie = stale[f"przyspieszenie_{rodzaj}"]
+
+    def przyspieszenie_dla(workers):
+        if procesory == 1:
+            return 1.0
+        return 1 + (przyspieszenie - 1) * (workers - 1) / (procesory - 1)
+
+    tryby = ["gesty"]
+    if procesory * N > max(dlugosc, MIN_GESTY):
+        tryby.append("rzadki")
+        rozne = szacuj_liczbe_wartosci(dane, N)
+
+    plany = []
+    for tryb in tryby:
+        if tryb == "gesty":
+            zliczanie, laczenie = dlugosc * element, N * licznik
+        else:
+            zliczanie = dlugosc * stale[f"rzadki_{rodzaj}"]
+            laczenie = rozne * stale["para"]
+
+        plany.append(Plan("sekwencyjnie", tryb, 1, dlugosc, zliczanie + laczenie))
+        for workers in range(2, min(procesory, dlugosc) + 1):
+            koszt = (
+                workers * stale["zadanie"]
+                + zliczanie / przyspieszenie_dla(workers)
+                + workers * laczenie
+            )
+            fragment = math.ceil(dlugosc / workers)
+            plany.append(Plan("watki", tryb, workers, fragment, koszt))
+
+    if "proces" in stale:
+        for workers in range(2, min(procesory, dlugosc) + 1):
+            koszt = (
+                workers * stale["proces"]
+                + dlugosc * stale["kopia"]
+                + dlugosc * stale["element_bufor"] / workers
+                + workers * N * licznik
+            )
+            fragment = math.ceil(dlugosc / workers)
+            plany.append(Plan("procesy", "gesty", workers, fragment, koszt))
+
+    return sorted(plany, key=lambda plan: plan.koszt)
+
+
+def zlicz(
+    dane, N: int, jako_slownik: bool = False, plan: Optional[Plan] = None
+) -> Union[List[int], Dict[int, int]]:
+    """
+    Zlicza wystąpienia liczb 0..N-1 najtańszą według modelu strategią.
+
+    Args:
+        dane: Lista, tablica NumPy lub obiekt z protokołem bufora
+        N: Maksymalna wartość liczb + 1
+        jako_slownik: Zwróć słownik {wartość: liczba} zamiast listy N liczników
+        plan: Wymuszony plan (domyślnie najtańszy z zaplanuj)
+
+    Returns:
+        Lista liczników licz[i] = ilość wystąpień liczby i (np.ndarray dla
+        danych NumPy w trybie gęstym)
+    """
+    dane = jako_widok(dane)
+    if plan is None:
+        plany = zaplanuj(dane, N)
+        plan = plany[0]
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "zlicz: %d elementów (%s), N=%d, procesory=%s; plany od najtańszego:"
+                "\n  %s",
+                len(dane),
+                rodzaj_danych(dane),
+                N,
+                os.cpu_count(),
+                "\n  ".join(str(p) for p in plany),
+            )
+
+    if plan.strategia == "watki":
+        return zlicz_wiele_watkow(
+            dane,
+            N,
+            plan.workers,
+            tryb=plan.tryb,
+            jako_slownik=jako_slownik,
+            pula=domyslna_pula(),
+        )
+    if plan.strategia == "procesy":
+        return jako_wynik(zlicz_procesy(dane, N, plan.workers), N, jako_slownik)
+    if plan.strategia not in STRATEGIE:
+        raise ValueError(f"Nieznana strategia: {plan.strategia}")
+
+    if plan.tryb == "rzadki":
+        pary = zlicz_w_fragmencie_rzadko(dane, 0, len(dane))
+        return jako_wynik(polacz_liczniki_rzadkie([pary], N), N, jako_slownik)
+    return jako_wynik(
+        zlicz_w_fragmencie(*wytnij(dane, 0, len(dane)), N), N, jako_slownik
+    )
+
+
+if __name__ == "__main__":
+    import random
+
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+    for rozmiar, N in ((100, 10), (1_000_000, 20), (200_000, 10**8)):
+        L = [random.randint(0, min(N, 1000) - 1) for _ in range(rozmiar)]
+        assert list(jako_wynik(zlicz(L, N), N, False)) == list(
+            zlicz_w_fragmencie(L, 0, len(L), N)
+        )
+        if NUMPY_DOSTEPNY:
+            zlicz(jako_tablica(L), N)
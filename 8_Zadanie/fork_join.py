@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Trwała pula wątków fork/join z podkradaniem zadań (work stealing).
+
+Każdy wątek ma własną kolejkę dwustronną (deque). Zadania zlecone z wnętrza
+zadania trafiają na koniec kolejki bieżącego wątku, który zdejmuje je z tego
+samego końca (LIFO - najświeższe, najmniejsze podzadania). Bezczynny wątek
+podkrada zadania z początku kolejek innych wątków (FIFO - najstarsze,
+największe fragmenty). Wątek czekający na wynik podzadania nie blokuje się,
+tylko w tym czasie wykonuje inne zadania z kolejek.
+
+deque.append/pop/popleft są atomowe, więc kolejki nie wymagają locka;
+semafor liczy zadania oczekujące we wszystkich kolejkach.
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+# Jak długo (s) wątek czekający na podzadanie śpi przed ponownym szukaniem pracy
+CZAS_CZUWANIA = 0.0005
+
+
+class Zadanie:
+    """Wynik zadania zleconego w puli"""
+
+    def __init__(self, funkcja: Callable, args: tuple):
+        self.funkcja = funkcja
+        self.args = args
+        self._gotowe = threading.Event()
+        self._wynik = None
+        self._blad: Optional[BaseException] = None
+
+    def wykonaj(self) -> None:
+        try:
+            self._wynik = self.funkcja(*self.args)
+        except BaseException as blad:
+            self._blad = blad
+        finally:
+            self._gotowe.set()
+
+    def gotowe(self) -> bool:
+        return self._gotowe.is_set()
+
+    def wynik(self):
+        """
+        Czeka na wynik zadania. Wywołane w wątku puli wykonuje w tym czasie
+        inne zadania, więc zagnieżdżone fork/join nie blokują puli.
+        """
+        pula = getattr(_lokalne, "pula", None)
+        if pula is not None:
+            pula._pomagaj_do(self)
+        else:
+            self._gotowe.wait()
+
+        if self._blad is not None:
+            raise self._blad
+        return self._wynik
+
+
+_lokalne = threading.local()
+
+
+class PulaForkJoin:
+    """
+    Pula wątków tworzona raz i używana przez wiele wywołań.
+
+    Przykład:
+        pula = PulaForkJoin(4)
+        zadanie = pula.zlec(funkcja, argument)
+        wynik = zadanie.wynik()
+    """
+
+    def __init__(self, liczba_watkow: Optional[int] = None):
+        self.liczba_watkow = liczba_watkow or os.cpu_count() or 1
+        self._kolejki = [deque() for _ in range(self.liczba_watkow)]
+        # Zadania zlecone spoza puli
+        self._zewnetrzna = deque()
+        self._oczekujace = threading.Semaphore(0)
+        self._koniec = False
+        self.podkradzione = 0
+
+        self._watki = [
+            threading.Thread(target=self._praca, args=(i,), daemon=True)
+            for i in range(self.liczba_watkow)
+        ]
+        for watek in self._watki:
+            watek.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.zamknij()
+
+    def zlec(self, funkcja: Callable, *args) -> Zadanie:
+        """Zleca wykonanie funkcja(*args) i zwraca obiekt Zadanie"""
+        zadanie = Zadanie(funkcja, args)
+        if getattr(_lokalne, "pula", None) is self:
+            self._kolejki[_lokalne.indeks].append(zadanie)
+        elif self._koniec:
+            raise RuntimeError("Pula jest zamknięta")
+        else:
+            self._zewnetrzna.append(zadanie)
+        self._oczekujace.release()
+        return zadanie
+
+    def zamknij(self) -> None:
+        """Kończy wątki puli (po wykonaniu zleconych zadań)"""
+        if self._koniec:
+            return
+        self._koniec = True
+        for _ in self._watki:
+            self._oczekujace.release()
+        for watek in self._watki:
+            watek.join()
+
+    def _wez(self, indeks: int) -> Optional[Zadanie]:
+        """Zadanie z własnej kolejki, kolejki zewnętrznej lub podkradzione"""
+        try:
+            return self._kolejki[indeks].pop()
+        except IndexError:
+            pass
+        try:
+            return self._zewnetrzna.popleft()
+        except IndexError:
+            pass
+        for przesuniecie in range(1, self.liczba_watkow):
+            ofiara = self._kolejki[(indeks + przesuniecie) % self.liczba_watkow]
+            try:
+                zadanie = ofiara.popleft()
+            except IndexError:
+                continue
+            self.podkradzione += 1
+            return zadanie
+        return None
+
+    def _wez_zarezerwowane(self, indeks: int) -> Zadanie:
+        """
+        Po udanym acquire() co najmniej jedno zadanie w kolejkach należy do
+        tego wątku (zadanie jest dodawane przed release()), może jednak zostać
+        chwilowo przesunięte przez innych - wtedy szukamy ponownie.
+        """
+        while True:
+            zadanie = self._wez(indeks)
+            if zadanie is not None:
+                return zadanie
+
+    def _praca(self, indeks: int) -> None:
+        _lokalne.pula = self
+        _lokalne.indeks = indeks
+        while True:
+            self._oczekujace.acquire()
+            if self._koniec and not self._zewnetrzna and not any(self._kolejki):
+                return
+            self._wez_zarezerwowane(indeks).wykonaj()
+
+    def _pomagaj_do(self, oczekiwane: Zadanie) -> None:
+        """Wykonuje inne zadania, dopóki oczekiwane nie jest gotowe"""
+        indeks = _lokalne.indeks
+        while not oczekiwane.gotowe():
+            if self._oczekujace.acquire(blocking=False):
+                self._wez_zarezerwowane(indeks).wykonaj()
+            else:
+                oczekiwane._gotowe.wait(CZAS_CZUWANIA)
+
+
+_domyslna_pula: Optional[PulaForkJoin] = None
+_lock_puli = threading.Lock()
+
+
+def domyslna_pula() -> PulaForkJoin:
+    """Wspólna pula procesu (os.cpu_count() wątków), tworzona przy pierwszym użyciu"""
+    global _domyslna_pula
+    with _lock_puli:
+        if _domyslna_pula is None:
+            _domyslna_pula = PulaForkJoin()
+        return _domyslna_pula
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Przyrostowy histogram liczb 0..N-1 z oknem przesuwnym.
+
+Liczniki mają ten sam format co w liczniki_wielowatkowe.py (lista N
+liczników). Każda partia zdarzeń jest zliczana raz do posortowanych par
+(wartość, liczba), które są dodawane do liczników, a w oknie przesuwnym
+zapamiętywane - wygasła partia jest odejmowana bez ponownego zliczania.
+Aktualizacja kosztuje O(partia + zmienione liczniki), a nie O(okno).
+
+HistogramWspolbiezny zbiera zdarzenia z wielu wątków bez locka: każdy wątek
+zapisuje do własnej tablicy liczników, łączonych dopiero przy snapshot().
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from liczniki_wielowatkowe import polacz_liczniki, zlicz_w_fragmencie_rzadko
+
+
+class Migawka:
+    """Niezmienny widok liczników histogramu z chwili wywołania snapshot()"""
+
+    def __init__(self, liczniki: List[int], suma: int):
+        self._liczniki = liczniki
+        self.suma = suma
+
+    def __getitem__(self, indeks):
+        return self._liczniki[indeks]
+
+    def __len__(self) -> int:
+        return len(self._liczniki)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._liczniki)
+
+    def __eq__(self, inny) -> bool:
+        return list(self) == list(inny)
+
+    def tolist(self) -> List[int]:
+        return list(self._liczniki)
+
+    def __repr__(self) -> str:
+        return f"Migawka({self._liczniki})"
+
+
+class Histogram:
+    """
+    Histogram aktualizowany partiami, opcjonalnie z oknem przesuwnym.
+
+    Okno obejmuje najwyżej `maks_partii` ostatnich partii i/lub partie
+    nie starsze niż `maks_wiek` sekund (liczone od czasu partii).
+
+    Przykład:
+        h = Histogram(N=20, maks_partii=100)
+        h.add_batch(zdarzenia)
+        m = h.snapshot()
+    """
+
+    def __init__(
+        self,
+        N: int,
+        maks_partii: Optional[int] = None,
+        maks_wiek: Optional[float] = None,
+        zegar=time.monotonic,
+    ):
+        self.N = N
+        self.maks_partii = maks_partii
+        self.maks_wiek = maks_wiek
+        self.zegar = zegar
+        self.suma = 0
+        self._liczniki = [0] * N
+        # Czy lista liczników jest współdzielona z migawką (kopiowanie przy zapisie)
+        self._wspoldzielone = False
+        # Partie w oknie: [czas, posortowane pary (wartość, liczba), aktywna];
+        # partia usunięta przez remove_batch zostaje w kolejce jako nieaktywna
+        # i jest pomijana, gdy dotrze do początku okna
+        self._partie: deque = deque()
+        self._aktywne = 0
+        # Krotka par -> aktywne wpisy _partie z tymi parami (od najstarszego),
+        # aby remove_batch znajdował partię bez przeglądania okna
+        self._wpisy: Dict[Tuple[Tuple[int, int], ...], deque] = {}
+
+    @property
+    def okno(self) -> bool:
+        return self.maks_partii is not None or self.maks_wiek is not None
+
+    def __getitem__(self, indeks):
+        return self._liczniki[indeks]
+
+    def __len__(self) -> int:
+        return self.N
+
+    def _do_zapisu(self) -> List[int]:
+        """Liczniki do modyfikacji - kopiowane, jeśli współdzieli je migawka"""
+        if self._wspoldzielone:
+            self._liczniki = list(self._liczniki)
+            self._wspoldzielone = False
+        return self._liczniki
+
+    def _zlicz(self, dane: Sequence[int]) -> List[Tuple[int, int]]:
+        pary = zlicz_w_fragmencie_rzadko(dane, 0, len(dane))
+        if pary and (pary[0][0] < 0 or pary[-1][0] >= self.N):
+            raise IndexError(f"Wartości spoza zakresu 0..{self.N - 1}")
+        return pary
+
+    def _dodaj(self, pary: List[Tuple[int, int]], znak: int) -> None:
+        liczniki = self._do_zapisu()
+        for wartosc, liczba in pary:
+            liczniki[wartosc] += znak * liczba
+            self.suma += znak * liczba
+
+    def add_batch(self, dane: Sequence[int], czas: Optional[float] = None) -> None:
+        """
+        Dodaje partię zdarzeń (lista, tablica NumPy...).
+
+        Args:
+            dane: Liczby 0..N-1
+            czas: Czas partii dla okna czasowego (domyślnie bieżący)
+        """
+        self._dodaj_pary(self._zlicz(dane), czas)
+
+    def _dodaj_pary(self, pary: List[Tuple[int, int]], czas: Optional[float]):
+        self._dodaj(pary, 1)
+        if self.okno:
+            wpis = [self.zegar() if czas is None else czas, pary, True]
+            self._partie.append(wpis)
+            self._wpisy.setdefault(tuple(pary), deque()).append(wpis)
+            self._aktywne += 1
+            self.wygas(czas)
+
+    def remove_batch(self, dane: Sequence[int]) -> None:
+        """
+        Odejmuje partię zdarzeń dodaną wcześniej.
+
+        W histogramie z oknem partia (te same zdarzenia) jest też usuwana
+        z okna - najnowsza pasująca - aby nie została odjęta ponownie przy
+        wygaśnięciu. Wpis znajdowany jest w słowniku po parach, więc koszt
+        to O(partia + zmienione liczniki), niezależnie od długości okna.
+
+        Raises:
+            ValueError: gdy licznik którejś wartości spadłby poniżej zera
+                lub (w oknie) takiej partii nie ma w oknie
+        """
+        pary = self._zlicz(dane)
+        if self.okno:
+            klucz = tuple(pary)
+            wpisy = self._wpisy.get(klucz)
+            if not wpisy:
+                raise ValueError("Partii nie ma w oknie")
+            wpisy.pop()[2] = False
+            if not wpisy:
+                del self._wpisy[klucz]
+            self._aktywne -= 1
+            # Nieaktywne wpisy usuwane są hurtem, gdy stanowią większość
+            # kolejki - koszt zamortyzowany O(1) na usuniętą partię
+            if 2 * self._aktywne < len(self._partie):
+                self._partie = deque(wpis for wpis in self._partie if wpis[2])
+        else:
+            for wartosc, liczba in pary:
+                if self._liczniki[wartosc] < liczba:
+                    raise ValueError(f"Wartość {wartosc} nie wystąpiła {liczba} razy")
+        self._dodaj(pary, -1)
+
+    def merge(self, inny: "Histogram") -> None:
+        """
+        Dodaje liczniki innego histogramu (np. z innego wątku).
+
+        W histogramie z oknem dołączone liczniki są jedną partią okna.
+        """
+        if inny.N != self.N:
+            raise ValueError(f"Różne N: {self.N} i {inny.N}")
+        pary = [(i, liczba) for i, liczba in enumerate(inny._liczniki) if liczba]
+        self._dodaj_pary(pary, None)
+
+    def wygas(self, teraz: Optional[float] = None) -> int:
+        """
+        Odejmuje partie, które wypadły z okna.
+
+        Returns:
+            Liczba usuniętych partii
+        """
+        if not self.okno:
+            return 0
+        if teraz is None:
+            teraz = self.zegar()
+
+        usuniete = 0
+        while self._partie:
+            czas, pary, aktywna = self._partie[0]
+            if aktywna and not (
+                (self.maks_partii is not None and self._aktywne > self.maks_partii)
+                or (self.maks_wiek is not None and czas < teraz - self.maks_wiek)
+            ):
+                break
+            self._partie.popleft()
+            if not aktywna:
+                continue
+            # Najstarsza aktywna partia jest też najstarsza wśród swoich par
+            klucz = tuple(pary)
+            wpisy = self._wpisy[klucz]
+            wpisy.popleft()
+            if not wpisy:
+                del self._wpisy[klucz]
+            self._aktywne -= 1
+            self._dodaj(pary, -1)
+            usuniete += 1
+        return usuniete
+
+    def snapshot(self) -> Migawka:
+        """
+        Migawka liczników w O(1): lista jest współdzielona, a histogram
+        kopiuje ją dopiero przy następnej zmianie.
+        """
+        self._wspoldzielone = True
+        return Migawka(self._liczniki, self.suma)
+
+
+class HistogramWspolbiezny:
+    """
+    Histogram zasilany jednocześnie przez wiele wątków.
+
+    Każdy wątek przy pierwszym zapisie dostaje własną tablicę N liczników
+    (threading.local), którą modyfikuje tylko on - record() nie bierze
+    żadnego locka, a rejestracja tablicy to atomowe list.append.
+    snapshot() kopiuje tablice wątków (kopia listy jest atomowa przy GIL,
+    więc obejmuje pełne zapisy) i łączy je przez polacz_liczniki.
+
+    Przykład:
+        h = HistogramWspolbiezny(N=20)
+        h.record(3)              # z dowolnego wątku
+        m = h.snapshot()
+    """
+
+    def __init__(self, N: int):
+        self.N = N
+        self._lokalne = threading.local()
+        self._shardy: List[List[int]] = []
+
+    def _shard(self) -> List[int]:
+        """Tablica liczników bieżącego wątku (tworzona przy pierwszym zapisie)"""
+        try:
+            return self._lokalne.shard
+        except AttributeError:
+            shard = [0] * self.N
+            self._lokalne.shard = shard
+            self._shardy.append(shard)
+            return shard
+
+    def record(self, wartosc: int) -> None:
+        """Zapisuje jedno zdarzenie (liczba 0..N-1)"""
+        if wartosc < 0:
+            raise IndexError(f"Wartości spoza zakresu 0..{self.N - 1}")
+        try:
+            shard = self._lokalne.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[wartosc] += 1
+
+    def record_batch(self, dane: Sequence[int]) -> None:
+        """Zapisuje partię zdarzeń (lista, tablica NumPy...)"""
+        pary = zlicz_w_fragmencie_rzadko(dane, 0, len(dane))
+        if pary and (pary[0][0] < 0 or pary[-1][0] >= self.N):
+            raise IndexError(f"Wartości spoza zakresu 0..{self.N - 1}")
+        shard = self._shard()
+        for wartosc, liczba in pary:
+            shard[wartosc] += liczba
+
+    def snapshot(self, liczba_watkow: int = 1) -> Migawka:
+        """
+        Łączy liczniki wszystkich wątków (także zakończonych).
+
+        Args:
+            liczba_watkow: Liczba wątków łączących (patrz polacz_liczniki)
+        """
+        kopie = [list(shard) for shard in list(self._shardy)]
+        if not kopie:
+            return Migawka([0] * self.N, 0)
+        liczniki = polacz_liczniki(kopie, liczba_watkow)
+        return Migawka(liczniki, sum(liczniki))
+
+
+class HistogramZLockiem:
+    """Punkt odniesienia dla bench_rywalizacji: jedna lista liczników i lock"""
+
+    def __init__(self, N: int):
+        self.N = N
+        self._liczniki = [0] * N
+        self._lock = threading.Lock()
+
+    def record(self, wartosc: int) -> None:
+        if wartosc < 0:
+            raise IndexError(f"Wartości spoza zakresu 0..{self.N - 1}")
+        with self._lock:
+            self._liczniki[wartosc] += 1
+
+    def snapshot(self) -> Migawka:
+        with self._lock:
+            liczniki = list(self._liczniki)
+        return Migawka(liczniki, sum(liczniki))
+
+
+def bench_rywalizacji(
+    liczby_watkow: Sequence[int] = (1, 2, 4, 8),
+    zdarzen_na_watek: int = 100_000,
+    N: int = 1000,
+) -> List[Dict]:
+    """
+    Porównuje HistogramWspolbiezny z HistogramZLockiem: wątki jednocześnie
+    (bariera) zapisują po `zdarzen_na_watek` zdarzeń, a wynik snapshot()
+    porównywany jest z licznikami wygenerowanych danych.
+
+    Returns:
+        Wiersze {"watki", "histogram", "czas", "zdarzen_na_s", "poprawne"}
+    """
+    wiersze = []
+    for liczba_watkow in liczby_watkow:
+        dane = [
+            [random.randrange(N) for _ in range(zdarzen_na_watek)]
+            for _ in range(liczba_watkow)
+        ]
+        oczekiwane = [0] * N
+        for porcja in dane:
+            for wartosc in porcja:
+                oczekiwane[wartosc] += 1
+
+        for klasa in (HistogramZLockiem, HistogramWspolbiezny):
+            histogram = klasa(N)
+            bariera = threading.Barrier(liczba_watkow + 1)
+
+            def producent(porcja):
+                record = histogram.record
+                bariera.wait()
+                for wartosc in porcja:
+                    record(wartosc)
+
+            watki = [
+                threading.Thread(target=producent, args=(porcja,)) for porcja in dane
+            ]
+            for watek in watki:
+                watek.start()
+            bariera.wait()
+            start = time.perf_counter()
+            for watek in watki:
+                watek.join()
+            czas = time.perf_counter() - start
+
+            wiersze.append(
+                {
+                    "watki": liczba_watkow,
+                    "histogram": klasa.__name__,
+                    "czas": czas,
+                    "zdarzen_na_s": liczba_watkow * zdarzen_na_watek / czas,
+                    "poprawne": histogram.snapshot().tolist() == oczekiwane,
+                }
+            )
+    return wiersze
+
+
+if __name__ == "__main__":
+    for wiersz in bench_rywalizacji():
+        print(
+            f"{wiersz['histogram']:21s} wątki={wiersz['watki']:<3} "
+            f"{wiersz['czas']:.4f}s  {wiersz['zdarzen_na_s']:>12,.0f} zdarzeń/s  "
+            f"(poprawne: {wiersz['poprawne']})"
+        )
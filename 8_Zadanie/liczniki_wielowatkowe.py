@@ -3,11 +3,113 @@
 Program implementuje dwa podejścia:
 1. Wersja podstawowa: 2 wątki
 2. Wersja rozszerzona: konfigurowalna liczba wątków
+
+Jeśli dostępne jest NumPy, dane w postaci np.ndarray zliczane są przez
+np.bincount (zwalnia GIL, więc wątki pracują równolegle), a liczniki
+łączone są wektorowo.
+
+Poza listami przyjmowany jest każdy obiekt z protokołem bufora (array.array,
+memoryview, bytes, mmap, tablice NumPy) - wątki dostają wtedy widoki
+memoryview swoich fragmentów, a dane nie są kopiowane.
 """
 
+import heapq
 import threading
 import time
-from typing import List, Optional
+import traceback
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from fork_join import PulaForkJoin
+
+try:
+    import numpy as np
+except ImportError:  # NumPy jest opcjonalne
+    np = None
+
+NUMPY_DOSTEPNY = np is not None
+
+
+def czy_numpy(dane) -> bool:
+    """Czy dane są tablicą NumPy (obsługiwaną przez szybką ścieżkę)"""
+    return NUMPY_DOSTEPNY and isinstance(dane, np.ndarray)
+
+
+def jako_tablica(lista: List[int]):
+    """
+    Jednorazowa konwersja listy na tablicę NumPy dla szybkiej ścieżki.
+
+    Typ np.intp jest natywnym typem indeksów np.bincount, więc fragmenty
+    tablicy nie są już później konwertowane.
+    """
+    if not NUMPY_DOSTEPNY:
+        raise RuntimeError("Konwersja wymaga NumPy")
+    return np.asarray(lista, dtype=np.intp)
+
+
+# Bez NumPy do tylu wartości bytes.count (osobny przebieg w C dla każdej
+# wartości) jest szybsze od zliczania w Counter
+PROG_ZLICZANIA_BAJTOW = 64
+
+
+def jako_widok(dane):
+    """
+    Dane wejściowe w postaci gotowej do dzielenia na fragmenty bez kopiowania.
+
+    Listy, bytes/bytearray i tablice NumPy pozostają bez zmian, inne obiekty
+    z protokołem bufora (array.array, mmap...) zamieniane są na
+    jednowymiarowy memoryview.
+    """
+    if isinstance(dane, (list, bytes, bytearray)) or czy_numpy(dane):
+        return dane
+    try:
+        widok = memoryview(dane)
+    except TypeError:
+        # Inna sekwencja (tuple, range...) - indeksowana jak lista
+        return dane
+    if widok.format == "c":
+        widok = widok.cast("B")
+    if widok.ndim != 1:
+        widok = widok.cast("B").cast(widok.format)
+    return widok
+
+
+def wytnij(dane, start: int, end: int):
+    """
+    Argumenty (dane, start, end) dla zlicz_w_fragmencie przekazywane wątkowi.
+
+    Dla memoryview i tablic NumPy wątek dostaje widok swojego fragmentu
+    (bez kopiowania), listy i bytes - zakres indeksów (bytes.count
+    przyjmuje zakres, a wycinek listy byłby kopią).
+    """
+    if isinstance(dane, memoryview) or czy_numpy(dane):
+        return dane[start:end], 0, end - start
+    return dane, start, end
+
+
+def _zlicz_bajty(dane, start: int, end: int, N: int) -> List[int]:
+    """Szybka ścieżka dla bytes/bytearray: bytes.count dla każdej wartości"""
+    liczniki = [dane.count(bytes((wartosc,)), start, end) for wartosc in range(N)]
+    if sum(liczniki) != max(0, min(end, len(dane)) - start):
+        raise IndexError(f"Wartości spoza zakresu 0..{N - 1}")
+    return liczniki
+
+
+def _zlicz_widok(widok: memoryview, N: int) -> List[int]:
+    """Zlicza memoryview bez kopiowania (np.bincount lub Counter w C)"""
+    if NUMPY_DOSTEPNY:
+        tablica = np.frombuffer(widok, dtype=widok.format)
+        return zlicz_w_fragmencie_numpy(tablica, 0, len(tablica), N).tolist()
+
+    liczniki = [0] * N
+    for wartosc, liczba in Counter(widok).items():
+        if wartosc < 0:
+            raise IndexError(f"Wartości spoza zakresu 0..{N - 1}")
+        liczniki[wartosc] = liczba
+    return liczniki
 
 
 def zlicz_w_fragmencie(lista: List[int], start: int, end: int, N: int) -> List[int]:
@@ -15,36 +117,96 @@ def zlicz_w_fragmencie(lista: List[int], start: int, end: int, N: int) -> List[i
     Zlicza wystąpienia liczb w fragmencie listy [start:end].
 
     Args:
-        lista: Lista wejściowa z liczbami
+        lista: Lista wejściowa z liczbami (lub obiekt z protokołem bufora)
         start: Indeks początkowy fragmentu
         end: Indeks końcowy fragmentu (exclusive)
         N: Maksymalna wartość liczb + 1 (rozmiar tablicy liczników)
 
     Returns:
-        Lista liczników dla danego fragmentu
+        Lista liczników dla danego fragmentu (np.ndarray dla danych NumPy)
     """
+    if czy_numpy(lista):
+        return zlicz_w_fragmencie_numpy(lista, start, end, N)
+    if isinstance(lista, (bytes, bytearray)):
+        if N <= PROG_ZLICZANIA_BAJTOW and not NUMPY_DOSTEPNY:
+            return _zlicz_bajty(lista, start, end, N)
+        return _zlicz_widok(memoryview(lista)[start:end], N)
+    if isinstance(lista, memoryview):
+        return _zlicz_widok(lista[start:end], N)
+
     liczniki = [0] * N
     for i in range(start, end):
         liczniki[lista[i]] += 1
     return liczniki
 
 
-def polacz_liczniki(liczniki_list: List[Optional[List[int]]]) -> List[int]:
+def zlicz_w_fragmencie_numpy(tablica, start: int, end: int, N: int):
+    """
+    Zlicza wystąpienia liczb we fragmencie tablicy NumPy przez np.bincount.
+
+    Fragment tablica[start:end] jest widokiem - dane wejściowe nie są kopiowane.
+
+    Returns:
+        np.ndarray (int64) długości N
+    """
+    liczniki = np.bincount(tablica[start:end], minlength=N)
+    if len(liczniki) > N:
+        raise IndexError(f"Wartości spoza zakresu 0..{N - 1}")
+    return liczniki
+
+
+METODY_LACZENIA = ("kolumny", "drzewo")
+# Poniżej tylu sumowanych komórek (N * liczba liczników) wątki się nie opłacają
+PROG_LACZENIA_ROWNOLEGLEGO = 1 << 16
+
+
+def polacz_liczniki(
+    liczniki_list: List[Optional[List[int]]],
+    liczba_watkow: int = 1,
+    metoda: str = "kolumny",
+) -> List[int]:
     """
     Łączy listę liczników w jedną wynikową listę.
 
     Args:
         liczniki_list: Lista list liczników do połączenia
+        liczba_watkow: Liczba wątków łączących (1 = sekwencyjnie)
+        metoda: "kolumny" - każdy wątek sumuje swój przedział [a, b) indeksów
+            we wszystkich licznikach; "drzewo" - liczniki łączone parami,
+            poziom po poziomie (log2 liczby liczników poziomów)
 
     Returns:
-        Połączona lista liczników
+        Połączona lista liczników (np.ndarray, jeśli któryś licznik nim jest)
     """
+    if metoda not in METODY_LACZENIA:
+        raise ValueError(f"Nieznana metoda łączenia: {metoda}")
+
     # Filtruj None
     liczniki_niepuste = [l for l in liczniki_list if l is not None]
 
     if not liczniki_niepuste:
         return []
 
+    N = len(liczniki_niepuste[0])
+    if (
+        liczba_watkow > 1
+        and len(liczniki_niepuste) > 1
+        and N * len(liczniki_niepuste) >= PROG_LACZENIA_ROWNOLEGLEGO
+    ):
+        if metoda == "drzewo":
+            return _polacz_drzewem(liczniki_niepuste, liczba_watkow)
+        return _polacz_kolumnami(liczniki_niepuste, liczba_watkow)
+
+    return _polacz_sekwencyjnie(liczniki_niepuste)
+
+
+def _polacz_sekwencyjnie(liczniki_niepuste):
+    """Sumuje liczniki w bieżącym wątku"""
+    if any(czy_numpy(l) for l in liczniki_niepuste):
+        return np.add.reduce(
+            [np.asarray(l) for l in liczniki_niepuste], axis=0, dtype=np.int64
+        )
+
     N = len(liczniki_niepuste[0])
     wynik = [0] * N
 
@@ -55,10 +217,282 @@ def polacz_liczniki(liczniki_list: List[Optional[List[int]]]) -> List[int]:
     return wynik
 
 
+def _polacz_kolumnami(liczniki_niepuste, liczba_watkow: int):
+    """
+    Redukcja podzielona na kolumny: wątek `i` sumuje indeksy z i-tego
+    przedziału we wszystkich licznikach i zapisuje je w swojej części wyniku.
+    """
+    N = len(liczniki_niepuste[0])
+    liczba_watkow = min(liczba_watkow, N)
+    tablice = None
+    if any(czy_numpy(l) for l in liczniki_niepuste):
+        tablice = [np.asarray(l) for l in liczniki_niepuste]
+        wynik = np.empty(N, dtype=np.int64)
+    else:
+        wynik = [0] * N
+
+    def sumuj_kolumny(indeks):
+        a, b = granice_fragmentu(indeks, N, liczba_watkow)
+        if tablice is not None:
+            np.add.reduce(
+                [t[a:b] for t in tablice], axis=0, dtype=np.int64, out=wynik[a:b]
+            )
+        else:
+            wynik[a:b] = map(sum, zip(*(l[a:b] for l in liczniki_niepuste)))
+
+    watki = [
+        threading.Thread(target=sumuj_kolumny, args=(i,)) for i in range(liczba_watkow)
+    ]
+    for watek in watki:
+        watek.start()
+    for watek in watki:
+        watek.join()
+
+    return wynik
+
+
+def _polacz_drzewem(liczniki_niepuste, liczba_watkow: int):
+    """Redukcja drzewiasta: na każdym poziomie pary liczników łączone są równolegle"""
+    poziom = liczniki_niepuste
+    with ThreadPoolExecutor(max_workers=liczba_watkow) as pula:
+        while len(poziom) > 1:
+            pary = [poziom[i : i + 2] for i in range(0, len(poziom), 2)]
+            poziom = list(pula.map(_polacz_sekwencyjnie, pary))
+    return poziom[0]
+
+
+def granice_fragmentu(indeks: int, dlugosc: int, liczba_fragmentow: int):
+    """
+    Zakres [start, end) fragmentu o danym indeksie przy podziale na równe
+    fragmenty; pierwsze `dlugosc % liczba_fragmentow` fragmentów jest o 1 dłuższe.
+    """
+    rozmiar_fragmentu = dlugosc // liczba_fragmentow
+    reszta = dlugosc % liczba_fragmentow
+
+    start = indeks * rozmiar_fragmentu + min(indeks, reszta)
+    if indeks < reszta:
+        return start, start + rozmiar_fragmentu + 1
+    return start, start + rozmiar_fragmentu
+
+
+# ===== PRÓG PODZIAŁU (GRANULARNOŚĆ) =====
+
+# Minimalny rozmiar fragmentu przekazywanego osobnemu wątkowi / zadaniu;
+# puste pola są dostrajane pomiarem przy pierwszym użyciu (osobno dla list
+# i tablic NumPy). Można je ustawić ręcznie.
+MIN_FRAGMENTU: Dict[bool, Optional[int]] = {False: None, True: None}
+# Zliczanie fragmentu ma trwać tyle razy dłużej niż utworzenie wątku
+KROTNOSC_NARZUTU = 50
+
+
+def prog_podzialu(lista) -> int:
+    """
+    Minimalny rozmiar fragmentu, poniżej którego nie opłaca się dzielić pracy.
+
+    Mierzy czas zliczania jednego elementu oraz koszt uruchomienia
+    i zakończenia wątku; fragment ma być KROTNOSC_NARZUTU razy droższy.
+    """
+    numpy = czy_numpy(lista)
+    if MIN_FRAGMENTU[numpy] is None:
+        rozmiar = 1 << 16
+        probka = jako_tablica([0] * rozmiar) if numpy else [0] * rozmiar
+        start = time.perf_counter()
+        zlicz_w_fragmencie(probka, 0, rozmiar, 1)
+        koszt_elementu = (time.perf_counter() - start) / rozmiar
+
+        start = time.perf_counter()
+        for _ in range(10):
+            watek = threading.Thread(target=int)
+            watek.start()
+            watek.join()
+        narzut = (time.perf_counter() - start) / 10
+
+        MIN_FRAGMENTU[numpy] = max(
+            1024, int(KROTNOSC_NARZUTU * narzut / max(koszt_elementu, 1e-10))
+        )
+    return MIN_FRAGMENTU[numpy]
+
+
+# ===== TRYB RZADKI (DUŻE N, MAŁO RÓŻNYCH WARTOŚCI) =====
+
+TRYBY = ("auto", "gesty", "rzadki")
+# Gęste liczniki są zawsze w porządku, jeśli wątki * N nie przekracza tej liczby
+MIN_GESTY = 1 << 16
+# Liczba pierwszych elementów, na których szacowana jest liczba różnych wartości
+ROZMIAR_PROBKI = 4096
+
+
+def zlicz_w_fragmencie_rzadko(lista, start: int, end: int) -> List[Tuple[int, int]]:
+    """
+    Zlicza fragment [start:end] w słowniku (Counter) zamiast tablicy N liczników.
+
+    Returns:
+        Posortowana po wartości lista par (wartość, liczba wystąpień)
+    """
+    if czy_numpy(lista):
+        wartosci, liczby = np.unique(lista[start:end], return_counts=True)
+        return list(zip(wartosci.tolist(), liczby.tolist()))
+    if isinstance(lista, (bytes, bytearray, memoryview)):
+        return sorted(Counter(memoryview(lista)[start:end]).items())
+    return sorted(Counter(map(lista.__getitem__, range(start, end))).items())
+
+
+def polacz_liczniki_rzadkie(
+    serie_list: List[Optional[List[Tuple[int, int]]]], N: int
+) -> List[Tuple[int, int]]:
+    """
+    Łączy posortowane serie (wartość, liczba) scalaniem k-drogowym (heapq.merge).
+
+    Koszt zależy od liczby par w seriach, a nie od N.
+    """
+    wynik: List[Tuple[int, int]] = []
+    for wartosc, liczba in heapq.merge(*[s for s in serie_list if s is not None]):
+        if wynik and wynik[-1][0] == wartosc:
+            wynik[-1] = (wartosc, wynik[-1][1] + liczba)
+        else:
+            wynik.append((wartosc, liczba))
+
+    if wynik and (wynik[0][0] < 0 or wynik[-1][0] >= N):
+        raise IndexError(f"Wartości spoza zakresu 0..{N - 1}")
+    return wynik
+
+
+def szacuj_liczbe_wartosci(lista, N: int) -> int:
+    """
+    Szacuje liczbę różnych wartości na próbce z początku danych: jeśli
+    w próbce wartości się powtarzają, zbiór wartości jest mały.
+    """
+    dlugosc = len(lista)
+    probka = min(dlugosc, ROZMIAR_PROBKI)
+    if czy_numpy(lista):
+        rozne = len(np.unique(lista[:probka]))
+    else:
+        rozne = len(set(map(lista.__getitem__, range(probka))))
+    return rozne if 2 * rozne <= probka else min(dlugosc, N)
+
+
+def wybierz_tryb(lista, N: int, liczba_watkow: int) -> str:
+    """
+    Wybiera liczniki gęste lub rzadkie.
+
+    Gęste kosztują liczba_watkow * N pamięci i tyle samo pracy przy łączeniu,
+    rzadkie - pracę proporcjonalną do liczby różnych wartości we fragmencie
+    (szacowanej przez szacuj_liczbe_wartosci).
+    """
+    if liczba_watkow * N <= max(len(lista), MIN_GESTY):
+        return "gesty"
+    return "rzadki" if 4 * szacuj_liczbe_wartosci(lista, N) < N else "gesty"
+
+
+def jako_wynik(
+    liczniki, N: int, jako_slownik: bool
+) -> Union[List[int], Dict[int, int]]:
+    """
+    Zamienia liczniki (gęste lub serie rzadkie) na format żądany przez
+    wywołującego: gęstą listę N liczników albo słownik {wartość: liczba}
+    z samymi niezerowymi licznikami.
+    """
+    rzadkie = isinstance(liczniki, list) and (
+        not liczniki or isinstance(liczniki[0], tuple)
+    )
+    if jako_slownik:
+        if rzadkie:
+            return dict(liczniki)
+        return {i: int(c) for i, c in enumerate(liczniki) if c}
+    if not rzadkie:
+        return liczniki
+
+    geste = [0] * N
+    for wartosc, liczba in liczniki:
+        geste[wartosc] = liczba
+    return geste
+
+
+def zapisz_pomiar(
+    pomiar: Optional[Dict[str, float]], czas_startu: float, czas_laczenia: float
+) -> None:
+    """Zapisuje czas zliczania (do czas_laczenia) i łączenia (do teraz)"""
+    if pomiar is not None:
+        pomiar["zliczanie"] = czas_laczenia - czas_startu
+        pomiar["laczenie"] = time.perf_counter() - czas_laczenia
+
+
+def zlicz_fragmentami(
+    lista,
+    liczba_watkow: int,
+    zlicz_fragment: Callable,
+    pula: Optional[PulaForkJoin] = None,
+) -> List:
+    """
+    Dzieli dane na liczba_watkow równych fragmentów i każdy przetwarza
+    w osobnym wątku (lub zadaniu puli): zlicz_fragment(*wytnij(lista, start, end)).
+
+    Args:
+        lista: Dane po jako_widok
+        liczba_watkow: Liczba fragmentów (1..len(lista))
+        zlicz_fragment: Funkcja (dane, start, end) -> wynik fragmentu
+        pula: Trwała pula fork/join zamiast nowych wątków
+
+    Returns:
+        Lista wyników kolejnych fragmentów
+    """
+    dlugosc = len(lista)
+    # Lista do przechowania wyników z każdego wątku
+    wyniki: List = [None] * liczba_watkow
+    watki = []
+    # Wyjątki wątków (np. IndexError dla wartości spoza zakresu) - zgłaszane
+    # po join(), aby brakujący wynik fragmentu nie został pominięty po cichu
+    bledy = []
+
+    def utworz_funkcje_watku(indeks_watku):
+        """Tworzy funkcję dla konkretnego wątku z jego zakresem danych"""
+        # Oblicz zakres dla tego wątku
+        start, end = granice_fragmentu(indeks_watku, dlugosc, liczba_watkow)
+
+        def funkcja_watku():
+            wyniki[indeks_watku] = zlicz_fragment(*wytnij(lista, start, end))
+
+        return funkcja_watku
+
+    def funkcja_watku_z_bledami(funkcja_watku):
+        try:
+            funkcja_watku()
+        except Exception as blad:
+            bledy.append(blad)
+
+    if pula is not None:
+        # Fragmenty jako zadania trwałej puli
+        zadania = [pula.zlec(utworz_funkcje_watku(i)) for i in range(liczba_watkow)]
+        for zadanie in zadania:
+            zadanie.wynik()
+    else:
+        # Tworzenie i uruchamianie wątków
+        for i in range(liczba_watkow):
+            watek = threading.Thread(
+                target=funkcja_watku_z_bledami, args=(utworz_funkcje_watku(i),)
+            )
+            watki.append(watek)
+            watek.start()
+
+        # Czekanie na zakończenie wszystkich wątków
+        for watek in watki:
+            watek.join()
+
+        if bledy:
+            raise bledy[0]
+
+    return wyniki
+
+
 # ===== WERSJA 1: DWA WĄTKI (5 PUNKTÓW) =====
 
 
-def zlicz_dwa_watki(lista: List[int], N: int) -> List[int]:
+def zlicz_dwa_watki(
+    lista: List[int],
+    N: int,
+    metoda_laczenia: str = "kolumny",
+    pomiar: Optional[Dict[str, float]] = None,
+) -> List[int]:
     """
     Tworzy listę liczników używając dwóch wątków.
     Każdy wątek przetwarza połowę listy.
@@ -66,23 +500,35 @@ def zlicz_dwa_watki(lista: List[int], N: int) -> List[int]:
     Args:
         lista: Lista wejściowa z liczbami 0..N-1
         N: Maksymalna wartość liczb + 1
+        metoda_laczenia: Metoda równoległego łączenia (patrz polacz_liczniki)
+        pomiar: Słownik, w którym zapisywane są czasy "zliczanie" i "laczenie"
 
     Returns:
         Lista liczników licz[i] = ilość wystąpień liczby i
     """
+    czas_startu = time.perf_counter()
+    lista = jako_widok(lista)
     dlugosc = len(lista)
     polowa = dlugosc // 2
 
     # Listy do przechowania wyników z każdego wątku
     wyniki: List[Optional[List[int]]] = [None, None]
+    # Wyjątki wątków - zgłaszane po join()
+    bledy = []
 
     def watek_1():
         """Przetwarza pierwszą połowę listy"""
-        wyniki[0] = zlicz_w_fragmencie(lista, 0, polowa, N)
+        try:
+            wyniki[0] = zlicz_w_fragmencie(*wytnij(lista, 0, polowa), N)
+        except Exception as blad:
+            bledy.append(blad)
 
     def watek_2():
         """Przetwarza drugą połowę listy"""
-        wyniki[1] = zlicz_w_fragmencie(lista, polowa, dlugosc, N)
+        try:
+            wyniki[1] = zlicz_w_fragmencie(*wytnij(lista, polowa, dlugosc), N)
+        except Exception as blad:
+            bledy.append(blad)
 
     # Tworzenie i uruchamianie wątków
     t1 = threading.Thread(target=watek_1)
@@ -95,14 +541,29 @@ def zlicz_dwa_watki(lista: List[int], N: int) -> List[int]:
     t1.join()
     t2.join()
 
+    if bledy:
+        raise bledy[0]
+
     # Łączenie wyników z obu wątków
-    return polacz_liczniki(wyniki)
+    czas_laczenia = time.perf_counter()
+    wynik = polacz_liczniki(wyniki, 2, metoda_laczenia)
+    zapisz_pomiar(pomiar, czas_startu, czas_laczenia)
+    return wynik
 
 
 # ===== WERSJA 2: WIELE WĄTKÓW (10 PUNKTÓW) =====
 
 
-def zlicz_wiele_watkow(lista: List[int], N: int, liczba_watkow: int) -> List[int]:
+def zlicz_wiele_watkow(
+    lista: List[int],
+    N: int,
+    liczba_watkow: int,
+    tryb: str = "auto",
+    jako_slownik: bool = False,
+    metoda_laczenia: str = "kolumny",
+    pomiar: Optional[Dict[str, float]] = None,
+    pula: Optional[PulaForkJoin] = None,
+) -> Union[List[int], Dict[int, int]]:
     """
     Tworzy listę liczników używając zadanej liczby wątków.
     Lista jest dzielona na równe fragmenty (z uwzględnieniem reszty).
@@ -111,63 +572,69 @@ def zlicz_wiele_watkow(lista: List[int], N: int, liczba_watkow: int) -> List[int
         lista: Lista wejściowa z liczbami 0..N-1
         N: Maksymalna wartość liczb + 1
         liczba_watkow: Liczba wątków do użycia
+        tryb: "gesty" (tablice N liczników), "rzadki" (słowniki i scalanie
+            serii) lub "auto" (wybór według N i szacowanej liczby wartości)
+        jako_slownik: Zwróć słownik {wartość: liczba} zamiast listy N liczników
+        metoda_laczenia: Metoda równoległego łączenia (patrz polacz_liczniki)
+        pomiar: Słownik, w którym zapisywane są czasy "zliczanie" i "laczenie"
+        pula: Trwała pula fork/join - fragmenty zlecane są jej wątkom
+            zamiast tworzenia nowych
 
     Returns:
         Lista liczników licz[i] = ilość wystąpień liczby i
     """
+    czas_startu = time.perf_counter()
     if liczba_watkow < 1:
         raise ValueError("Liczba wątków musi być >= 1")
+    if tryb not in TRYBY:
+        raise ValueError(f"Nieznany tryb: {tryb}")
 
+    lista = jako_widok(lista)
     dlugosc = len(lista)
 
     # Jeśli lista jest krótsza niż liczba wątków, użyj mniej wątków
     liczba_watkow = min(liczba_watkow, dlugosc)
 
-    if liczba_watkow == 0:
-        return [0] * N
-
-    # Oblicz rozmiar fragmentu dla każdego wątku
-    rozmiar_fragmentu = dlugosc // liczba_watkow
-    reszta = dlugosc % liczba_watkow
+    if tryb == "auto":
+        tryb = wybierz_tryb(lista, N, max(liczba_watkow, 1))
 
-    # Lista do przechowania wyników z każdego wątku
-    wyniki: List[Optional[List[int]]] = [None] * liczba_watkow
-    watki = []
-
-    def utworz_funkcje_watku(indeks_watku):
-        """Tworzy funkcję dla konkretnego wątku z jego zakresem danych"""
-        # Oblicz zakres dla tego wątku
-        start = indeks_watku * rozmiar_fragmentu + min(indeks_watku, reszta)
-
-        if indeks_watku < reszta:
-            end = start + rozmiar_fragmentu + 1
-        else:
-            end = start + rozmiar_fragmentu
+    if liczba_watkow == 0:
+        if tryb == "rzadki":
+            return jako_wynik([], N, jako_slownik)
+        return jako_wynik(zlicz_w_fragmencie(lista, 0, 0, N), N, jako_slownik)
 
-        def funkcja_watku():
-            wyniki[indeks_watku] = zlicz_w_fragmencie(lista, start, end, N)
+    if tryb == "rzadki":
+        zlicz_fragment = zlicz_w_fragmencie_rzadko
+    else:
 
-        return funkcja_watku
+        def zlicz_fragment(fragment, start, end):
+            return zlicz_w_fragmencie(fragment, start, end, N)
 
-    # Tworzenie i uruchamianie wątków
-    for i in range(liczba_watkow):
-        watek = threading.Thread(target=utworz_funkcje_watku(i))
-        watki.append(watek)
-        watek.start()
-
-    # Czekanie na zakończenie wszystkich wątków
-    for watek in watki:
-        watek.join()
+    wyniki = zlicz_fragmentami(lista, liczba_watkow, zlicz_fragment, pula)
 
     # Łączenie wyników ze wszystkich wątków
-    return polacz_liczniki(wyniki)
+    czas_laczenia = time.perf_counter()
+    if tryb == "rzadki":
+        wynik = polacz_liczniki_rzadkie(wyniki, N)
+    else:
+        wynik = polacz_liczniki(wyniki, liczba_watkow, metoda_laczenia)
+    zapisz_pomiar(pomiar, czas_startu, czas_laczenia)
+    return jako_wynik(wynik, N, jako_slownik)
 
 
 # ===== WERSJA 3: REKURENCYJNA Z WIELOMA WĄTKAMI (BONUS) =====
 
 
 def zlicz_rekurencyjnie(
-    lista: List[int], N: int, max_watkow: int, start: int = 0, end: Optional[int] = None
+    lista: List[int],
+    N: int,
+    max_watkow: int,
+    start: int = 0,
+    end: Optional[int] = None,
+    metoda_laczenia: str = "kolumny",
+    pomiar: Optional[Dict[str, float]] = None,
+    pula: Optional[PulaForkJoin] = None,
+    min_fragmentu: Optional[int] = None,
 ) -> List[int]:
     """
     Rekurencyjna wersja zliczania z podziałem na wątki.
@@ -175,36 +642,82 @@ def zlicz_rekurencyjnie(
     Rekurencyjnie dzieli listę na pół, aż osiągnie minimalny rozmiar fragmentu
     lub wyczerpie dostępne wątki.
 
+    Z pulą fork/join prawa połowa zlecana jest jako zadanie puli, a lewa
+    liczona w bieżącym wątku; o podziale decyduje wtedy tylko min_fragmentu
+    (max_watkow jest pomijane - równoległość wyznacza rozmiar puli).
+
     Args:
         lista: Lista wejściowa z liczbami 0..N-1
         N: Maksymalna wartość liczb + 1
         max_watkow: Maksymalna liczba wątków do użycia w tym wywołaniu
         start: Indeks początkowy fragmentu
         end: Indeks końcowy fragmentu (exclusive)
+        metoda_laczenia: Metoda równoległego łączenia (patrz polacz_liczniki)
+        pomiar: Słownik, w którym zapisywane są czasy "zliczanie" i "laczenie"
+            (łączenie na najwyższym poziomie rekurencji; w puli łączenia
+            przeplatają się ze zliczaniem i są wliczone do zliczania)
+        pula: Trwała pula fork/join używana zamiast nowych wątków
+        min_fragmentu: Fragment krótszy niż 2 * min_fragmentu nie jest dzielony
+            (None - próg dostrojony przez prog_podzialu)
 
     Returns:
         Lista liczników dla danego fragmentu
     """
+    czas_startu = time.perf_counter()
+    lista = jako_widok(lista)
     if end is None:
         end = len(lista)
 
     dlugosc = end - start
+    if min_fragmentu is None:
+        min_fragmentu = prog_podzialu(lista)
+
+    if pula is not None:
+        wynik = pula.zlec(
+            _zlicz_fork_join, pula, lista, N, start, end, min_fragmentu
+        ).wynik()
+        zapisz_pomiar(pomiar, czas_startu, time.perf_counter())
+        return wynik
 
     # Warunek bazowy: mały fragment lub brak dostępnych wątków
-    if dlugosc < 2 or max_watkow <= 1:
-        return zlicz_w_fragmencie(lista, start, end, N)
+    if dlugosc < max(2, 2 * min_fragmentu) or max_watkow <= 1:
+        return zlicz_w_fragmencie(*wytnij(lista, start, end), N)
 
     # Podziel fragment na dwie części
     srodek = start + dlugosc // 2
     polowa_watkow = max_watkow // 2
 
     wyniki: List[Optional[List[int]]] = [None, None]
+    # Wyjątki wątków (także z głębszych poziomów rekurencji) - zgłaszane po join()
+    bledy = []
 
     def lewa_polowa():
-        wyniki[0] = zlicz_rekurencyjnie(lista, N, polowa_watkow, start, srodek)
+        try:
+            wyniki[0] = zlicz_rekurencyjnie(
+                lista,
+                N,
+                polowa_watkow,
+                start,
+                srodek,
+                metoda_laczenia,
+                min_fragmentu=min_fragmentu,
+            )
+        except Exception as blad:
+            bledy.append(blad)
 
     def prawa_polowa():
-        wyniki[1] = zlicz_rekurencyjnie(lista, N, polowa_watkow, srodek, end)
+        try:
+            wyniki[1] = zlicz_rekurencyjnie(
+                lista,
+                N,
+                polowa_watkow,
+                srodek,
+                end,
+                metoda_laczenia,
+                min_fragmentu=min_fragmentu,
+            )
+        except Exception as blad:
+            bledy.append(blad)
 
     # Uruchom dwa wątki dla lewej i prawej połowy
     t1 = threading.Thread(target=lewa_polowa)
@@ -216,8 +729,174 @@ def zlicz_rekurencyjnie(
     t1.join()
     t2.join()
 
-    # Połącz wyniki
-    return polacz_liczniki(wyniki)
+    if bledy:
+        raise bledy[0]
+
+    # Połącz wyniki - wątki obu zakończonych połówek są już wolne
+    czas_laczenia = time.perf_counter()
+    wynik = polacz_liczniki(wyniki, max_watkow, metoda_laczenia)
+    zapisz_pomiar(pomiar, czas_startu, czas_laczenia)
+    return wynik
+
+
+def _zlicz_fork_join(
+    pula: PulaForkJoin, lista, N: int, start: int, end: int, min_fragmentu: int
+):
+    """Zadanie puli: dzieli fragment na pół aż do progu (fork), łączy wyniki (join)"""
+    dlugosc = end - start
+    if dlugosc < max(2, 2 * min_fragmentu):
+        return zlicz_w_fragmencie(*wytnij(lista, start, end), N)
+
+    srodek = start + dlugosc // 2
+    prawa = pula.zlec(_zlicz_fork_join, pula, lista, N, srodek, end, min_fragmentu)
+    lewa = _zlicz_fork_join(pula, lista, N, start, srodek, min_fragmentu)
+    return polacz_liczniki([lewa, prawa.wynik()])
+
+
+# ===== WERSJA 4: PROCESY Z PAMIĘCIĄ WSPÓŁDZIELONĄ =====
+
+
+def kod_typu(N: int) -> str:
+    """Najmniejszy kod typu array/memoryview mieszczący wartości 0..N-1"""
+    for kod in ("B", "H", "I", "Q"):
+        if N <= 1 << (8 * array(kod).itemsize):
+            return kod
+    raise ValueError(f"Zbyt duże N: {N}")
+
+
+def _zapisz_wiersz(
+    bufor_danych, bufor_licznikow, kod, dlugosc, N, indeks, start, end
+) -> None:
+    """Zlicza fragment [start, end) danych i zapisuje wiersz `indeks` macierzy"""
+    if NUMPY_DOSTEPNY:
+        dane = np.frombuffer(bufor_danych, dtype=kod, count=dlugosc)
+        macierz = np.frombuffer(bufor_licznikow, dtype=np.int64).reshape(-1, N)
+        macierz[indeks] = zlicz_w_fragmencie_numpy(dane, start, end, N)
+        return
+
+    with bufor_danych.cast(kod) as dane, bufor_licznikow.cast("q") as liczniki:
+        wiersz = array("q", zlicz_w_fragmencie(dane, start, end, N))
+        liczniki[indeks * N : (indeks + 1) * N] = wiersz
+
+
+def _polacz_wiersze(bufor_licznikow, workers: int, N: int):
+    """Łączy wiersze współdzielonej macierzy liczników"""
+    if NUMPY_DOSTEPNY:
+        macierz = np.frombuffer(bufor_licznikow, dtype=np.int64, count=workers * N)
+        return polacz_liczniki(list(macierz.reshape(workers, N)), workers)
+
+    with bufor_licznikow.cast("q") as wiersze:
+        return polacz_liczniki(
+            [wiersze[i * N : (i + 1) * N] for i in range(workers)], workers
+        )
+
+
+def _zlicz_w_procesie(
+    nazwa_danych: str,
+    kod: str,
+    dlugosc: int,
+    nazwa_licznikow: str,
+    N: int,
+    indeks: int,
+    start: int,
+    end: int,
+) -> None:
+    """
+    Praca procesu: dołącza do pamięci współdzielonej po nazwie, zlicza
+    fragment [start, end) i zapisuje liczniki w wierszu `indeks` macierzy.
+    """
+    dane_shm = shared_memory.SharedMemory(name=nazwa_danych)
+    liczniki_shm = shared_memory.SharedMemory(name=nazwa_licznikow)
+    try:
+        _zapisz_wiersz(
+            dane_shm.buf, liczniki_shm.buf, kod, dlugosc, N, indeks, start, end
+        )
+    except Exception as blad:
+        # Zmienne ramek tracebacku (widoki bufora) blokowałyby close();
+        # sam stos wywołań zostaje w komunikacie błędu
+        traceback.clear_frames(blad.__traceback__)
+        raise
+    finally:
+        dane_shm.close()
+        liczniki_shm.close()
+
+
+def zlicz_procesy(dane, N: int, workers: int) -> List[int]:
+    """
+    Tworzy listę liczników używając puli procesów (bez ograniczenia GIL).
+
+    Dane kopiowane są raz do pamięci współdzielonej jako zwarty bufor typu
+    uint8/16/32/64 dobranego do N - procesy dołączają do niego po nazwie,
+    zamiast dostawać listę przez pickle. Każdy proces zapisuje swoje liczniki
+    w wierszu współdzielonej macierzy workers x N, a proces główny je łączy.
+
+    Args:
+        dane: Lista (lub obiekt z protokołem bufora) z liczbami 0..N-1
+        N: Maksymalna wartość liczb + 1
+        workers: Liczba procesów
+
+    Returns:
+        Lista liczników (np.ndarray dla danych NumPy) - te same wartości,
+        co zlicz_wiele_watkow
+    """
+    if workers < 1:
+        raise ValueError("Liczba procesów musi być >= 1")
+
+    dane = jako_widok(dane)
+    dlugosc = len(dane)
+    workers = min(workers, dlugosc)
+    if workers == 0:
+        return zlicz_w_fragmencie(dane, 0, 0, N)
+
+    kod = kod_typu(N)
+    dane_shm = shared_memory.SharedMemory(
+        create=True, size=dlugosc * array(kod).itemsize
+    )
+    liczniki_shm = shared_memory.SharedMemory(create=True, size=workers * N * 8)
+    try:
+        with dane_shm.buf.cast(kod) as bufor:
+            if czy_numpy(dane):
+                np.frombuffer(bufor, dtype=kod)[:] = dane
+            elif NUMPY_DOSTEPNY and isinstance(dane, (bytes, bytearray, memoryview)):
+                zrodlo = memoryview(dane)
+                np.frombuffer(bufor, dtype=kod)[:] = np.frombuffer(
+                    zrodlo, dtype=zrodlo.format
+                )
+            else:
+                bufor[:] = array(kod, dane)
+
+        with ProcessPoolExecutor(max_workers=workers) as pula:
+            zadania = [
+                pula.submit(
+                    _zlicz_w_procesie,
+                    dane_shm.name,
+                    kod,
+                    dlugosc,
+                    liczniki_shm.name,
+                    N,
+                    indeks,
+                    *granice_fragmentu(indeks, dlugosc, workers),
+                )
+                for indeks in range(workers)
+            ]
+            for zadanie in zadania:
+                zadanie.result()
+
+        wynik = _polacz_wiersze(liczniki_shm.buf, workers, N)
+    except Exception as blad:
+        traceback.clear_frames(blad.__traceback__)
+        raise
+    finally:
+        dane_shm.close()
+        dane_shm.unlink()
+        liczniki_shm.close()
+        liczniki_shm.unlink()
+
+    if czy_numpy(dane) and not czy_numpy(wynik):
+        return np.array(wynik, dtype=np.int64)
+    if not czy_numpy(dane) and czy_numpy(wynik):
+        return wynik.tolist()
+    return wynik
 
 
 # ===== FUNKCJA TESTUJĄCA =====
@@ -275,6 +954,23 @@ def test_zliczanie():
     print(f"Rekurencja:  {wynik_rek}")
     print(f"Poprawne: {wynik_rek == oczekiwane}")
 
+    with PulaForkJoin(4) as pula:
+        wynik_pula = zlicz_rekurencyjnie(L, N, 8, pula=pula, min_fragmentu=8)
+    print(f"Fork/join:   {wynik_pula}")
+    print(f"Poprawne: {wynik_pula == oczekiwane}")
+
+    wynik_proc = zlicz_procesy(L, N, 4)
+    print(f"4 procesy:   {wynik_proc}")
+    print(f"Poprawne: {wynik_proc == oczekiwane}")
+
+    if NUMPY_DOSTEPNY:
+        tablica = jako_tablica(L)
+        wynik_np = zlicz_wiele_watkow(tablica, N, 4)
+        print(f"NumPy:       {wynik_np.tolist()}")
+        print(f"Poprawne: {wynik_np.tolist() == oczekiwane}")
+        wynik_np = zlicz_rekurencyjnie(tablica, N, 8)
+        print(f"Poprawne (NumPy, rekurencja): {wynik_np.tolist() == oczekiwane}")
+
     # Test 3: Bardzo duża lista (test wydajności)
     print("\n--- Test 3: Bardzo duża lista (pomiar czasu) ---")
     N = 20
@@ -301,9 +997,11 @@ def test_zliczanie():
 
     # 4 wątki
     start_time = time.time()
-    wynik_4 = zlicz_wiele_watkow(L, N, 4)
+    pomiar = {}
+    wynik_4 = zlicz_wiele_watkow(L, N, 4, pomiar=pomiar)
     czas_4 = time.time() - start_time
     print(f"4 wątki:      {czas_4:.4f}s (poprawne: {wynik_4 == oczekiwane})")
+    print(f"  w tym łączenie: {pomiar['laczenie']:.6f}s")
 
     # 8 wątków
     start_time = time.time()
@@ -311,6 +1009,233 @@ def test_zliczanie():
     czas_8 = time.time() - start_time
     print(f"8 wątków:     {czas_8:.4f}s (poprawne: {wynik_8 == oczekiwane})")
 
+    # 4 procesy (pamięć współdzielona)
+    start_time = time.time()
+    wynik_proc = zlicz_procesy(L, N, 4)
+    czas_proc = time.time() - start_time
+    print(f"4 procesy:    {czas_proc:.4f}s (poprawne: {wynik_proc == oczekiwane})")
+
+    # Dane z protokołem bufora: wątki dostają widoki fragmentów bez kopiowania
+    bajty = bytes(L)
+    for nazwa, dane in (("bytes", bajty), ("array('B')", array("B", bajty))):
+        start_time = time.time()
+        wynik_bufor = list(zlicz_wiele_watkow(dane, N, 4))
+        czas_bufor = time.time() - start_time
+        poprawne = wynik_bufor == oczekiwane
+        print(f"4 wątki, {nazwa}: {czas_bufor:.4f}s (poprawne: {poprawne})")
+
+    # NumPy: np.bincount na fragmentach tablicy (bez GIL)
+    if NUMPY_DOSTEPNY:
+        start_time = time.time()
+        tablica = jako_tablica(L)
+        print(f"\nKonwersja na np.ndarray: {time.time() - start_time:.4f}s")
+
+        start_time = time.time()
+        wynik_np = zlicz_w_fragmencie(tablica, 0, len(tablica), N)
+        czas_np = time.time() - start_time
+        poprawne = wynik_np.tolist() == oczekiwane
+        print(f"NumPy sekwencyjnie: {czas_np:.4f}s (poprawne: {poprawne})")
+
+        for liczba_watkow in (2, 4, 8):
+            start_time = time.time()
+            wynik_np = zlicz_wiele_watkow(tablica, N, liczba_watkow)
+            czas_np = time.time() - start_time
+            poprawne = wynik_np.tolist() == oczekiwane
+            print(
+                f"NumPy, wątki: {liczba_watkow}: {czas_np:.4f}s (poprawne: {poprawne})"
+            )
+
+    # Test 4: Łączenie równoległe - duże N, wiele liczników częściowych
+    print("\n--- Test 4: Łączenie liczników (N = 200 000, 8 liczników) ---")
+    N = 200_000
+    czesciowe = [[random.randint(0, 9) for _ in range(N)] for _ in range(8)]
+    start_time = time.time()
+    oczekiwane = polacz_liczniki(czesciowe)
+    print(f"sekwencyjnie:        {time.time() - start_time:.4f}s")
+    for metoda in METODY_LACZENIA:
+        start_time = time.time()
+        wynik = polacz_liczniki(czesciowe, 8, metoda)
+        czas = time.time() - start_time
+        print(f"{metoda:8s} (8 wątków): {czas:.4f}s (poprawne: {wynik == oczekiwane})")
+
+    # Test 5: Tryb rzadki - ogromne N, mało różnych wartości
+    print("\n--- Test 5: Tryb rzadki (N = 10^8) ---")
+    N = 10**8
+    wartosci = [random.randrange(N) for _ in range(1000)]
+    L = [random.choice(wartosci) for _ in range(200_000)]
+    print(f"Wybrany tryb: {wybierz_tryb(L, N, 4)}")
+
+    oczekiwane = {}
+    for x in L:
+        oczekiwane[x] = oczekiwane.get(x, 0) + 1
+
+    start_time = time.time()
+    wynik_rzadki = zlicz_wiele_watkow(L, N, 4, jako_slownik=True)
+    czas_rzadki = time.time() - start_time
+    poprawne = wynik_rzadki == oczekiwane
+    print(f"4 wątki (auto): {czas_rzadki:.4f}s (poprawne: {poprawne})")
+
+    # Test 6: Wiele małych wywołań - nowe wątki vs trwała pula fork/join
+    print("\n--- Test 6: 500 wywołań na 20 000 elementów ---")
+    N = 20
+    L = [random.randint(0, N - 1) for _ in range(20_000)]
+    oczekiwane = zlicz_w_fragmencie(L, 0, len(L), N)
+
+    start_time = time.time()
+    poprawne = all(
+        zlicz_rekurencyjnie(L, N, 8, min_fragmentu=2500) == oczekiwane
+        for _ in range(500)
+    )
+    print(f"Nowe wątki:     {time.time() - start_time:.4f}s (poprawne: {poprawne})")
+
+    with PulaForkJoin(8) as pula:
+        start_time = time.time()
+        poprawne = all(
+            zlicz_rekurencyjnie(L, N, 8, pula=pula, min_fragmentu=2500) == oczekiwane
+            for _ in range(500)
+        )
+        print(f"Pula fork/join: {time.time() - start_time:.4f}s (poprawne: {poprawne})")
+        print(f"  zadania podkradzione: {pula.podkradzione}")
+
+    # Test 7: Okno przesuwne - histogram przyrostowy vs zliczanie okna od nowa
+    print("\n--- Test 7: Okno przesuwne (100 partii po 2000 zdarzeń) ---")
+    from histogram import Histogram
+
+    N = 20
+    partie = [[random.randint(0, N - 1) for _ in range(2000)] for _ in range(150)]
+
+    start_time = time.time()
+    histogram = Histogram(N, maks_partii=100)
+    for partia in partie:
+        histogram.add_batch(partia)
+    czas_przyrostowy = time.time() - start_time
+
+    start_time = time.time()
+    for koniec in range(1, len(partie) + 1):
+        okno = [x for partia in partie[max(0, koniec - 100) : koniec] for x in partia]
+        oczekiwane = zlicz_wiele_watkow(okno, N, 4)
+    czas_od_nowa = time.time() - start_time
+
+    poprawne = histogram.snapshot().tolist() == oczekiwane
+    print(f"Przyrostowo: {czas_przyrostowy:.4f}s (poprawne: {poprawne})")
+    print(f"Od nowa:     {czas_od_nowa:.4f}s")
+
+    # Partia usunięta z okna nie jest odejmowana drugi raz przy wygaśnięciu
+    histogram = Histogram(5, maks_partii=1)
+    histogram.add_batch([1])
+    histogram.remove_batch([1])
+    histogram.add_batch([2])
+    poprawne = histogram.snapshot().tolist() == [0, 0, 1, 0, 0]
+    # Usunięta partia ze środka okna nie liczy się do maks_partii
+    histogram = Histogram(5, maks_partii=3)
+    for partia in ([1], [2], [1]):
+        histogram.add_batch(partia)
+    histogram.remove_batch([1])
+    histogram.add_batch([3])
+    histogram.add_batch([4])
+    poprawne = poprawne and histogram.snapshot().tolist() == [0, 0, 1, 1, 1]
+    print(f"remove_batch w oknie (poprawne: {poprawne})")
+
+    # Test 8: Sortowanie przez zliczanie vs sorted()
+    print("\n--- Test 8: Sortowanie przez zliczanie (1 000 000 elementów) ---")
+    from sortowanie import Dystrybuanta, sortuj_zliczaniem
+
+    N = 1000
+    L = [random.randint(0, N - 1) for _ in range(1_000_000)]
+
+    start_time = time.time()
+    posortowane = sorted(L)
+    print(f"sorted():    {time.time() - start_time:.4f}s")
+
+    start_time = time.time()
+    wynik = sortuj_zliczaniem(L, N, 4)
+    czas = time.time() - start_time
+    print(f"Zliczaniem:  {czas:.4f}s (poprawne: {wynik.tolist() == posortowane})")
+
+    dystrybuanta = Dystrybuanta.z_danych(L, N)
+    poprawne = (
+        dystrybuanta.kwantyl(0.5) == posortowane[len(L) // 2 - 1]
+        and dystrybuanta.percentyl(99) == posortowane[len(L) * 99 // 100 - 1]
+        and dystrybuanta.zakres(100, 199) == sum(100 <= x <= 199 for x in L)
+    )
+    print(f"Mediana, percentyl 99, zakres [100, 199] (poprawne: {poprawne})")
+
+    # Test 9: Wiele wątków-producentów - osobne liczniki wątków vs wspólny lock
+    print("\n--- Test 9: 4 producentów po 100 000 zdarzeń ---")
+    from histogram import bench_rywalizacji
+
+    for wiersz in bench_rywalizacji([4], 100_000):
+        print(
+            f"{wiersz['histogram']:21s} {wiersz['czas']:.4f}s "
+            f"(poprawne: {wiersz['poprawne']})"
+        )
+
+    # Test 10: Szkice w stałej pamięci vs dokładne liczniki (N = 10^12)
+    print("\n--- Test 10: Count-Min i Space-Saving (200 000 elementów, N = 10^12) ---")
+    from szkice import szkicuj_wiele_watkow
+
+    N = 10**12
+    wartosci = [random.randrange(N) for _ in range(20_000)]
+    wagi = [1 / (i + 1) for i in range(len(wartosci))]
+    L = random.choices(wartosci, weights=wagi, k=200_000)
+    dokladne = zlicz_wiele_watkow(L, N, 4, tryb="rzadki", jako_slownik=True)
+
+    start_time = time.time()
+    szkic, top = szkicuj_wiele_watkow(L, 4, epsilon=0.001, delta=0.01, k=100)
+    print(f"Czas: {time.time() - start_time:.4f}s")
+    print(f"Count-Min: {szkic.glebokosc} x {szkic.szerokosc} liczników")
+
+    bledy = [szkic.szacuj(x) - liczba for x, liczba in dokladne.items()]
+    przekroczone = sum(blad > szkic.epsilon * len(L) for blad in bledy)
+    print(
+        f"  błąd maks. {max(bledy)} (epsilon * n = {szkic.epsilon * len(L):.0f}), "
+        f"przekroczeń: {przekroczone / len(bledy):.4f} (delta = {szkic.delta})"
+    )
+    print(f"  nigdy nie zaniża (poprawne: {min(bledy) >= 0})")
+
+    monitorowane = {x for x, _, _ in top.top()}
+    poprawne = all(
+        liczba - blad <= dokladne[x] <= liczba and blad <= len(L) / top.k
+        for x, liczba, blad in top.top()
+    ) and all(x in monitorowane for x, c in dokladne.items() if c > len(L) / top.k)
+    print(
+        f"Space-Saving top-{top.k}: przedziały i częste wartości (poprawne: {poprawne})"
+    )
+
+    # Test 11: Plik tekstowy - pusty i błędny wiersz
+    print("\n--- Test 11: Strumieniowo z pliku tekstowego ---")
+    import io
+
+    from zliczanie_strumieniowe import zlicz_plik_tekstowy
+
+    wynik = zlicz_plik_tekstowy(io.BytesIO(b"1\n2\n\n2\n0"), 3, rozmiar_bloku=4)
+    print(f"Z pustym wierszem (poprawne: {wynik == [1, 1, 2]})")
+    try:
+        zlicz_plik_tekstowy(io.BytesIO(b"1\n2\nx\n2\n"), 3)
+        poprawne = False
+    except ValueError:
+        poprawne = True
+    print(f"Błędny wiersz zgłasza ValueError (poprawne: {poprawne})")
+
+    # Test 12: Wartość spoza zakresu - błąd z wątku roboczego nie ginie
+    print("\n--- Test 12: Wartość spoza zakresu 0..N-1 ---")
+    L = [5, 1, 1, 1] * 1000
+    with PulaForkJoin(2) as pula:
+        for nazwa, funkcja in [
+            ("dwa wątki", lambda: zlicz_dwa_watki(L, 4)),
+            ("wiele wątków", lambda: zlicz_wiele_watkow(L, 4, 2, tryb="gesty")),
+            ("rzadki", lambda: zlicz_wiele_watkow(L, 4, 2, tryb="rzadki")),
+            ("rekurencyjnie", lambda: zlicz_rekurencyjnie(L, 4, 4, min_fragmentu=100)),
+            ("pula fork/join", lambda: zlicz_wiele_watkow(L, 4, 2, pula=pula)),
+            ("procesy", lambda: zlicz_procesy(L, 4, 2)),
+        ]:
+            try:
+                funkcja()
+                poprawne = False
+            except IndexError:
+                poprawne = True
+            print(f"{nazwa}: IndexError (poprawne: {poprawne})")
+
     print("\n" + "=" * 60)
     print("=" * 60)
 
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Równoległe sortowanie przez zliczanie i zapytania o rozkład liczb 0..N-1.
+
+Sortowanie przebiega w trzech równoległych fazach:
+1. Histogram - zlicz_wiele_watkow (wątki zliczają fragmenty danych)
+2. Suma prefiksowa liczników - każdy wątek sumuje swój blok liczników,
+   sumy bloków dają przesunięcia, po czym wątki liczą prefiksy bloków
+3. Rozrzucenie - każdy wątek wypełnia swój równy fragment bufora wynikowego
+   (array lub np.ndarray najmniejszego typu mieszczącego N) kolejnymi
+   wartościami według sum prefiksowych
+
+Koszt to O(n + N) zamiast O(n log n) dla sorted().
+
+Dystrybuanta odpowiada na pytania o rangę i liczbę elementów w przedziale
+w O(1), a o kwantyle w O(log N), po zbudowaniu sum prefiksowych w O(N).
+"""
+
+import math
+import threading
+from array import array
+from bisect import bisect_right
+from fractions import Fraction
+from itertools import accumulate
+from typing import Callable, List, Optional
+
+from liczniki_wielowatkowe import (
+    czy_numpy,
+    granice_fragmentu,
+    jako_widok,
+    kod_typu,
+    np,
+    zlicz_wiele_watkow,
+)
+
+
+def _rownolegle(funkcja: Callable[[int], None], liczba_watkow: int) -> None:
+    """Wywołuje funkcja(indeks) dla indeks = 0..liczba_watkow-1 w osobnych wątkach"""
+    if liczba_watkow == 1:
+        funkcja(0)
+        return
+    watki = [threading.Thread(target=funkcja, args=(i,)) for i in range(liczba_watkow)]
+    for watek in watki:
+        watek.start()
+    for watek in watki:
+        watek.join()
+
+
+def suma_prefiksowa(liczniki, liczba_watkow: int = 1):
+    """
+    Sumy prefiksowe liczników: prefiks[i] = licz[0] + ... + licz[i-1].
+
+    Args:
+        liczniki: Lista (lub np.ndarray) N liczników
+        liczba_watkow: Liczba wątków liczących bloki sum
+
+    Returns:
+        Lista (np.ndarray dla liczników NumPy) N + 1 sum, prefiks[0] = 0
+    """
+    N = len(liczniki)
+    liczba_watkow = max(1, min(liczba_watkow, N))
+    numpy = czy_numpy(liczniki)
+    prefiks = np.zeros(N + 1, dtype=np.int64) if numpy else [0] * (N + 1)
+
+    # Faza 1: suma każdego bloku liczników
+    sumy_blokow = [0] * liczba_watkow
+
+    def sumuj_blok(indeks):
+        a, b = granice_fragmentu(indeks, N, liczba_watkow)
+        sumy_blokow[indeks] = int(liczniki[a:b].sum()) if numpy else sum(liczniki[a:b])
+
+    _rownolegle(sumuj_blok, liczba_watkow)
+
+    # Faza 2: przesunięcie bloku = suma poprzednich bloków
+    przesuniecia = list(accumulate(sumy_blokow, initial=0))
+
+    # Faza 3: prefiksy wewnątrz bloków
+    def prefiksy_bloku(indeks):
+        a, b = granice_fragmentu(indeks, N, liczba_watkow)
+        if numpy:
+            np.cumsum(liczniki[a:b], out=prefiks[a + 1 : b + 1])
+            prefiks[a + 1 : b + 1] += przesuniecia[indeks]
+        else:
+            # Element a (przesunięcie) zapisuje też poprzedni blok - tą samą wartością
+            prefiks[a : b + 1] = accumulate(liczniki[a:b], initial=przesuniecia[indeks])
+
+    _rownolegle(prefiksy_bloku, liczba_watkow)
+    return prefiks
+
+
+def _pierwsza_wartosc(prefiks, pozycja: int) -> int:
+    """Wartość na pozycji `pozycja` posortowanych danych"""
+    if czy_numpy(prefiks):
+        return int(np.searchsorted(prefiks, pozycja, side="right")) - 1
+    return bisect_right(prefiks, pozycja) - 1
+
+
+def sortuj_zliczaniem(
+    dane, N: int, liczba_watkow: int = 4, liczniki: Optional[List[int]] = None
+):
+    """
+    Sortuje liczby 0..N-1 przez zliczanie (trzy fazy równoległe).
+
+    Args:
+        dane: Lista, tablica NumPy lub obiekt z protokołem bufora
+        N: Maksymalna wartość liczb + 1
+        liczba_watkow: Liczba wątków każdej fazy
+        liczniki: Gotowy histogram danych (pomija fazę zliczania)
+
+    Returns:
+        Posortowane dane jako array (np.ndarray dla danych NumPy) typu
+        kod_typu(N)
+    """
+    if liczba_watkow < 1:
+        raise ValueError("Liczba wątków musi być >= 1")
+
+    dane = jako_widok(dane)
+    if liczniki is None:
+        liczniki = zlicz_wiele_watkow(dane, N, liczba_watkow, tryb="gesty")
+    prefiks = suma_prefiksowa(liczniki, liczba_watkow)
+
+    dlugosc = int(prefiks[-1])
+    kod = kod_typu(N)
+    numpy = czy_numpy(dane)
+    if numpy:
+        wynik = np.empty(dlugosc, dtype=kod)
+    else:
+        wynik = array(kod, bytes(dlugosc * array(kod).itemsize))
+    liczba_watkow = max(1, min(liczba_watkow, dlugosc))
+
+    def rozrzuc(indeks):
+        """Wypełnia fragment [start, end) wyniku wartościami z prefiksów"""
+        pozycja, end = granice_fragmentu(indeks, dlugosc, liczba_watkow)
+        wartosc = _pierwsza_wartosc(prefiks, pozycja)
+        while pozycja < end:
+            koniec = min(int(prefiks[wartosc + 1]), end)
+            if koniec > pozycja:
+                if numpy:
+                    wynik[pozycja:koniec] = wartosc
+                else:
+                    wynik[pozycja:koniec] = array(kod, (wartosc,)) * (koniec - pozycja)
+                pozycja = koniec
+            wartosc += 1
+
+    _rownolegle(rozrzuc, liczba_watkow)
+    return wynik
+
+
+class Dystrybuanta:
+    """
+    Zapytania o rozkład danych na podstawie sum prefiksowych liczników.
+
+    Przykład:
+        d = Dystrybuanta.z_danych(dane, N)
+        d.zakres(10, 20)   # liczba elementów z przedziału [10, 20]
+        d.kwantyl(0.5)     # mediana
+    """
+
+    def __init__(self, liczniki, liczba_watkow: int = 1):
+        self.N = len(liczniki)
+        self.prefiks = suma_prefiksowa(liczniki, liczba_watkow)
+        self.n = int(self.prefiks[-1])
+
+    @classmethod
+    def z_danych(cls, dane, N: int, liczba_watkow: int = 4) -> "Dystrybuanta":
+        """Zlicza dane (zlicz_wiele_watkow) i buduje sumy prefiksowe"""
+        liczniki = zlicz_wiele_watkow(dane, N, liczba_watkow, tryb="gesty")
+        return cls(liczniki, liczba_watkow)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def ranga(self, x: int) -> int:
+        """Liczba elementów mniejszych od x - O(1)"""
+        return int(self.prefiks[min(max(x, 0), self.N)])
+
+    def zakres(self, a: int, b: int) -> int:
+        """Liczba elementów z przedziału [a, b] - O(1)"""
+        if a > b:
+            return 0
+        return self.ranga(b + 1) - self.ranga(a)
+
+    def element(self, k: int) -> int:
+        """k-ty najmniejszy element (od 0) - O(log N)"""
+        if not 0 <= k < self.n:
+            raise IndexError(f"Pozycja spoza zakresu 0..{self.n - 1}")
+        return _pierwsza_wartosc(self.prefiks, k)
+
+    def kwantyl(self, q: float) -> int:
+        """
+        Kwantyl rzędu q metodą najbliższej rangi: najmniejszy element, od
+        którego nie większych jest co najmniej q * n elementów.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Rząd kwantyla musi należeć do [0, 1]")
+        if self.n == 0:
+            raise ValueError("Kwantyl pustych danych")
+        # Ułamek dokładny - w liczbach zmiennoprzecinkowych 0.3 * 10 > 3
+        pozycja = math.ceil(Fraction(str(float(q))) * self.n)
+        return self.element(max(pozycja, 1) - 1)
+
+    def percentyl(self, p: float) -> int:
+        """Percentyl p (0..100) - patrz kwantyl"""
+        return self.kwantyl(p / 100)
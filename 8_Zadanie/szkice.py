@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Przybliżone zliczanie w stałej pamięci - dla dowolnie dużego zakresu wartości.
+
+Liczniki [0] * N wymagają pamięci proporcjonalnej do zakresu wartości.
+Szkice mają rozmiar zależny tylko od żądanej dokładności:
+
+1. SzkicCountMin (Cormode, Muthukrishnan) - d = ceil(ln(1/delta)) wierszy
+   po w = ceil(e/epsilon) liczników, wartość x zwiększa w każdym wierszu
+   licznik h_j(x). Szacunek f'(x) = min_j licznik[j][h_j(x)] spełnia
+       f(x) <= f'(x)                          zawsze
+       f'(x) <= f(x) + epsilon * n            z prawdopodobieństwem >= 1 - delta
+   (n - liczba wszystkich zdarzeń).
+
+2. SpaceSaving (Metwally i in.) - k monitorowanych wartości z licznikiem
+   i błędem. Dla każdej monitorowanej wartości
+       liczba - blad <= f(x) <= liczba,   blad <= n / k
+   a każda wartość o f(x) > n / k jest monitorowana (top-k).
+
+Oba szkice można łączyć (po zliczeniu fragmentów w osobnych wątkach) z tymi
+samymi gwarancjami dla sumy danych; szkicuj_wiele_watkow dzieli dane jak
+zlicz_wiele_watkow (zlicz_fragmentami), a tablice Count-Min łączy
+polacz_liczniki.
+"""
+
+import heapq
+import math
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fork_join import PulaForkJoin
+from liczniki_wielowatkowe import (
+    NUMPY_DOSTEPNY,
+    jako_widok,
+    np,
+    polacz_liczniki,
+    zlicz_fragmentami,
+    zlicz_w_fragmencie_rzadko,
+)
+
+# Liczba pierwsza funkcji mieszających h(x) = ((a * x + b) mod P) mod w;
+# a, x mod P < 2^31, więc iloczyn mieści się w int64
+LICZBA_PIERWSZA = (1 << 31) - 1
+# Fragment wątku zliczany jest porcjami - dokładne liczniki porcji
+# (Counter) zajmują pamięć zależną od porcji, a nie od danych
+ROZMIAR_PORCJI = 1 << 16
+
+
+class SzkicCountMin:
+    """
+    Szkic Count-Min: d x w liczników, d = ceil(ln(1/delta)), w = ceil(e/epsilon).
+
+    Szkice o tych samych epsilon, delta i ziarnie mają te same funkcje
+    mieszające i mogą być łączone (polacz).
+
+    Przykład:
+        szkic = SzkicCountMin(epsilon=0.001, delta=0.01)
+        szkic.dodaj_dane(dane)
+        szkic.szacuj(x)
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01, ziarno: int = 0):
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon i delta muszą należeć do (0, 1)")
+        self.epsilon = epsilon
+        self.delta = delta
+        self.ziarno = ziarno
+        self.szerokosc = math.ceil(math.e / epsilon)
+        self.glebokosc = math.ceil(math.log(1 / delta))
+        self.n = 0
+
+        losowe = random.Random(ziarno)
+        self._a = [losowe.randrange(1, LICZBA_PIERWSZA) for _ in range(self.glebokosc)]
+        self._b = [losowe.randrange(LICZBA_PIERWSZA) for _ in range(self.glebokosc)]
+        # Wiersze jeden za drugim - tablica łączona jak zwykłe liczniki
+        rozmiar = self.glebokosc * self.szerokosc
+        self.tablica = (
+            np.zeros(rozmiar, dtype=np.int64) if NUMPY_DOSTEPNY else [0] * rozmiar
+        )
+
+    def pusty(self) -> "SzkicCountMin":
+        """Pusty szkic z tymi samymi funkcjami mieszającymi"""
+        return SzkicCountMin(self.epsilon, self.delta, self.ziarno)
+
+    def _indeksy(self, x: int) -> List[int]:
+        x %= LICZBA_PIERWSZA
+        return [
+            j * self.szerokosc + (a * x + b) % LICZBA_PIERWSZA % self.szerokosc
+            for j, (a, b) in enumerate(zip(self._a, self._b))
+        ]
+
+    def dodaj(self, x: int, liczba: int = 1) -> None:
+        """Dodaje `liczba` wystąpień wartości x"""
+        for indeks in self._indeksy(x):
+            self.tablica[indeks] += liczba
+        self.n += liczba
+
+    def dodaj_pary(self, pary: Sequence[Tuple[int, int]]) -> None:
+        """Dodaje pary (wartość, liczba wystąpień), np. z zlicz_w_fragmencie_rzadko"""
+        if not pary:
+            return
+        if NUMPY_DOSTEPNY:
+            try:
+                wartosci, liczby = np.array(pary, dtype=np.int64).T
+            except OverflowError:
+                wartosci = None
+            if wartosci is not None:
+                wartosci = np.mod(wartosci, LICZBA_PIERWSZA)
+                for j, (a, b) in enumerate(zip(self._a, self._b)):
+                    kolumny = (a * wartosci + b) % LICZBA_PIERWSZA % self.szerokosc
+                    wiersz = self.tablica[j * self.szerokosc : (j + 1) * self.szerokosc]
+                    wiersz += np.bincount(
+                        kolumny, weights=liczby, minlength=self.szerokosc
+                    ).astype(np.int64)
+                self.n += int(liczby.sum())
+                return
+
+        for wartosc, liczba in pary:
+            self.dodaj(wartosc, liczba)
+
+    def dodaj_dane(self, dane, start: int = 0, end: Optional[int] = None) -> None:
+        """Dodaje fragment [start:end] danych (porcjami po ROZMIAR_PORCJI)"""
+        for pary in _porcje_par(dane, start, end):
+            self.dodaj_pary(pary)
+
+    def szacuj(self, x: int) -> int:
+        """Górne oszacowanie liczby wystąpień x (patrz opis modułu)"""
+        return int(min(self.tablica[indeks] for indeks in self._indeksy(x)))
+
+    def polacz(self, inny: "SzkicCountMin") -> None:
+        """Dodaje liczniki szkicu o tych samych parametrach"""
+        parametry = (self.epsilon, self.delta, self.ziarno)
+        if (inny.epsilon, inny.delta, inny.ziarno) != parametry:
+            raise ValueError("Łączone szkice muszą mieć te same parametry")
+        self.tablica = polacz_liczniki([self.tablica, inny.tablica])
+        self.n += inny.n
+
+
+class SpaceSaving:
+    """
+    Top-k najczęstszych wartości w k licznikach (algorytm Space-Saving).
+
+    Nowa wartość przy pełnym zbiorze zastępuje wartość o najmniejszym
+    liczniku m, przejmując licznik m + liczba i błąd m.
+
+    Przykład:
+        top = SpaceSaving(k=100)
+        top.dodaj_dane(dane)
+        top.top(10)  # [(wartość, liczba, błąd), ...]
+    """
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError("k musi być >= 1")
+        self.k = k
+        self.n = 0
+        # wartość -> [liczba, błąd]
+        self._liczniki: Dict[int, List[int]] = {}
+        # Kopiec (liczba, wartość); wpisy nieaktualne są pomijane przy zdejmowaniu
+        self._kopiec: List[Tuple[int, int]] = []
+
+    @property
+    def minimum(self) -> int:
+        """Górne ograniczenie liczby wystąpień wartości niemonitorowanej"""
+        if len(self._liczniki) < self.k:
+            return 0
+        return self._najmniejszy()[0]
+
+    def _najmniejszy(self) -> Tuple[int, int]:
+        while True:
+            liczba, wartosc = self._kopiec[0]
+            wpis = self._liczniki.get(wartosc)
+            if wpis is not None and wpis[0] == liczba:
+                return liczba, wartosc
+            heapq.heappop(self._kopiec)
+
+    def _odbuduj_kopiec(self) -> None:
+        self._kopiec = [(wpis[0], wartosc) for wartosc, wpis in self._liczniki.items()]
+        heapq.heapify(self._kopiec)
+
+    def dodaj(self, wartosc: int, liczba: int = 1) -> None:
+        """Dodaje `liczba` wystąpień wartości"""
+        self.n += liczba
+        wpis = self._liczniki.get(wartosc)
+        if wpis is not None:
+            wpis[0] += liczba
+        elif len(self._liczniki) < self.k:
+            wpis = self._liczniki[wartosc] = [liczba, 0]
+        else:
+            minimum, usuwana = self._najmniejszy()
+            heapq.heappop(self._kopiec)
+            del self._liczniki[usuwana]
+            wpis = self._liczniki[wartosc] = [minimum + liczba, minimum]
+
+        heapq.heappush(self._kopiec, (wpis[0], wartosc))
+        if len(self._kopiec) > 4 * self.k:
+            self._odbuduj_kopiec()
+
+    def dodaj_pary(self, pary: Sequence[Tuple[int, int]]) -> None:
+        """Dodaje pary (wartość, liczba wystąpień)"""
+        for wartosc, liczba in pary:
+            self.dodaj(wartosc, liczba)
+
+    def dodaj_dane(self, dane, start: int = 0, end: Optional[int] = None) -> None:
+        """Dodaje fragment [start:end] danych (porcjami po ROZMIAR_PORCJI)"""
+        for pary in _porcje_par(dane, start, end):
+            self.dodaj_pary(pary)
+
+    def szacuj(self, x: int) -> int:
+        """Górne oszacowanie liczby wystąpień x"""
+        wpis = self._liczniki.get(x)
+        return wpis[0] if wpis is not None else self.minimum
+
+    def top(self, m: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """
+        Monitorowane wartości od najczęstszej.
+
+        Returns:
+            Lista (wartość, liczba, błąd) - f(wartość) należy do
+            [liczba - błąd, liczba]
+        """
+        wynik = sorted(
+            ((wartosc, wpis[0], wpis[1]) for wartosc, wpis in self._liczniki.items()),
+            key=lambda trojka: (-trojka[1], trojka[0]),
+        )
+        return wynik if m is None else wynik[:m]
+
+    def polacz(self, inny: "SpaceSaving") -> None:
+        """
+        Dołącza szkic innej części danych. Wartość niemonitorowana w jednym ze
+        szkiców dostaje jego minimum jako licznik i błąd, po czym zostaje k
+        największych liczników - gwarancje obowiązują dla n = suma n.
+        """
+        if inny.k != self.k:
+            raise ValueError(f"Różne k: {self.k} i {inny.k}")
+        minimum, minimum_innego = self.minimum, inny.minimum
+        brak, brak_innego = [minimum, minimum], [minimum_innego, minimum_innego]
+
+        polaczone = {}
+        for wartosc in self._liczniki.keys() | inny._liczniki.keys():
+            liczba, blad = self._liczniki.get(wartosc, brak)
+            liczba_innego, blad_innego = inny._liczniki.get(wartosc, brak_innego)
+            polaczone[wartosc] = [liczba + liczba_innego, blad + blad_innego]
+
+        najwieksze = heapq.nlargest(
+            self.k, polaczone.items(), key=lambda para: para[1][0]
+        )
+        self._liczniki = dict(najwieksze)
+        self.n += inny.n
+        self._odbuduj_kopiec()
+
+
+def _porcje_par(dane, start: int = 0, end: Optional[int] = None):
+    """Posortowane pary (wartość, liczba) kolejnych porcji fragmentu danych"""
+    if end is None:
+        end = len(dane)
+    for poczatek in range(start, end, ROZMIAR_PORCJI):
+        yield zlicz_w_fragmencie_rzadko(
+            dane, poczatek, min(poczatek + ROZMIAR_PORCJI, end)
+        )
+
+
+def szkicuj_wiele_watkow(
+    dane,
+    liczba_watkow: int,
+    epsilon: float = 0.001,
+    delta: float = 0.01,
+    k: int = 100,
+    metoda_laczenia: str = "kolumny",
+    pula: Optional[PulaForkJoin] = None,
+) -> Tuple[SzkicCountMin, SpaceSaving]:
+    """
+    Przybliżone zliczanie wieloma wątkami: każdy wątek buduje szkice swojego
+    fragmentu (podział jak w zlicz_wiele_watkow), a szkice są łączone -
+    tablice Count-Min przez polacz_liczniki.
+
+    Args:
+        dane: Lista, tablica NumPy lub obiekt z protokołem bufora (dowolne
+            liczby całkowite)
+        liczba_watkow: Liczba wątków do użycia
+        epsilon, delta: Dokładność szkicu Count-Min (patrz opis modułu)
+        k: Liczba wartości monitorowanych przez SpaceSaving
+        metoda_laczenia: Metoda równoległego łączenia (patrz polacz_liczniki)
+        pula: Trwała pula fork/join zamiast nowych wątków
+
+    Returns:
+        Krotka (SzkicCountMin, SpaceSaving) dla całych danych
+    """
+    if liczba_watkow < 1:
+        raise ValueError("Liczba wątków musi być >= 1")
+
+    dane = jako_widok(dane)
+    szkic = SzkicCountMin(epsilon, delta)
+    top = SpaceSaving(k)
+    liczba_watkow = min(liczba_watkow, len(dane))
+    if liczba_watkow == 0:
+        return szkic, top
+
+    def zlicz_fragment(fragment, start, end):
+        szkic_fragmentu, top_fragmentu = szkic.pusty(), SpaceSaving(k)
+        for pary in _porcje_par(fragment, start, end):
+            szkic_fragmentu.dodaj_pary(pary)
+            top_fragmentu.dodaj_pary(pary)
+        return szkic_fragmentu, top_fragmentu
+
+    wyniki = zlicz_fragmentami(dane, liczba_watkow, zlicz_fragment, pula)
+
+    szkic.tablica = polacz_liczniki(
+        [s.tablica for s, _ in wyniki], liczba_watkow, metoda_laczenia
+    )
+    for szkic_fragmentu, top_fragmentu in wyniki:
+        szkic.n += szkic_fragmentu.n
+        top.polacz(top_fragmentu)
+    return szkic, top
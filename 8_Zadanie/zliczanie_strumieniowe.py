@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Strumieniowe zliczanie wystąpień liczb przy ograniczonej pamięci.
+
+Dane czytane są porcjami stałego rozmiaru i przekazywane wątkom zliczającym
+przez ograniczoną kolejkę, a każdy wątek dodaje liczniki porcji do własnej
+sumy. Szczytowe zużycie pamięci to ok. (liczba_watkow + glebokosc_kolejki)
+porcji oraz liczba_watkow tablic N liczników - niezależnie od rozmiaru danych.
+
+Obsługiwane źródła:
+1. Dowolne iterowalne z liczbami całkowitymi
+2. Plik binarny z liczbami little-endian (ścieżka, obiekt pliku, sys.stdin.buffer)
+3. Plik tekstowy z jedną liczbą w wierszu
+"""
+
+import argparse
+import queue
+import sys
+import threading
+from array import array
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List
+
+from liczniki_wielowatkowe import (
+    NUMPY_DOSTEPNY,
+    jako_tablica,
+    np,
+    polacz_liczniki,
+    zlicz_w_fragmencie,
+)
+
+# Liczba elementów w porcji danych binarnych / z iterowalnego
+ROZMIAR_PORCJI = 1 << 20
+# Rozmiar bloku pliku tekstowego (bajty)
+ROZMIAR_BLOKU = 8 << 20
+
+KONIEC = None
+
+
+def dodaj_liczniki(suma, liczniki):
+    """Dodaje liczniki porcji do sumy (w miejscu, jeśli to możliwe)"""
+    if suma is None:
+        return liczniki
+    if NUMPY_DOSTEPNY and isinstance(suma, np.ndarray):
+        suma += liczniki
+        return suma
+    for i, wartosc in enumerate(liczniki):
+        suma[i] += wartosc
+    return suma
+
+
+def zlicz_porcjami(
+    porcje: Iterator,
+    zlicz_porcje: Callable,
+    N: int,
+    liczba_watkow: int,
+    glebokosc_kolejki: int,
+) -> List[int]:
+    """
+    Rozdziela porcje pomiędzy wątki przez ograniczoną kolejkę.
+
+    Wątek wywołujący czyta kolejne porcje i blokuje się, gdy kolejka jest
+    pełna, więc czytanie nie wyprzedza zliczania o więcej niż
+    `glebokosc_kolejki` porcji.
+
+    Args:
+        porcje: Iterator porcji danych
+        zlicz_porcje: Funkcja (porcja, N) -> liczniki porcji
+        N: Maksymalna wartość liczb + 1
+        liczba_watkow: Liczba wątków zliczających
+        glebokosc_kolejki: Maksymalna liczba porcji oczekujących w kolejce
+
+    Returns:
+        Lista liczników
+    """
+    if liczba_watkow < 1:
+        raise ValueError("Liczba wątków musi być >= 1")
+
+    kolejka = queue.Queue(maxsize=glebokosc_kolejki)
+    sumy = [None] * liczba_watkow
+    bledy = []
+
+    def pracownik(indeks):
+        while True:
+            porcja = kolejka.get()
+            if porcja is KONIEC:
+                return
+            # Po błędzie kolejka jest tylko opróżniana, aby nie blokować czytania
+            if bledy:
+                continue
+            try:
+                sumy[indeks] = dodaj_liczniki(sumy[indeks], zlicz_porcje(porcja, N))
+            except Exception as blad:
+                bledy.append(blad)
+
+    watki = [
+        threading.Thread(target=pracownik, args=(i,)) for i in range(liczba_watkow)
+    ]
+    for watek in watki:
+        watek.start()
+
+    try:
+        for porcja in porcje:
+            if bledy:
+                break
+            kolejka.put(porcja)
+    finally:
+        for _ in watki:
+            kolejka.put(KONIEC)
+        for watek in watki:
+            watek.join()
+
+    if bledy:
+        raise bledy[0]
+
+    wynik = polacz_liczniki(sumy)
+    if not len(wynik):
+        return [0] * N
+    return wynik.tolist() if NUMPY_DOSTEPNY and isinstance(wynik, np.ndarray) else wynik
+
+
+# ===== ŹRÓDŁA DANYCH =====
+
+
+def zlicz_strumien(
+    iterowalne: Iterable[int],
+    N: int,
+    liczba_watkow: int = 4,
+    rozmiar_porcji: int = ROZMIAR_PORCJI,
+) -> List[int]:
+    """
+    Zlicza liczby z dowolnego iterowalnego (generatora, pliku, zapytania...).
+
+    Returns:
+        Lista liczników licz[i] = ilość wystąpień liczby i
+    """
+    iterator = iter(iterowalne)
+    porcje = iter(lambda: list(islice(iterator, rozmiar_porcji)), [])
+
+    def zlicz_liste(porcja, N):
+        if NUMPY_DOSTEPNY:
+            porcja = jako_tablica(porcja)
+        return zlicz_w_fragmencie(porcja, 0, len(porcja), N)
+
+    return zlicz_porcjami(porcje, zlicz_liste, N, liczba_watkow, 2 * liczba_watkow)
+
+
+def _wczytaj_do(plik, bufor) -> int:
+    """Wypełnia bufor z pliku (readinto może zwracać mniej, np. z potoku)"""
+    widok = memoryview(bufor)
+    wczytane = 0
+    while wczytane < len(bufor):
+        n = plik.readinto(widok[wczytane:])
+        if not n:
+            break
+        wczytane += n
+    widok.release()
+    return wczytane
+
+
+def zlicz_plik_binarny(
+    plik,
+    N: int,
+    liczba_watkow: int = 4,
+    kod: str = "I",
+    rozmiar_porcji: int = ROZMIAR_PORCJI,
+) -> List[int]:
+    """
+    Zlicza liczby zapisane binarnie jako little-endian (kod typu jak w array).
+
+    Porcje wczytywane są przez readinto do puli wielokrotnie używanych
+    buforów - wątek oddaje bufor do puli po zliczeniu porcji. (mmap nie
+    ogranicza pamięci rezydentnej: odczytane strony pliku pozostają w RSS.)
+
+    Args:
+        plik: Ścieżka lub plik binarny (np. sys.stdin.buffer)
+        N: Maksymalna wartość liczb + 1
+        liczba_watkow: Liczba wątków zliczających
+        kod: Typ elementu ("B", "H", "I", "Q")
+        rozmiar_porcji: Liczba elementów w porcji
+
+    Returns:
+        Lista liczników licz[i] = ilość wystąpień liczby i
+    """
+    if isinstance(plik, str):
+        with open(plik, "rb") as otwarty:
+            return zlicz_plik_binarny(otwarty, N, liczba_watkow, kod, rozmiar_porcji)
+
+    rozmiar_elementu = array(kod).itemsize
+    glebokosc_kolejki = 2 * liczba_watkow
+    # Bufor jest w kolejce, u wątku albo w puli wolnych - nigdy więcej niż tyle
+    wolne = queue.Queue()
+    for _ in range(liczba_watkow + glebokosc_kolejki + 1):
+        wolne.put(bytearray(rozmiar_porcji * rozmiar_elementu))
+
+    def porcje():
+        while True:
+            bufor = wolne.get()
+            wczytane = _wczytaj_do(plik, bufor)
+            if wczytane % rozmiar_elementu:
+                raise ValueError("Rozmiar danych nie jest wielokrotnością elementu")
+            if wczytane == 0:
+                return
+            yield bufor, wczytane
+
+    def zlicz_bufor(porcja, N):
+        bufor, wczytane = porcja
+        try:
+            if NUMPY_DOSTEPNY:
+                dane = np.frombuffer(
+                    bufor, dtype="<" + kod, count=wczytane // rozmiar_elementu
+                )
+                return zlicz_w_fragmencie(dane.astype(np.intp), 0, len(dane), N)
+            if sys.byteorder == "big":
+                dane = array(kod, bufor[:wczytane])
+                dane.byteswap()
+                return zlicz_w_fragmencie(dane, 0, len(dane), N)
+            with memoryview(bufor)[:wczytane].cast(kod) as dane:
+                return zlicz_w_fragmencie(dane, 0, len(dane), N)
+        finally:
+            wolne.put(bufor)
+
+    return zlicz_porcjami(porcje(), zlicz_bufor, N, liczba_watkow, glebokosc_kolejki)
+
+
+def zlicz_plik_tekstowy(
+    plik,
+    N: int,
+    liczba_watkow: int = 4,
+    rozmiar_bloku: int = ROZMIAR_BLOKU,
+) -> List[int]:
+    """
+    Zlicza liczby z pliku tekstowego (jedna liczba w wierszu).
+
+    Plik czytany jest blokami bajtów przyciętymi do ostatniego znaku nowej
+    linii; niepełny wiersz przechodzi do następnego bloku.
+
+    Args:
+        plik: Ścieżka lub plik binarny (np. sys.stdin.buffer)
+        N: Maksymalna wartość liczb + 1
+        liczba_watkow: Liczba wątków zliczających
+        rozmiar_bloku: Rozmiar bloku w bajtach
+
+    Returns:
+        Lista liczników licz[i] = ilość wystąpień liczby i
+    """
+    if isinstance(plik, str):
+        with open(plik, "rb") as otwarty:
+            return zlicz_plik_tekstowy(otwarty, N, liczba_watkow, rozmiar_bloku)
+
+    def porcje():
+        reszta = b""
+        while True:
+            blok = plik.read(rozmiar_bloku)
+            if not blok:
+                if reszta.strip():
+                    yield reszta
+                return
+            blok = reszta + blok
+            koniec_wiersza = blok.rfind(b"\n") + 1
+            reszta = blok[koniec_wiersza:]
+            if koniec_wiersza:
+                yield blok[:koniec_wiersza]
+
+    def zlicz_blok(blok, N):
+        if NUMPY_DOSTEPNY:
+            # Błędny wiersz: ValueError (starsze NumPy przerywały po cichu),
+            # pusty wiersz jest pomijany - w obu razach blok parsowany jest
+            # wolniej, wiersz po wierszu, a int() zgłasza błędną wartość
+            try:
+                dane = np.fromstring(blok, dtype=np.intp, sep=" ")
+            except ValueError:
+                dane = None
+            if dane is not None and len(dane) == blok.count(b"\n") + (
+                not blok.endswith(b"\n")
+            ):
+                return zlicz_w_fragmencie(dane, 0, len(dane), N)
+        dane = array("q", map(int, blok.split()))
+        return zlicz_w_fragmencie(dane, 0, len(dane), N)
+
+    return zlicz_porcjami(porcje(), zlicz_blok, N, liczba_watkow, 2 * liczba_watkow)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Strumieniowe zliczanie liczb")
+    parser.add_argument("N", type=int, help="maksymalna wartość liczb + 1")
+    parser.add_argument(
+        "plik", nargs="?", default="-", help="plik wejściowy (- = stdin)"
+    )
+    parser.add_argument(
+        "--format", choices=("binarny", "tekst"), default="tekst", help="format danych"
+    )
+    parser.add_argument("--kod", default="I", help="typ elementu pliku binarnego")
+    parser.add_argument("-w", "--watki", type=int, default=4, help="liczba wątków")
+    args = parser.parse_args()
+
+    plik = sys.stdin.buffer if args.plik == "-" else args.plik
+    if args.format == "binarny":
+        wynik = zlicz_plik_binarny(plik, args.N, args.watki, args.kod)
+    else:
+        wynik = zlicz_plik_tekstowy(plik, args.N, args.watki)
+    print(wynik)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Trwały indeks liczb pierwszych w pliku mapowanym w pamięci (mmap).
+
+Plik zawiera nagłówek i kolejne bloki. Każdy blok to 8-bajtowy licznik
+liczb pierwszych we wszystkich wcześniejszych blokach (punkt kontrolny)
+oraz bitmapa koła mod 30 w formacie z modułu sito (bajt = 30 liczb).
+Dzięki punktom kontrolnym pi(x) wymaga zliczenia bitów w najwyżej jednym
+bloku. Indeks jest rozszerzany o nowe bloki, gdy zapytanie wykracza poza
+pokryty zakres.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from math import isqrt
+
+from sito import (
+    BAJTY_SEGMENTU,
+    KOLO,
+    MALE_PIERWSZE,
+    liczby_z_bitmapy,
+    pierwsze_bazowe,
+    sito_bitmapa,
+)
+
+MAGIA = b"PIERWSZE"
+WERSJA = 1
+# magia, wersja, bajty bitmapy w bloku, liczba bloków, liczba pierwszych w bitmapach
+NAGLOWEK = struct.Struct("<8sIIQQ")
+PUNKT_KONTROLNY = struct.Struct("<Q")
+
+# Liczby bazowe sita przekazywane raz do każdego procesu (initializer puli),
+# a nie z każdym zadaniem bloku
+_bazowe_procesu = None
+
+
+def _inicjuj_proces(bazowe):
+    """Inicjalizacja procesu roboczego - zapamiętuje współdzielone liczby bazowe"""
+    global _bazowe_procesu
+    _bazowe_procesu = bazowe
+
+
+def _sito_bloku(baza, bajty_bloku):
+    """Zadanie procesu roboczego: bitmapa bloku od `baza`"""
+    return sito_bitmapa(baza, bajty_bloku, _bazowe_procesu)
+
+
+class IndeksPierwszych:
+    """Indeks liczb pierwszych zapisany w pliku i odczytywany przez mmap"""
+
+    def __init__(self, sciezka, bajty_bloku=BAJTY_SEGMENTU):
+        self.sciezka = sciezka
+
+        if not os.path.exists(sciezka) or os.path.getsize(sciezka) == 0:
+            with open(sciezka, "wb") as plik:
+                plik.write(NAGLOWEK.pack(MAGIA, WERSJA, bajty_bloku, 0, 0))
+
+        self.plik = open(sciezka, "r+b")
+        magia, wersja, self.bajty_bloku, self.liczba_blokow, self.liczba_bitow = (
+            NAGLOWEK.unpack(self.plik.read(NAGLOWEK.size))
+        )
+        if magia != MAGIA or wersja != WERSJA:
+            self.plik.close()
+            raise ValueError(f"{sciezka} nie jest plikiem indeksu liczb pierwszych")
+
+        self.rozmiar_bloku = PUNKT_KONTROLNY.size + self.bajty_bloku
+        self.mapa = None
+        self._mapuj()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.zamknij()
+
+    def zamknij(self):
+        """Zwalnia mapowanie i zamyka plik"""
+        if self.mapa is not None:
+            self.mapa.close()
+            self.mapa = None
+        self.plik.close()
+
+    def _mapuj(self):
+        """(Ponownie) mapuje cały plik w pamięci - po każdym rozszerzeniu"""
+        if self.mapa is not None:
+            self.mapa.close()
+        self.mapa = mmap.mmap(self.plik.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def granica(self):
+        """Największa liczba objęta indeksem (-1 dla pustego indeksu)"""
+        return 30 * self.bajty_bloku * self.liczba_blokow - 1
+
+    def rozszerz(self, do, workers=1):
+        """
+        Dopisuje bloki, aż indeks obejmie liczbę `do`.
+
+        Sito liczy tylko brakujące bloki; przy workers > 1 bloki są
+        przesiewane równolegle w puli procesów i zapisywane po kolei.
+        """
+        if do <= self.granica:
+            return
+
+        liczby_w_bloku = 30 * self.bajty_bloku
+        nowe_bloki = (do - self.granica - 1) // liczby_w_bloku + 1
+        pierwsza_baza = self.granica + 1
+        bazy = range(
+            pierwsza_baza, pierwsza_baza + nowe_bloki * liczby_w_bloku, liczby_w_bloku
+        )
+        bazowe = pierwsze_bazowe(isqrt(bazy[-1] + liczby_w_bloku))
+
+        pula = None
+        if workers > 1:
+            pula = ProcessPoolExecutor(
+                max_workers=workers, initializer=_inicjuj_proces, initargs=(bazowe,)
+            )
+        # Mapowanie obejmowałoby obcinany koniec pliku
+        self.mapa.close()
+        self.mapa = None
+        try:
+            # Partiami, aby nie trzymać w pamięci bitmap całego rozszerzenia
+            partia = max(workers, 1) * 4
+            for i in range(0, len(bazy), partia):
+                bazy_partii = bazy[i : i + partia]
+                if pula is not None:
+                    bitmapy = pula.map(
+                        _sito_bloku, bazy_partii, repeat(self.bajty_bloku)
+                    )
+                else:
+                    bitmapy = (
+                        sito_bitmapa(baza, self.bajty_bloku, bazowe)
+                        for baza in bazy_partii
+                    )
+
+                # Bajty po ostatnim zatwierdzonym bloku (przerwany zapis) są
+                # odcinane - bloki muszą leżeć tam, gdzie wskazuje nagłówek
+                self.plik.seek(NAGLOWEK.size + self.liczba_blokow * self.rozmiar_bloku)
+                self.plik.truncate()
+                for bitmapa in bitmapy:
+                    self.plik.write(PUNKT_KONTROLNY.pack(self.liczba_bitow))
+                    self.plik.write(bitmapa)
+                    self.liczba_bitow += int.from_bytes(bitmapa, "little").bit_count()
+                    self.liczba_blokow += 1
+
+                # Nagłówek zapisywany po każdej partii - plik zawsze jest spójny
+                self.plik.seek(0)
+                self.plik.write(
+                    NAGLOWEK.pack(
+                        MAGIA,
+                        WERSJA,
+                        self.bajty_bloku,
+                        self.liczba_blokow,
+                        self.liczba_bitow,
+                    )
+                )
+                self.plik.flush()
+        finally:
+            if pula is not None:
+                pula.shutdown()
+            self._mapuj()
+
+    def _bitmapa(self, od_bajtu, do_bajtu):
+        """Bajty bitmapy [od_bajtu, do_bajtu) złożone z kolejnych bloków"""
+        czesci = []
+        while od_bajtu < do_bajtu:
+            blok, przesuniecie = divmod(od_bajtu, self.bajty_bloku)
+            ile = min(self.bajty_bloku - przesuniecie, do_bajtu - od_bajtu)
+            start = NAGLOWEK.size + blok * self.rozmiar_bloku + PUNKT_KONTROLNY.size
+            czesci.append(self.mapa[start + przesuniecie : start + przesuniecie + ile])
+            od_bajtu += ile
+        return b"".join(czesci)
+
+    def pi(self, x):
+        """Liczba liczb pierwszych <= x (rozszerza indeks w razie potrzeby)"""
+        if x < 2:
+            return 0
+        self.rozszerz(x)
+
+        bajt, reszta = divmod(x, 30)
+        blok, przesuniecie = divmod(bajt, self.bajty_bloku)
+        start = NAGLOWEK.size + blok * self.rozmiar_bloku
+        (przed_blokiem,) = PUNKT_KONTROLNY.unpack_from(self.mapa, start)
+
+        # Pełne bajty bloku przed x oraz bity bajtu z x dla reszt <= x % 30
+        pelne = self.mapa[
+            start + PUNKT_KONTROLNY.size : start + PUNKT_KONTROLNY.size + przesuniecie
+        ]
+        ostatni = self.mapa[start + PUNKT_KONTROLNY.size + przesuniecie]
+        maska = (1 << bisect_right(KOLO, reszta)) - 1
+
+        male = sum(1 for p in MALE_PIERWSZE if p <= x)
+        return (
+            male
+            + przed_blokiem
+            + int.from_bytes(pelne, "little").bit_count()
+            + (ostatni & maska).bit_count()
+        )
+
+    def policz(self, poczatek, koniec):
+        """Liczba liczb pierwszych w [poczatek, koniec]"""
+        if koniec < poczatek:
+            return 0
+        return self.pi(koniec) - self.pi(poczatek - 1)
+
+    def pierwsze(self, poczatek, koniec):
+        """Rosnący bufor array('Q') liczb pierwszych z [poczatek, koniec]"""
+        if koniec < 2 or koniec < poczatek:
+            return array("Q")
+        self.rozszerz(koniec)
+
+        poczatek = max(poczatek, 0)
+        od_bajtu = poczatek // 30
+        liczby = liczby_z_bitmapy(
+            self._bitmapa(od_bajtu, koniec // 30 + 1), 30 * od_bajtu
+        )
+        male = array("Q", [p for p in MALE_PIERWSZE if poczatek <= p <= koniec])
+        return (
+            male + liczby[bisect_left(liczby, poczatek) : bisect_right(liczby, koniec)]
+        )
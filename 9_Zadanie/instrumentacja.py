@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Instrumentacja wątków wyszukujących liczby pierwsze.
+
+Pomiary zapisują fazy pracy każdego wątku (obliczenia, oczekiwanie na lock,
+sekcja krytyczna, oczekiwanie na barierze) oraz liczniki przetworzonych
+kandydatów i znalezionych liczb. Dziennik buforuje komunikaty, aby
+wypisywanie na konsolę nie zakłócało pomiarów czasu.
+"""
+
+import json
+import sys
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+
+FAZY = ("obliczenia", "oczekiwanie_na_lock", "sekcja_krytyczna", "bariera")
+
+
+class Dziennik:
+    """
+    Bufor komunikatów konsoli.
+
+    Wątki jedynie dopisują tekst do kolejki (deque.append nie wymaga locka),
+    a wypisanie następuje dopiero po zakończeniu obliczeń.
+    """
+
+    def __init__(self):
+        self._wpisy = deque()
+
+    def zapisz(self, *args, sep=" ", end="\n"):
+        """Dopisuje komunikat (argumenty jak w print())"""
+        self._wpisy.append(sep.join(map(str, args)) + end)
+
+    def oproznij(self, plik=None):
+        """Wypisuje i usuwa zbuforowane komunikaty"""
+        plik = plik or sys.stdout
+        while self._wpisy:
+            plik.write(self._wpisy.popleft())
+        plik.flush()
+
+
+class Pomiary:
+    """
+    Rejestr faz i liczników wątków.
+
+    Wyłączone pomiary (wlaczone=False) zwracają pusty kontekst, więc ich
+    koszt w wątkach jest pomijalny.
+    """
+
+    def __init__(self, wlaczone=True):
+        self.wlaczone = wlaczone
+        self.start = time.perf_counter()
+        # Zdarzenia (id pracownika, faza, początek, koniec) - list.append jest atomowe
+        self.zdarzenia = []
+        self.liczniki = defaultdict(lambda: defaultdict(int))
+
+    def faza(self, id_pracownika, nazwa):
+        """Kontekst mierzący czas trwania fazy `nazwa` dla danego pracownika"""
+        if not self.wlaczone:
+            return nullcontext()
+        return self._faza(id_pracownika, nazwa)
+
+    @contextmanager
+    def _faza(self, id_pracownika, nazwa):
+        poczatek = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.zdarzenia.append((id_pracownika, nazwa, poczatek, time.perf_counter()))
+
+    def dodaj(self, id_pracownika, licznik, wartosc):
+        """Zwiększa licznik (np. "kandydaci", "pierwsze") pracownika"""
+        if self.wlaczone:
+            self.liczniki[id_pracownika][licznik] += wartosc
+
+    def podsumowanie(self):
+        """
+        Zestawienie pomiarów.
+
+        Returns:
+            Słownik z czasami faz i licznikami każdego pracownika, współczynnikiem
+            niezrównoważenia (max/średnia czasu obliczeń) oraz rozbiciem ścieżki
+            krytycznej - pracownika, który ostatni dotarł do bariery.
+        """
+        pracownicy = {}
+        for id_pracownika, nazwa, poczatek, koniec in self.zdarzenia:
+            dane = pracownicy.setdefault(
+                id_pracownika,
+                {"fazy": dict.fromkeys(FAZY, 0.0), "pierwsza_faza": poczatek},
+            )
+            dane["fazy"][nazwa] = dane["fazy"].get(nazwa, 0.0) + koniec - poczatek
+            dane["pierwsza_faza"] = min(dane["pierwsza_faza"], poczatek)
+            if nazwa == "bariera":
+                dane["dotarcie_do_bariery"] = poczatek
+        for id_pracownika, liczniki in self.liczniki.items():
+            pracownicy.setdefault(id_pracownika, {"fazy": dict.fromkeys(FAZY, 0.0)})
+            pracownicy[id_pracownika].update(liczniki)
+
+        if not pracownicy:
+            return {"pracownicy": {}}
+
+        obliczenia = [dane["fazy"]["obliczenia"] for dane in pracownicy.values()]
+        srednia = sum(obliczenia) / len(obliczenia)
+        niezrownowazenie = max(obliczenia) / srednia if srednia > 0 else 1.0
+
+        # Ścieżka krytyczna: od startu pomiarów do dotarcia ostatniego wątku
+        krytyczny = max(
+            pracownicy,
+            key=lambda i: pracownicy[i].get("dotarcie_do_bariery", 0.0),
+        )
+        dane = pracownicy[krytyczny]
+        koniec = dane.get("dotarcie_do_bariery", self.start)
+        fazy = {
+            nazwa: czas for nazwa, czas in dane["fazy"].items() if nazwa != "bariera"
+        }
+        sciezka = {
+            "pracownik": str(krytyczny),
+            "dlugosc": koniec - self.start,
+            "uruchomienie": dane.get("pierwsza_faza", self.start) - self.start,
+            **fazy,
+        }
+        sciezka["inne"] = max(
+            sciezka["dlugosc"] - sciezka["uruchomienie"] - sum(fazy.values()), 0.0
+        )
+
+        for dane in pracownicy.values():
+            dane.pop("pierwsza_faza", None)
+            dane.pop("dotarcie_do_bariery", None)
+
+        return {
+            "pracownicy": {str(i): dane for i, dane in pracownicy.items()},
+            "niezrownowazenie": niezrownowazenie,
+            "sciezka_krytyczna": sciezka,
+        }
+
+    def zapisz_json(self, sciezka):
+        """Zapisuje podsumowanie pomiarów do pliku JSON"""
+        with open(sciezka, "w") as plik:
+            json.dump(self.podsumowanie(), plik, indent=2)
+            plik.write("\n")
+
+    def zapisz_slad(self, sciezka):
+        """Zapisuje fazy w formacie Chrome trace-event (chrome://tracing, Perfetto)"""
+        zdarzenia = [
+            {
+                "name": nazwa,
+                "ph": "X",
+                "ts": (poczatek - self.start) * 1e6,
+                "dur": (koniec - poczatek) * 1e6,
+                "pid": 0,
+                "tid": str(id_pracownika),
+            }
+            for id_pracownika, nazwa, poczatek, koniec in self.zdarzenia
+        ]
+        with open(sciezka, "w") as plik:
+            json.dump({"traceEvents": zdarzenia, "displayTimeUnit": "ms"}, plik)
+
+
+def wypisz_podsumowanie(podsumowanie, wypisz=print):
+    """Wypisuje czytelne podsumowanie pomiarów"""
+    if not podsumowanie["pracownicy"]:
+        return
+
+    wypisz("\n=== Pomiary faz ===")
+    for id_pracownika, dane in podsumowanie["pracownicy"].items():
+        fazy = ", ".join(f"{nazwa} {czas:.4f}s" for nazwa, czas in dane["fazy"].items())
+        wypisz(
+            f"Wątek {id_pracownika}: {fazy}; kandydaci {dane.get('kandydaci', 0)}, "
+            f"pierwsze {dane.get('pierwsze', 0)}"
+        )
+    wypisz(f"Niezrównoważenie (max/średnia): {podsumowanie['niezrownowazenie']:.2f}")
+
+    sciezka = podsumowanie["sciezka_krytyczna"]
+    skladniki = ", ".join(
+        f"{nazwa} {czas:.4f}s"
+        for nazwa, czas in sciezka.items()
+        if nazwa not in ("pracownik", "dlugosc")
+    )
+    wypisz(
+        f"Ścieżka krytyczna (wątek {sciezka['pracownik']}, "
+        f"{sciezka['dlugosc']:.4f}s): {skladniki}"
+    )
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Biblioteka klienta usługi zapytań o liczby pierwsze (serwer.py).
+
+Przykład:
+    with KlientPierwszych() as klient:
+        klient.policz(2, 10**9)
+        klient.lista(100, 200)
+        klient.czy_pierwsze([97, 2**61 - 1])
+"""
+
+import socket
+import sys
+
+from protokol import (
+    GNIAZDO,
+    STATUS_OK,
+    ZAPYTANIE_COUNT,
+    ZAPYTANIE_IS_PRIME,
+    ZAPYTANIE_LIST,
+    dekoduj_odpowiedz,
+    koduj_zapytanie,
+)
+
+
+class KlientPierwszych:
+    """Połączenie z usługą; jedno połączenie obsługuje dowolnie wiele zapytań"""
+
+    def __init__(self, sciezka=GNIAZDO):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(sciezka)
+        self.plik = self.sock.makefile("rb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.zamknij()
+
+    def zamknij(self):
+        self.plik.close()
+        self.sock.close()
+
+    def _zapytaj(self, typ, **argumenty):
+        self.sock.sendall(koduj_zapytanie(typ, **argumenty))
+        linia = self.plik.readline()
+        if not linia:
+            raise ConnectionError("Usługa zamknęła połączenie")
+        odpowiedz = dekoduj_odpowiedz(linia)
+        if odpowiedz["status"] != STATUS_OK:
+            raise ValueError(odpowiedz["komunikat"])
+        return odpowiedz["wynik"]
+
+    def policz(self, poczatek, koniec):
+        """Liczba liczb pierwszych w [poczatek, koniec]"""
+        return self._zapytaj(ZAPYTANIE_COUNT, od=poczatek, do=koniec)
+
+    def lista(self, poczatek, koniec):
+        """Rosnąca lista liczb pierwszych z [poczatek, koniec]"""
+        return self._zapytaj(ZAPYTANIE_LIST, od=poczatek, do=koniec)
+
+    def czy_pierwsze(self, liczby):
+        """Lista wartości logicznych - czy kolejne liczby są pierwsze"""
+        return self._zapytaj(ZAPYTANIE_IS_PRIME, liczby=list(liczby))
+
+
+def main():
+    """Użycie: klient.py count|list OD DO  lub  klient.py is_prime LICZBA..."""
+    if len(sys.argv) < 3:
+        print(main.__doc__)
+        sys.exit(1)
+
+    typ, argumenty = sys.argv[1], [int(a) for a in sys.argv[2:]]
+    with KlientPierwszych() as klient:
+        if typ == ZAPYTANIE_COUNT:
+            print(klient.policz(*argumenty))
+        elif typ == ZAPYTANIE_LIST:
+            print(klient.lista(*argumenty))
+        elif typ == ZAPYTANIE_IS_PRIME:
+            print(klient.czy_pierwsze(argumenty))
+        else:
+            print(main.__doc__)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Zliczanie liczb pierwszych bez ich wyznaczania - algorytm Lucy_Hedgehog.
+
+S(v, p) to liczba liczb z [2, v], które są pierwsze lub nie mają dzielnika
+<= p. Dla kolejnych liczb pierwszych p i v >= p*p:
+
+    S(v, p) = S(v, p-1) - (S(v // p, p-1) - S(p-1, p-1))
+
+Potrzebne są tylko wartości v postaci x // i (ok. 2*sqrt(x) różnych), więc
+pi(x) = S(x, sqrt(x)) kosztuje O(x^(3/4)) czasu i O(sqrt(x)) pamięci.
+Tablica `male` przechowuje S(k) dla k <= sqrt(x), a `duze` - S(x // i).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from math import isqrt
+
+from sito import NUMPY_DOSTEPNY, np, pierwsze_bazowe
+
+# Minimalna liczba elementów etapu, od której opłaca się dzielić go na wątki
+PROG_ROWNOLEGLOSCI = 1 << 16
+
+
+def pi(x, workers=1):
+    """
+    Liczba liczb pierwszych <= x.
+
+    Z NumPy każdy etap algorytmu jest wektoryzowany, a duże etapy dzielone
+    pomiędzy `workers` wątków (NumPy zwalnia GIL). Bez NumPy działa
+    sekwencyjna wersja czysto pythonowa.
+    """
+    if x < 2:
+        return 0
+    if NUMPY_DOSTEPNY:
+        return _pi_numpy(x, workers)
+    return _pi_python(x)
+
+
+def _pi_python(x):
+    """Wersja czysto pythonowa (aktualizacje w miejscu, w kolejności bezpiecznej)"""
+    r = isqrt(x)
+    male = [max(k - 1, 0) for k in range(r + 1)]
+    duze = [0] + [x // i - 1 for i in range(1, r + 1)]
+
+    # S(p-1, p-1) = liczba liczb pierwszych mniejszych od p = indeks p na liście
+    for sp, p in enumerate(pierwsze_bazowe(r)):
+        kwadrat = p * p
+        granica_i = min(r, x // kwadrat)
+        granica_d = min(granica_i, r // p)
+
+        # duze[i * p] (i * p > i) i male[...] nie są jeszcze zmienione w tym etapie
+        for i in range(1, granica_d + 1):
+            duze[i] -= duze[i * p] - sp
+        for i in range(granica_d + 1, granica_i + 1):
+            duze[i] -= male[x // (i * p)] - sp
+        # Od góry, aby male[k // p] zawierało wartość z poprzedniego etapu
+        for k in range(r, kwadrat - 1, -1):
+            male[k] -= male[k // p] - sp
+
+    return duze[1]
+
+
+def _w_czesciach(pula, workers, oblicz, start, stop):
+    """
+    Wylicza oblicz(a, b) dla [start, stop), dzieląc duże zakresy pomiędzy wątki.
+
+    Returns:
+        Lista par (a, wartości dla [a, b))
+    """
+    if pula is None or stop - start < PROG_ROWNOLEGLOSCI:
+        return [(start, oblicz(start, stop))]
+    krok = -(-(stop - start) // workers)
+    granice = [(a, min(a + krok, stop)) for a in range(start, stop, krok)]
+    return list(zip((a for a, _ in granice), pula.map(lambda ab: oblicz(*ab), granice)))
+
+
+def _pi_numpy(x, workers):
+    """
+    Wersja na tablicach NumPy.
+
+    W każdym etapie najpierw (równolegle) wyliczane są wszystkie nowe
+    wartości z tablic poprzedniego etapu, a dopiero po zakończeniu odczytów
+    są one zapisywane - zakończenie map() pełni rolę bariery.
+    """
+    r = isqrt(x)
+    indeksy = np.arange(r + 1, dtype=np.int64)
+    male = indeksy - 1
+    male[0] = 0
+    duze = np.zeros(r + 1, dtype=np.int64)
+    duze[1:] = x // indeksy[1:] - 1
+
+    pula = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for sp, p in enumerate(pierwsze_bazowe(r)):
+            kwadrat = p * p
+            granica_i = min(r, x // kwadrat)
+            granica_d = min(granica_i, r // p)
+
+            def duze_z_duzych(a, b):
+                return duze[a:b] - (duze[a * p : b * p : p] - sp)
+
+            def duze_z_malych(a, b):
+                return duze[a:b] - (male[x // (indeksy[a:b] * p)] - sp)
+
+            def male_z_malych(a, b):
+                return male[a:b] - (male[indeksy[a:b] // p] - sp)
+
+            nowe_duze = _w_czesciach(pula, workers, duze_z_duzych, 1, granica_d + 1)
+            nowe_duze += _w_czesciach(
+                pula, workers, duze_z_malych, granica_d + 1, granica_i + 1
+            )
+            nowe_male = []
+            if kwadrat <= r:
+                nowe_male = _w_czesciach(pula, workers, male_z_malych, kwadrat, r + 1)
+
+            for a, wartosci in nowe_duze:
+                duze[a : a + len(wartosci)] = wartosci
+            for a, wartosci in nowe_male:
+                male[a : a + len(wartosci)] = wartosci
+    finally:
+        if pula is not None:
+            pula.shutdown()
+
+    return int(duze[1])
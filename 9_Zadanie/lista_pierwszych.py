@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Zwarty kontener na wyniki wyszukiwania liczb pierwszych.
+
+Liczby przechowywane są w buforze array('Q') - 8 bajtów na liczbę zamiast
+ok. 36 bajtów (wskaźnik + obiekt int) w zwykłej liście. Wątki dodają całe
+bufory segmentów, które są sklejane w kolejności rosnącej bez tworzenia
+obiektów int dla pojedynczych elementów.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+TYP = "Q"
+# Powyżej tej długości tekst kontenera jest skracany
+DLUGOSC_WYPISU = 1000
+
+
+def jako_bufor(liczby):
+    """Zwraca array('Q') z liczbami (bez kopiowania, jeśli to już taki bufor)"""
+    if isinstance(liczby, array) and liczby.typecode == TYP:
+        return liczby
+    return array(TYP, liczby)
+
+
+class ListaPierwszych:
+    """Rosnący ciąg liczb pierwszych w buforze array('Q')"""
+
+    def __init__(self, liczby=()):
+        self._dane = jako_bufor(liczby)
+        # Segmenty (poczatek, bufor) dodane przez wątki, czekające na sklejenie
+        self._segmenty = []
+
+    def dodaj_segment(self, poczatek, bufor):
+        """
+        Dodaje rosnący bufor liczb z podprzedziału zaczynającego się od `poczatek`.
+
+        Segmenty mogą być dodawane w dowolnej kolejności, ale nie mogą na
+        siebie zachodzić.
+        """
+        self._segmenty.append((poczatek, jako_bufor(bufor)))
+
+    def scal(self):
+        """Skleja dodane segmenty w jeden rosnący bufor (kopiowanie blokami)"""
+        if not self._segmenty:
+            return
+        if self._dane:
+            self._segmenty.append((self._dane[0], self._dane))
+        self._segmenty.sort(key=lambda segment: segment[0])
+
+        dane = array(TYP)
+        for _, bufor in self._segmenty:
+            dane.extend(bufor)
+        self._dane = dane
+        self._segmenty = []
+
+    @property
+    def bufor(self):
+        """Bufor array('Q') z wszystkimi liczbami"""
+        self.scal()
+        return self._dane
+
+    @property
+    def rozmiar_w_bajtach(self):
+        """Pamięć zajmowana przez liczby"""
+        self.scal()
+        return self._dane.itemsize * len(self._dane)
+
+    def __len__(self):
+        self.scal()
+        return len(self._dane)
+
+    def __getitem__(self, indeks):
+        self.scal()
+        if isinstance(indeks, slice):
+            return ListaPierwszych(self._dane[indeks])
+        return self._dane[indeks]
+
+    def __iter__(self):
+        self.scal()
+        return iter(self._dane)
+
+    def __contains__(self, liczba):
+        i = bisect_left(self.bufor, liczba)
+        return i < len(self._dane) and self._dane[i] == liczba
+
+    def __eq__(self, inne):
+        if isinstance(inne, ListaPierwszych):
+            return self.bufor == inne.bufor
+        try:
+            return self.bufor.tolist() == list(inne)
+        except TypeError:
+            return NotImplemented
+
+    def __str__(self):
+        self.scal()
+        if len(self._dane) <= DLUGOSC_WYPISU:
+            return str(self._dane.tolist())
+        poczatek = ", ".join(map(str, self._dane[:5]))
+        koniec = ", ".join(map(str, self._dane[-5:]))
+        return f"[{poczatek}, ..., {koniec}] ({len(self._dane)} liczb)"
+
+    def __repr__(self):
+        return f"ListaPierwszych({self})"
+
+    def ranga(self, x):
+        """Liczba elementów <= x"""
+        return bisect_right(self.bufor, x)
+
+    def wybierz(self, k):
+        """k-ty element (numerowany od 0) - odwrotność rangi"""
+        self.scal()
+        if not 0 <= k < len(self._dane):
+            raise IndexError("Indeks poza zakresem listy liczb pierwszych")
+        return self._dane[k]
+
+    def w_przedziale(self, poczatek, koniec):
+        """Elementy z [poczatek, koniec] jako nowa ListaPierwszych"""
+        dane = self.bufor
+        return ListaPierwszych(
+            dane[bisect_left(dane, poczatek) : bisect_right(dane, koniec)]
+        )
@@ -1,18 +1,80 @@
 #!/usr/bin/env python3
 
+import argparse
+import csv
+import json
+import os
+import statistics
+import sys
 import threading
 import time
-from threading import Barrier, Lock
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import compress
+from math import gcd, isqrt, log, prod
+from threading import Barrier, BrokenBarrierError, Lock
+
+from indeks import IndeksPierwszych
+from instrumentacja import Dziennik, Pomiary, wypisz_podsumowanie
+from liczenie_pi import pi
+from lista_pierwszych import ListaPierwszych, jako_bufor
+from sito import (
+    BAJTY_SEGMENTU,
+    NUMPY_DOSTEPNY,
+    pierwsze_bazowe,
+    sito_segmentowe,
+    sito_segmentowe_numpy,
+)
 
 # Parametry
 l = 2
 r = 20
 liczba_watkow = 4
+# Metoda wyszukiwania: "sito" (segmentowe sito mod 30), "numpy" (sito na
+# tablicach NumPy, jeśli pakiet jest zainstalowany), "mr" (test
+# Millera-Rabina dla każdej liczby), "proba" (dzielenie próbne, wersja
+# referencyjna do porównywania wyników) lub "auto" (wybór wg przedziału)
+metoda = "auto"
+# Tryb wykonania: "watki" (threading, ograniczone przez GIL) lub "procesy"
+# (ProcessPoolExecutor, wykorzystuje wszystkie rdzenie)
+tryb = "watki"
+# Przydział pracy: None - jeden stały podprzedział na wątek; liczba - rozmiar
+# porcji pobieranych dynamicznie ze wspólnego kursora
+rozmiar_porcji = None
+# Czy rozdawać porcje od największych liczb (najdroższe testy) do najmniejszych
+najdrozsze_najpierw = False
+# Ścieżka trwałego indeksu liczb pierwszych (None - bez indeksu); z indeksem
+# liczona jest tylko część zakresu, której indeks jeszcze nie obejmuje
+plik_indeksu = None
+# Czy wypisywać komunikaty o postępie (wyłączane przez CLI i benchmark)
+komunikaty = True
+# Pliki z pomiarami faz wątków: podsumowanie JSON i ślad Chrome trace-event
+# (None - bez instrumentacji)
+plik_pomiarow = None
+plik_sladu = None
 
-# Wspólna lista liczb pierwszych (wymaga synchronizacji)
-pierwsze = []
+# Wspólna lista liczb pierwszych (wymaga synchronizacji); wątki dodają do niej
+# całe bufory array('Q') swoich podprzedziałów
+pierwsze = ListaPierwszych()
 # Lock do wzajemnego wykluczania przy dodawaniu do listy
 lock = Lock()
+# Statystyki obciążenia: id wątku/procesu -> {"porcje": ..., "obliczenia": sekundy}
+statystyki = {}
+# Pomiary faz wątków (włączane, gdy podano plik_pomiarow lub plik_sladu)
+pomiary = Pomiary(wlaczone=False)
+# Bufor komunikatów - wypisywany po zakończeniu obliczeń
+dziennik = Dziennik()
+
+
+def komunikat(*args, **kwargs):
+    """
+    Odpowiednik print() wyłączany parametrem `komunikaty`.
+
+    Komunikaty trafiają do bufora `dziennik` i są wypisywane po obliczeniach,
+    więc wątki nie czekają na konsolę.
+    """
+    if komunikaty:
+        dziennik.zapisz(*args, **kwargs)
 
 
 def pierwsza(k):
@@ -32,7 +94,145 @@ def pierwsza(k):
     return True
 
 
-def szukaj_pierwszych(poczatek, koniec, barrier, id_watku):
+# Małe liczby pierwsze do wstępnego odsiewu przed testem Millera-Rabina
+MALE_DZIELNIKI = tuple(pierwsze_bazowe(100))
+ILOCZYN_MALYCH = prod(MALE_DZIELNIKI)
+# Świadkowie dający deterministyczny wynik dla k < GRANICA_MR (obejmuje 2^64):
+# 13 pierwszych liczb pierwszych, do 41 (bez 41 granica to 318665857834031151167461)
+SWIADKOWIE_MR = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+GRANICA_MR = 3317044064679887385961981
+
+
+def pierwsza_mr(k):
+    """
+    Deterministyczny test Millera-Rabina (dla k < GRANICA_MR, w tym całe 64 bity).
+
+    Liczby z małym dzielnikiem odrzucane są jednym wywołaniem gcd, zanim
+    zostanie wykonane potęgowanie modularne.
+    """
+    if k < 2:
+        return False
+    if gcd(k, ILOCZYN_MALYCH) != 1:
+        return k in MALE_DZIELNIKI
+    if k < 101 * 101:
+        return True
+    if k >= GRANICA_MR:
+        raise ValueError(f"Test nie jest deterministyczny dla k >= {GRANICA_MR}")
+
+    # k - 1 = d * 2^s, d nieparzyste
+    s = ((k - 1) & (1 - k)).bit_length() - 1
+    d = (k - 1) >> s
+
+    for a in SWIADKOWIE_MR:
+        x = pow(a, d, k)
+        if x == 1 or x == k - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % k
+            if x == k - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def is_prime_many(liczby):
+    """
+    Sprawdza pierwszość wielu liczb naraz testem Millera-Rabina.
+
+    Args:
+        liczby: dowolny iterowalny zbiór liczb całkowitych (np. rozproszone kandydaty)
+
+    Returns:
+        Lista wartości logicznych w kolejności wejścia
+    """
+    return [pierwsza_mr(k) for k in liczby]
+
+
+def pierwsze_proba(poczatek, koniec, bazowe=None):
+    """Liczby pierwsze z [poczatek, koniec] wyznaczone dzieleniem próbnym"""
+    return [i for i in range(poczatek, koniec + 1) if pierwsza(i)]
+
+
+def pierwsze_mr(poczatek, koniec, bazowe=None):
+    """Liczby pierwsze z [poczatek, koniec] wyznaczone testem Millera-Rabina"""
+    liczby = range(poczatek, koniec + 1)
+    return list(compress(liczby, is_prime_many(liczby)))
+
+
+# Dostępne metody: funkcja(poczatek, koniec, bazowe) -> rosnąca sekwencja liczb
+# pierwszych (lista lub bufor array('Q'))
+METODY = {
+    "proba": pierwsze_proba,
+    "sito": sito_segmentowe,
+    "mr": pierwsze_mr,
+}
+if NUMPY_DOSTEPNY:
+    METODY["numpy"] = sito_segmentowe_numpy
+
+# Metody korzystające ze współdzielonych liczb bazowych
+METODY_SITOWE = ("sito", "numpy")
+# Względny koszt jednej liczby bazowej w segmencie sita (jednostka: test MR
+# jednej liczby); wersja NumPy wykreśla jednym wycinkiem zamiast ośmiu
+KOSZT_BAZOWEJ = {"sito": 1.0, "numpy": 0.3}
+# Koszt pi(x) Lucy_Hedgehog w jednostkach przesianej liczby: KOSZT_PI * x^(3/4).
+# Zmierzony próg opłacalności spada z x (sito na liczbę drożeje szybciej niż
+# stała w x^(3/4)): ~1.1 przy x = 10^9, ~0.25 przy 10^11 i ~0.13 przy 10^12,
+# podobnie z NumPy i bez. Wartość dobrana dla dużych x, gdzie pomyłka kosztuje
+# sekundy - dla małych x oba sposoby zajmują milisekundy.
+KOSZT_PI = 0.25
+# Wyniki przechowywane są w array('Q') - górna granica (wyłącznie) przedziałów
+GRANICA_ZAKRESU = 1 << 64
+
+
+def wybierz_metode(poczatek, koniec):
+    """
+    Zwraca nazwę metody dla przedziału (rozstrzyga tryb "auto").
+
+    Sito płaci w każdym segmencie stały koszt za każdą liczbę bazową
+    (pi(sqrt(koniec)) ~ sqrt(koniec) / ln(sqrt(koniec))), a Miller-Rabin
+    porównywalny koszt za każdą liczbę z przedziału. Wąskie okno daleko
+    od zera opłaca się więc sprawdzać testem Millera-Rabina. Spośród sit
+    wybierana jest wersja NumPy, gdy pakiet jest dostępny.
+
+    Wyniki wszystkich metod zapisywane są w array('Q'), więc wyszukiwanie
+    w przedziale obejmuje liczby mniejsze od GRANICA_ZAKRESU (2^64) - większe
+    liczby można sprawdzać pojedynczo przez is_prime_many.
+
+    Raises:
+        ValueError: gdy koniec >= GRANICA_ZAKRESU
+    """
+    if koniec >= GRANICA_ZAKRESU:
+        raise ValueError(
+            f"Wyszukiwanie obsługuje liczby mniejsze od 2^64 (podano {koniec})"
+        )
+    if metoda != "auto":
+        return metoda
+    sito = "numpy" if NUMPY_DOSTEPNY else "sito"
+    if koniec < 10**6:
+        return sito
+
+    pierwiastek = isqrt(koniec)
+    koszt_bazy = KOSZT_BAZOWEJ[sito] * pierwiastek / log(pierwiastek)
+    if koniec - poczatek + 1 < koszt_bazy:
+        return "mr"
+    return sito
+
+
+def znajdz_pierwsze(poczatek, koniec, bazowe=None, nazwa_metody=None):
+    """
+    Liczby pierwsze z [poczatek, koniec] wyznaczone metodą z parametrów.
+
+    Args:
+        nazwa_metody: nazwa z METODY; domyślnie globalna `metoda` (także "auto")
+    """
+    nazwa = nazwa_metody or wybierz_metode(poczatek, koniec)
+    return METODY[nazwa](poczatek, koniec, bazowe)
+
+
+def szukaj_pierwszych(
+    poczatek, koniec, barrier, id_watku, bazowe=None, nazwa_metody=None
+):
     """
     Funkcja wątku szukająca liczb pierwszych w swoim podprzedziale.
 
@@ -41,83 +241,844 @@ def szukaj_pierwszych(poczatek, koniec, barrier, id_watku):
         koniec: koniec podprzedziału (włącznie)
         barrier: bariera synchronizacyjna
         id_watku: identyfikator wątku (do logowania)
+        bazowe: współdzielone liczby pierwsze do sqrt(r) (dla metod sitowych)
+        nazwa_metody: metoda wybrana dla całego zakresu
     """
-    print(
+    komunikat(
         f"Wątek {id_watku}: rozpoczynam przeszukiwanie zakresu [{poczatek}, {koniec}]"
     )
 
-    # Lista lokalna dla tego wątku
-    lokalne_pierwsze = []
-
     # Szukanie liczb pierwszych w przydzielonym podprzedziale
-    for i in range(poczatek, koniec + 1):
-        if pierwsza(i):
-            lokalne_pierwsze.append(i)
+    start_obliczen = time.perf_counter()
+    with pomiary.faza(id_watku, "obliczenia"):
+        lokalne_pierwsze = jako_bufor(
+            znajdz_pierwsze(poczatek, koniec, bazowe, nazwa_metody)
+        )
+    czas_obliczen = time.perf_counter() - start_obliczen
+    pomiary.dodaj(id_watku, "kandydaci", max(koniec - poczatek + 1, 0))
+    pomiary.dodaj(id_watku, "pierwsze", len(lokalne_pierwsze))
 
     # Sekcja krytyczna - dodawanie do wspólnej listy (wzajemne wykluczanie)
-    with lock:
-        pierwsze.extend(lokalne_pierwsze)
-        print(
-            f"Wątek {id_watku}: znalazłem {len(lokalne_pierwsze)} liczb pierwszych: {lokalne_pierwsze}"
-        )
+    with pomiary.faza(id_watku, "oczekiwanie_na_lock"):
+        lock.acquire()
+    try:
+        with pomiary.faza(id_watku, "sekcja_krytyczna"):
+            pierwsze.dodaj_segment(poczatek, lokalne_pierwsze)
+            statystyki[id_watku] = {"porcje": 1, "obliczenia": czas_obliczen}
+            komunikat(
+                f"Wątek {id_watku}: znalazłem {len(lokalne_pierwsze)} liczb pierwszych: "
+                f"{ListaPierwszych(lokalne_pierwsze)}"
+            )
+    finally:
+        lock.release()
 
     # Sygnalizacja zakończenia obliczeń przez wątek
-    print(f"Wątek {id_watku}: czekam na barierze...")
-    barrier.wait()
-    print(f"Wątek {id_watku}: przeszedłem przez barierę!")
+    komunikat(f"Wątek {id_watku}: czekam na barierze...")
+    with pomiary.faza(id_watku, "bariera"):
+        barrier.wait()
+    komunikat(f"Wątek {id_watku}: przeszedłem przez barierę!")
 
 
-def main():
-    """Główna funkcja programu"""
-    print(f"=== Wyszukiwanie liczb pierwszych w zakresie [{l}, {r}] ===")
-    print(f"Liczba wątków: {liczba_watkow}\n")
+def podziel_zakres(poczatek, koniec, liczba_czesci):
+    """
+    Dzieli przedział [poczatek, koniec] na równe podprzedziały.
+
+    Ostatni podprzedział obejmuje pozostałą część (resztę z dzielenia).
+
+    Returns:
+        Lista par (poczatek, koniec) - granice włącznie
+    """
+    rozmiar_podprzedzialu = (koniec - poczatek + 1) // liczba_czesci
+    podprzedzialy = []
+    for i in range(liczba_czesci):
+        pocz = poczatek + i * rozmiar_podprzedzialu
+        if i == liczba_czesci - 1:
+            kon = koniec
+        else:
+            kon = pocz + rozmiar_podprzedzialu - 1
+        podprzedzialy.append((pocz, kon))
+    return podprzedzialy
+
+
+# ===== DYNAMICZNY PRZYDZIAŁ PRACY =====
+
+
+def podziel_na_porcje(poczatek, koniec, rozmiar, najdrozsze_najpierw=False):
+    """
+    Dzieli przedział [poczatek, koniec] na porcje o zadanym rozmiarze.
+
+    Koszt sprawdzenia liczby rośnie z jej wielkością, więc przy
+    najdrozsze_najpierw porcje są zwracane od końca przedziału.
+    """
+    if rozmiar < 1:
+        raise ValueError("Rozmiar porcji musi być >= 1")
+
+    porcje = [
+        (pocz, min(pocz + rozmiar - 1, koniec))
+        for pocz in range(poczatek, koniec + 1, rozmiar)
+    ]
+    if najdrozsze_najpierw:
+        porcje.reverse()
+    return porcje
+
+
+class Harmonogram:
+    """
+    Rozdziela porcje pracy pomiędzy wątki.
+
+    Wątki pobierają kolejne porcje ze wspólnego kursora (chronionego lockiem),
+    dopóki nie skończy się praca - szybsze wątki wykonują więcej porcji.
+    """
+
+    def __init__(self, porcje):
+        self.porcje = porcje
+        self._kursor = 0
+        self._lock = Lock()
+
+    def nastepna(self):
+        """Zwraca kolejną porcję (poczatek, koniec) lub None, gdy praca się skończyła"""
+        with self._lock:
+            if self._kursor >= len(self.porcje):
+                return None
+            porcja = self.porcje[self._kursor]
+            self._kursor += 1
+        return porcja
+
+
+def szukaj_pierwszych_porcjami(
+    harmonogram, barrier, id_watku, bazowe=None, nazwa_metody=None
+):
+    """
+    Funkcja wątku pobierająca porcje z harmonogramu aż do wyczerpania pracy.
+
+    Args:
+        harmonogram: wspólny harmonogram porcji
+        barrier: bariera synchronizacyjna
+        id_watku: identyfikator wątku (do logowania)
+        bazowe: współdzielone liczby pierwsze do sqrt(r) (dla metod sitowych)
+        nazwa_metody: metoda wybrana dla całego zakresu - porcje jej nie zmieniają
+    """
+    komunikat(f"Wątek {id_watku}: rozpoczynam pobieranie porcji")
+
+    # Bufory kolejnych porcji: (początek porcji, array('Q'))
+    lokalne_segmenty = []
+    liczba_porcji = 0
+    czas_obliczen = 0.0
+
+    porcja = harmonogram.nastepna()
+    while porcja is not None:
+        start_obliczen = time.perf_counter()
+        with pomiary.faza(id_watku, "obliczenia"):
+            bufor = jako_bufor(
+                znajdz_pierwsze(porcja[0], porcja[1], bazowe, nazwa_metody)
+            )
+        lokalne_segmenty.append((porcja[0], bufor))
+        czas_obliczen += time.perf_counter() - start_obliczen
+        pomiary.dodaj(id_watku, "kandydaci", porcja[1] - porcja[0] + 1)
+        pomiary.dodaj(id_watku, "pierwsze", len(bufor))
+        liczba_porcji += 1
+        porcja = harmonogram.nastepna()
+
+    # Sekcja krytyczna - dodawanie do wspólnej listy (wzajemne wykluczanie)
+    with pomiary.faza(id_watku, "oczekiwanie_na_lock"):
+        lock.acquire()
+    try:
+        with pomiary.faza(id_watku, "sekcja_krytyczna"):
+            for poczatek, bufor in lokalne_segmenty:
+                pierwsze.dodaj_segment(poczatek, bufor)
+            statystyki[id_watku] = {
+                "porcje": liczba_porcji,
+                "obliczenia": czas_obliczen,
+            }
+            komunikat(
+                f"Wątek {id_watku}: przetworzyłem {liczba_porcji} porcji, "
+                f"znalazłem {sum(len(b) for _, b in lokalne_segmenty)} liczb pierwszych"
+            )
+    finally:
+        lock.release()
+
+    # Sygnalizacja zakończenia obliczeń przez wątek
+    komunikat(f"Wątek {id_watku}: czekam na barierze...")
+    with pomiary.faza(id_watku, "bariera"):
+        barrier.wait()
+    komunikat(f"Wątek {id_watku}: przeszedłem przez barierę!")
+
+
+def wypisz_obciazenie(statystyki, czas_calkowity):
+    """
+    Wypisuje czas pracy i bezczynności każdego wątku/procesu.
+
+    Czas bezczynności to różnica pomiędzy czasem całkowitym a czasem obliczeń
+    (oczekiwanie na barierze, na porcje, na uruchomienie).
+    """
+    if not statystyki:
+        return
+
+    komunikat("\n=== Obciążenie ===")
+    for id_pracownika, dane in statystyki.items():
+        bezczynnosc = max(czas_calkowity - dane["obliczenia"], 0.0)
+        komunikat(
+            f"{id_pracownika}: porcje {dane['porcje']}, "
+            f"praca {dane['obliczenia']:.4f}s, bezczynność {bezczynnosc:.4f}s"
+        )
+
+    czasy = [dane["obliczenia"] for dane in statystyki.values()]
+    srednia = sum(czasy) / len(czasy)
+    if srednia > 0:
+        komunikat(f"Niezrównoważenie (max/średnia): {max(czasy) / srednia:.2f}")
+
+
+# ===== TRYB PROCESÓW =====
+
+# Liczby bazowe sita przekazywane raz do każdego procesu (initializer puli)
+_bazowe_procesu = None
+
+
+def _inicjuj_proces(bazowe):
+    """Inicjalizacja procesu roboczego - zapamiętuje współdzielone liczby bazowe"""
+    global _bazowe_procesu
+    _bazowe_procesu = bazowe
+
+
+def szukaj_w_procesie(poczatek, koniec, nazwa_metody):
+    """
+    Zadanie procesu roboczego: szuka liczb pierwszych w podprzedziale.
+
+    Wynik zwracany jest jako zwarty bufor array('Q') (8 bajtów na liczbę),
+    który jest przesyłany jednym blokiem zamiast listy obiektów int.
+
+    Returns:
+        Krotka (bufor array('Q'), pid procesu, czas obliczeń w sekundach)
+    """
+    start_obliczen = time.perf_counter()
+    wynik = jako_bufor(znajdz_pierwsze(poczatek, koniec, _bazowe_procesu, nazwa_metody))
+    return wynik, os.getpid(), time.perf_counter() - start_obliczen
+
+
+def szukaj_procesami(podprzedzialy, bazowe, liczba_procesow, nazwa_metody):
+    """
+    Uruchamia wyszukiwanie w puli procesów.
+
+    Przy dynamicznym przydziale podprzedziałami są porcje - kolejka zadań
+    puli rozdaje je wolnym procesom.
+
+    Returns:
+        Krotka (lista buforów array('Q') w kolejności rosnącej, czas w sekundach)
+    """
+    with ProcessPoolExecutor(
+        max_workers=liczba_procesow,
+        initializer=_inicjuj_proces,
+        initargs=(bazowe,),
+    ) as pula:
+        start_time = time.time()
+        zadania = [
+            pula.submit(szukaj_w_procesie, poczatek, koniec, nazwa_metody)
+            for poczatek, koniec in podprzedzialy
+        ]
+        # Odpowiednik bariery: czekamy, aż wszystkie procesy zakończą obliczenia
+        wait(zadania)
+        end_time = time.time()
+
+    wyniki = []
+    for (poczatek, _), zadanie in zip(podprzedzialy, zadania):
+        wynik, pid, czas_obliczen = zadanie.result()
+        wyniki.append((poczatek, wynik))
+        dane = statystyki.setdefault(f"Proces {pid}", {"porcje": 0, "obliczenia": 0.0})
+        dane["porcje"] += 1
+        dane["obliczenia"] += czas_obliczen
+
+    # Porcje mogły być rozdawane od końca - przywracamy kolejność rosnącą
+    wyniki.sort(key=lambda para: para[0])
+    return [wynik for _, wynik in wyniki], end_time - start_time
+
+
+# ===== STRUMIEŃ LICZB PIERWSZYCH =====
+
+
+def iter_primes(
+    poczatek, koniec, workers=None, rozmiar_porcji=None, okno=None, tryb_pracy=None
+):
+    """
+    Generator zwracający liczby pierwsze z [poczatek, koniec] w kolejności rosnącej.
+
+    Przedział jest dzielony na porcje liczone równolegle. Wyniki porcji
+    trafiają do kolejki o ograniczonej długości (okno) i są oddawane po kolei:
+    porcja gotowa przed poprzedniczkami czeka w kolejce. Nowa porcja jest
+    zlecana dopiero, gdy konsument odbierze starą, więc zużycie pamięci nie
+    zależy od długości przedziału.
+
+    Args:
+        poczatek: początek przedziału
+        koniec: koniec przedziału (włącznie)
+        workers: liczba wątków/procesów (domyślnie liczba_watkow)
+        rozmiar_porcji: liczba liczb w porcji (domyślnie jeden segment sita)
+        okno: maksymalna liczba porcji w toku (domyślnie 2 * workers)
+        tryb_pracy: "watki" lub "procesy" (domyślnie globalny tryb)
+
+    Yields:
+        Kolejne liczby pierwsze
+    """
+    workers = workers or liczba_watkow
+    rozmiar_porcji = rozmiar_porcji or 30 * BAJTY_SEGMENTU
+    okno = okno or 2 * workers
+    tryb_pracy = tryb_pracy or tryb
+    if okno < 1:
+        raise ValueError("Okno musi obejmować co najmniej jedną porcję")
+
+    # Metoda wybierana raz dla całego przedziału - porcje jej nie zmieniają,
+    # inaczej liczby bazowe mogłyby zostać policzone na próżno
+    nazwa_metody = wybierz_metode(poczatek, koniec)
+    bazowe = None
+    if nazwa_metody in METODY_SITOWE:
+        bazowe = pierwsze_bazowe(isqrt(koniec))
+
+    if tryb_pracy == "procesy":
+        pula = ProcessPoolExecutor(
+            max_workers=workers, initializer=_inicjuj_proces, initargs=(bazowe,)
+        )
+
+        def zlec(pocz, kon):
+            return pula.submit(szukaj_w_procesie, pocz, kon, nazwa_metody)
+
+        def odbierz(zadanie):
+            return zadanie.result()[0]
+
+    else:
+        pula = ThreadPoolExecutor(max_workers=workers)
+
+        def zlec(pocz, kon):
+            return pula.submit(znajdz_pierwsze, pocz, kon, bazowe, nazwa_metody)
+
+        def odbierz(zadanie):
+            return zadanie.result()
+
+    porcje = iter(range(poczatek, koniec + 1, rozmiar_porcji))
+    w_toku = deque()
+    try:
+        while True:
+            # Dopełnienie okna - tylko tyle porcji, ile konsument zdąży odebrać
+            while len(w_toku) < okno:
+                pocz = next(porcje, None)
+                if pocz is None:
+                    break
+                w_toku.append(zlec(pocz, min(pocz + rozmiar_porcji - 1, koniec)))
+
+            if not w_toku:
+                return
+
+            # Najstarsza porcja jest następna w kolejności rosnącej
+            yield from odbierz(w_toku.popleft())
+    finally:
+        # Przerwanie odbioru (np. break u konsumenta) anuluje porcje w toku
+        pula.shutdown(wait=True, cancel_futures=True)
+
+
+# ===== ZLICZANIE BEZ WYZNACZANIA =====
+
+
+def count_primes(poczatek, koniec, workers=None):
+    """
+    Liczba liczb pierwszych w [poczatek, koniec] bez budowania listy wyników.
+
+    Szeroki przedział liczony jest jako pi(koniec) - pi(poczatek - 1)
+    algorytmem Lucy_Hedgehog w czasie O(koniec^(3/4)). Wąskie okno daleko
+    od zera taniej przesiać (lub sprawdzić testem MR) porcjami, sumując
+    jedynie długości ich buforów. Próg to zmierzony koszt pi (KOSZT_PI).
+    """
+    workers = workers or liczba_watkow
+    poczatek = max(poczatek, 0)
+    if koniec < max(poczatek, 2):
+        return 0
+
+    if koniec - poczatek + 1 >= KOSZT_PI * koniec**0.75:
+        return pi(koniec, workers) - pi(poczatek - 1, workers)
+
+    nazwa_metody = wybierz_metode(poczatek, koniec)
+    bazowe = None
+    if nazwa_metody in METODY_SITOWE:
+        bazowe = pierwsze_bazowe(isqrt(koniec))
+    porcje = podziel_na_porcje(poczatek, koniec, 30 * BAJTY_SEGMENTU)
+    with ThreadPoolExecutor(max_workers=workers) as pula:
+        return sum(
+            pula.map(
+                lambda porcja: len(znajdz_pierwsze(*porcja, bazowe, nazwa_metody)),
+                porcje,
+            )
+        )
+
+
+def szukaj_w_indeksie(sciezka):
+    """
+    Odpowiada na zapytanie z trwałego indeksu, dosiewając tylko brakującą końcówkę.
+
+    Returns:
+        Czas dosiewania w sekundach
+    """
+    with IndeksPierwszych(sciezka) as indeks:
+        komunikat(f"Indeks {sciezka} obejmuje liczby do {indeks.granica}")
+        start_time = time.time()
+        if indeks.granica < r:
+            komunikat(f"Dosiewam brakujący zakres [{indeks.granica + 1}, {r}]")
+            indeks.rozszerz(r, workers=liczba_watkow)
+        end_time = time.time()
+
+        pierwsze.dodaj_segment(l, indeks.pierwsze(l, r))
+    return end_time - start_time
 
-    # Obliczenie rozmiaru przedziału na wątek
-    zakres = r - l + 1
-    rozmiar_podprzedzialu = zakres // liczba_watkow
+
+def wyszukaj():
+    """
+    Wyszukuje liczby pierwsze w [l, r] zgodnie z parametrami modułu.
+
+    Wynik trafia do wspólnej listy `pierwsze`.
+
+    Returns:
+        Czas obliczeń w sekundach (od startu do przejścia przez barierę)
+    """
+    if metoda != "auto" and metoda not in METODY:
+        raise ValueError(f"Nieznana metoda: {metoda}")
+
+    if plik_indeksu is not None:
+        return szukaj_w_indeksie(plik_indeksu)
+
+    # Metoda wybierana raz dla całego zakresu (porcje jej nie zmieniają), a
+    # liczby bazowe sita liczone raz i współdzielone przez wszystkie wątki
+    nazwa_metody = wybierz_metode(l, r)
+    if nazwa_metody in METODY_SITOWE:
+        bazowe = pierwsze_bazowe(isqrt(r))
+    else:
+        bazowe = None
+
+    # Podział zakresu na podprzedziały (jeden na wątek/proces) lub na porcje
+    if rozmiar_porcji is None:
+        podprzedzialy = podziel_zakres(l, r, liczba_watkow)
+    else:
+        podprzedzialy = podziel_na_porcje(l, r, rozmiar_porcji, najdrozsze_najpierw)
+
+    if tryb == "procesy":
+        wyniki, czas = szukaj_procesami(
+            podprzedzialy, bazowe, liczba_watkow, nazwa_metody
+        )
+
+        komunikat("=== Wszystkie procesy zakończyły obliczenia! ===")
+        komunikat(f"Czas wykonania: {czas:.4f} sekund")
+
+        # Podprzedziały są rosnące i rozłączne - wystarczy skleić bufory
+        for (poczatek, _), wynik in zip(sorted(podprzedzialy), wyniki):
+            pierwsze.dodaj_segment(poczatek, wynik)
+
+        wypisz_obciazenie(statystyki, czas)
+        return czas
+
+    # Instrumentacja faz wątków (opcjonalna)
+    global pomiary
+    pomiary = Pomiary(wlaczone=plik_pomiarow is not None or plik_sladu is not None)
 
     # Utworzenie bariery - liczba uczestników to liczba wątków + 1 (wątek główny)
     barrier = Barrier(liczba_watkow + 1)
+    # Wyjątki wątków - zgłaszane ponownie w wątku głównym
+    bledy = []
+
+    def watek_roboczy(funkcja, *args):
+        """Przy wyjątku przerywa barierę, aby wątek główny nie czekał bez końca"""
+        try:
+            funkcja(*args)
+        except BrokenBarrierError:
+            pass  # Barierę przerwał błąd innego wątku
+        except BaseException as blad:
+            bledy.append(blad)
+            barrier.abort()
 
     # Lista wątków
     watki = []
 
+    if rozmiar_porcji is not None:
+        harmonogram = Harmonogram(podprzedzialy)
+
     # Tworzenie i uruchamianie wątków
     for i in range(liczba_watkow):
-        # Obliczenie granic podprzedziału dla tego wątku
-        poczatek = l + i * rozmiar_podprzedzialu
-
-        # Ostatni wątek obejmuje pozostałą część (uwzględnia resztę z dzielenia)
-        if i == liczba_watkow - 1:
-            koniec = r
-        else:
-            koniec = poczatek + rozmiar_podprzedzialu - 1
-
         # Utworzenie i uruchomienie wątku
-        watek = threading.Thread(
-            target=szukaj_pierwszych, args=(poczatek, koniec, barrier, i)
-        )
+        if rozmiar_porcji is None:
+            poczatek, koniec = podprzedzialy[i]
+            watek = threading.Thread(
+                target=watek_roboczy,
+                args=(
+                    szukaj_pierwszych,
+                    poczatek,
+                    koniec,
+                    barrier,
+                    i,
+                    bazowe,
+                    nazwa_metody,
+                ),
+            )
+        else:
+            watek = threading.Thread(
+                target=watek_roboczy,
+                args=(
+                    szukaj_pierwszych_porcjami,
+                    harmonogram,
+                    barrier,
+                    i,
+                    bazowe,
+                    nazwa_metody,
+                ),
+            )
         watki.append(watek)
         watek.start()
 
     # Wątek główny czeka na barierze, aby zsynchronizować się z wszystkimi wątkami
-    print("Wątek główny: czekam na wszystkie wątki na barierze...\n")
+    komunikat("Wątek główny: czekam na wszystkie wątki na barierze...\n")
     start_time = time.time()
-    barrier.wait()
+    try:
+        barrier.wait()
+    except BrokenBarrierError:
+        for watek in watki:
+            watek.join()
+        raise bledy[0]
     end_time = time.time()
 
-    print("\n=== Wszystkie wątki zakończyły obliczenia! ===")
-    print(f"Czas wykonania: {end_time - start_time:.4f} sekund")
+    komunikat("\n=== Wszystkie wątki zakończyły obliczenia! ===")
+    komunikat(f"Czas wykonania: {end_time - start_time:.4f} sekund")
+    wypisz_obciazenie(
+        {f"Wątek {i}": statystyki[i] for i in sorted(statystyki)},
+        end_time - start_time,
+    )
 
     # Opcjonalnie: join() aby upewnić się, że wszystkie wątki zakończyły się
     for watek in watki:
         watek.join()
 
-    # Sortowanie wyniku (wątki mogły dodawać liczby w różnej kolejności)
-    pierwsze.sort()
+    if pomiary.wlaczone:
+        wypisz_podsumowanie(pomiary.podsumowanie(), wypisz=komunikat)
+        if plik_pomiarow is not None:
+            pomiary.zapisz_json(plik_pomiarow)
+        if plik_sladu is not None:
+            pomiary.zapisz_slad(plik_sladu)
+
+    # Sklejenie segmentów (wątki mogły je dodawać w różnej kolejności)
+    pierwsze.scal()
+    return end_time - start_time
+
+
+# ===== BENCHMARK =====
+
+
+def zmierz(poczatek, koniec, workers, powtorzenia):
+    """
+    Mierzy czas wyszukiwania w [poczatek, koniec] dla zadanej liczby pracowników.
+
+    Każdy pomiar to pełne wywołanie wyszukaj() (łącznie z tworzeniem wątków
+    lub puli procesów), poprzedzone jednym przebiegiem rozgrzewkowym.
+
+    Returns:
+        Krotka (lista czasów w sekundach, liczba znalezionych liczb pierwszych)
+
+    Raises:
+        ValueError: gdy powtorzenia < 1 (mediana pustej listy czasów)
+    """
+    global l, r, liczba_watkow, pierwsze
+
+    if powtorzenia < 1:
+        raise ValueError("Liczba powtórzeń musi być >= 1")
+
+    l, r, liczba_watkow = poczatek, koniec, workers
+    czasy = []
+    for powtorzenie in range(powtorzenia + 1):
+        pierwsze = ListaPierwszych()
+        statystyki.clear()
+        start = time.perf_counter()
+        wyszukaj()
+        czas = time.perf_counter() - start
+        if powtorzenie > 0:
+            czasy.append(czas)
+    return czasy, len(pierwsze)
+
+
+def bench(liczby_watkow, rozmiary, poczatek, powtorzenia):
+    """
+    Mierzy skalowanie wyszukiwania względem liczby pracowników i rozmiaru zakresu.
+
+    Przyspieszenie i efektywność liczone są względem pierwszej liczby
+    pracowników z listy (zwykle 1).
+
+    Returns:
+        Lista wierszy (słowników) z wynikami pomiarów
+    """
+    wiersze = []
+    for rozmiar in rozmiary:
+        bazowa_mediana = None
+        for workers in liczby_watkow:
+            czasy, liczba = zmierz(
+                poczatek, poczatek + rozmiar - 1, workers, powtorzenia
+            )
+            mediana = statistics.median(czasy)
+            if len(czasy) > 1:
+                kwartyle = statistics.quantiles(czasy, n=4)
+                iqr = kwartyle[2] - kwartyle[0]
+            else:
+                iqr = 0.0
+            if bazowa_mediana is None:
+                bazowa_mediana = mediana
+                bazowi_workers = workers
+            przyspieszenie = bazowa_mediana / mediana
+            wiersze.append(
+                {
+                    "metoda": metoda,
+                    "tryb": tryb,
+                    "poczatek": poczatek,
+                    "rozmiar": rozmiar,
+                    "workers": workers,
+                    "powtorzenia": len(czasy),
+                    "mediana_s": mediana,
+                    "iqr_s": iqr,
+                    "liczba_pierwszych": liczba,
+                    "pierwsze_na_s": liczba / mediana,
+                    "przyspieszenie": przyspieszenie,
+                    "efektywnosc": przyspieszenie * bazowi_workers / workers,
+                }
+            )
+    return wiersze
+
+
+def zapisz_wyniki_bench(wiersze, format_wyjscia, plik):
+    """Zapisuje wyniki benchmarku jako JSON lub CSV"""
+    if format_wyjscia == "json":
+        json.dump(wiersze, plik, indent=2)
+        plik.write("\n")
+    else:
+        pisarz = csv.DictWriter(plik, fieldnames=list(wiersze[0]))
+        pisarz.writeheader()
+        pisarz.writerows(wiersze)
+
+
+# ===== TESTY =====
+
+
+def test_wyszukiwania():
+    """Porównuje metody i tryby z dzieleniem próbnym oraz sprawdza obsługę błędów"""
+    global l, r, liczba_watkow, metoda, tryb, rozmiar_porcji, pierwsze, komunikaty
+
+    print("=" * 60)
+    print("TEST WYSZUKIWANIA LICZB PIERWSZYCH")
+    print("=" * 60)
+    komunikaty = False
+    liczba_watkow = 2
+
+    # Test 1: Metody i tryby dają ten sam wynik co dzielenie próbne
+    print("\n--- Test 1: Zgodność metod ---")
+    l, r = 999_000, 1_001_000
+    oczekiwane = pierwsze_proba(l, r)
+    for metoda, tryb, rozmiar_porcji in [
+        ("auto", "watki", None),
+        ("sito", "watki", 500),
+        ("mr", "procesy", None),
+        *[(nazwa, "watki", None) for nazwa in METODY if nazwa != "proba"],
+    ]:
+        pierwsze = ListaPierwszych()
+        statystyki.clear()
+        wyszukaj()
+        print(
+            f"{metoda:5s} {tryb:7s} porcja={rozmiar_porcji}: "
+            f"(poprawne: {list(pierwsze) == oczekiwane})"
+        )
+    metoda, tryb, rozmiar_porcji = "auto", "watki", None
+
+    # Test 2: Przedziały od 2^64 są odrzucane, także przy zliczaniu
+    print("\n--- Test 2: Przedział od 2^64 ---")
+    for nazwa, wywolanie in [
+        ("watki", wyszukaj),
+        ("count_primes", lambda: count_primes(l, r, liczba_watkow)),
+    ]:
+        l, r = GRANICA_ZAKRESU, GRANICA_ZAKRESU + 100
+        try:
+            wywolanie()
+            poprawne = False
+        except ValueError:
+            poprawne = True
+        print(f"{nazwa}: ValueError (poprawne: {poprawne})")
+    print(f"2^64 - 59 pierwsza (poprawne: {is_prime_many([(1 << 64) - 59]) == [True]})")
+
+    # Test 3: Wyjątek w wątku roboczym nie blokuje bariery
+    print("\n--- Test 3: Błąd wątku roboczego ---")
+
+    def zawodna(poczatek, koniec, bazowe=None):
+        raise RuntimeError("błąd metody")
+
+    METODY["zawodna"] = zawodna
+    l, r, metoda = 2, 1000, "zawodna"
+    try:
+        wyszukaj()
+        poprawne = False
+    except RuntimeError:
+        poprawne = True
+    finally:
+        del METODY["zawodna"]
+        metoda = "auto"
+    print(f"Wyjątek przekazany do wątku głównego (poprawne: {poprawne})")
+
+    print("\n" + "=" * 60)
+
+
+# ===== INTERFEJS WIERSZA POLECEŃ =====
+
+
+def liczba_dodatnia(tekst):
+    """Typ argumentu argparse: liczba całkowita >= 1"""
+    liczba = int(tekst)
+    if liczba < 1:
+        raise argparse.ArgumentTypeError(f"musi być >= 1 (podano {liczba})")
+    return liczba
+
+
+def parsuj_argumenty(argv=None):
+    """Argumenty wiersza poleceń; brak argumentów = parametry z początku modułu"""
+    parser = argparse.ArgumentParser(
+        description="Wielowątkowe wyszukiwanie liczb pierwszych w przedziale"
+    )
+    wspolne = argparse.ArgumentParser(add_help=False)
+    wspolne.add_argument("--metoda", choices=["auto", *METODY], default=metoda)
+    wspolne.add_argument("--tryb", choices=["watki", "procesy"], default=tryb)
+    wspolne.add_argument(
+        "--porcja", type=int, default=rozmiar_porcji, help="rozmiar porcji"
+    )
+    wspolne.add_argument(
+        "--najdrozsze-najpierw", action="store_true", default=najdrozsze_najpierw
+    )
+
+    podkomendy = parser.add_subparsers(dest="komenda")
+
+    szukaj = podkomendy.add_parser(
+        "szukaj", parents=[wspolne], help="wyszukiwanie (domyślnie)"
+    )
+    szukaj.add_argument("-l", "--od", type=int, default=l, help="początek zakresu")
+    szukaj.add_argument("-r", "--do", type=int, default=r, help="koniec zakresu")
+    szukaj.add_argument(
+        "-w",
+        "--watki",
+        type=liczba_dodatnia,
+        default=liczba_watkow,
+        help="liczba pracowników",
+    )
+    szukaj.add_argument("--indeks", default=plik_indeksu, help="plik indeksu")
+    szukaj.add_argument(
+        "--wyjscie",
+        choices=["podsumowanie", "liczba", "lista", "plik"],
+        default="podsumowanie",
+        help="liczba - samo zliczenie (bez wyznaczania liczb pierwszych)",
+    )
+    szukaj.add_argument("--plik", help="plik wynikowy dla --wyjscie plik")
+    szukaj.add_argument(
+        "--pomiary", default=plik_pomiarow, help="plik JSON z pomiarami faz wątków"
+    )
+    szukaj.add_argument(
+        "--slad", default=plik_sladu, help="plik śladu Chrome trace-event"
+    )
+
+    pomiar = podkomendy.add_parser("bench", parents=[wspolne], help="pomiar skalowania")
+    pomiar.add_argument(
+        "-w",
+        "--watki",
+        type=liczba_dodatnia,
+        nargs="+",
+        default=[1, 2, 4],
+        help="liczby pracowników",
+    )
+    pomiar.add_argument(
+        "--rozmiary", type=int, nargs="+", default=[10**6], help="rozmiary zakresów"
+    )
+    pomiar.add_argument("-l", "--od", type=int, default=l, help="początek zakresów")
+    pomiar.add_argument("--powtorzenia", type=liczba_dodatnia, default=5)
+    pomiar.add_argument("--format", choices=["json", "csv"], default="json")
+    pomiar.add_argument("--plik", help="plik wynikowy (domyślnie stdout)")
+
+    podkomendy.add_parser("test", help="testy poprawności")
+
+    # Bez podkomendy działa "szukaj" z parametrami domyślnymi
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("szukaj", "bench", "test", "-h", "--help"):
+        argv = ["szukaj", *argv]
+    args = parser.parse_args(argv)
+    if args.komenda == "szukaj" and args.wyjscie == "plik" and not args.plik:
+        parser.error("--wyjscie plik wymaga --plik")
+    return args
+
+
+def wypisz_wynik(wyjscie, sciezka, czas):
+    """Wypisuje wynik wyszukiwania w wybranym formacie"""
+    if wyjscie == "podsumowanie":
+        print(f"\nZnalezione liczby pierwsze: {pierwsze}")
+        print(f"Liczba znalezionych liczb pierwszych: {len(pierwsze)}")
+    elif wyjscie == "lista":
+        sys.stdout.writelines(f"{p}\n" for p in pierwsze)
+    else:
+        with open(sciezka, "w") as plik:
+            plik.writelines(f"{p}\n" for p in pierwsze)
+        print(f"Zapisano {len(pierwsze)} liczb pierwszych do {sciezka} ({czas:.4f}s)")
+
+
+def main(argv=None):
+    """Główna funkcja programu"""
+    global l, r, liczba_watkow, metoda, tryb, rozmiar_porcji
+    global najdrozsze_najpierw, plik_indeksu, komunikaty, plik_pomiarow, plik_sladu
+
+    args = parsuj_argumenty(argv)
+    if args.komenda == "test":
+        test_wyszukiwania()
+        return
+
+    metoda = args.metoda
+    tryb = args.tryb
+    rozmiar_porcji = args.porcja
+    najdrozsze_najpierw = args.najdrozsze_najpierw
+
+    if args.komenda == "bench":
+        komunikaty = False
+        wiersze = bench(args.watki, args.rozmiary, args.od, args.powtorzenia)
+        if args.plik:
+            with open(args.plik, "w", newline="") as plik:
+                zapisz_wyniki_bench(wiersze, args.format, plik)
+        else:
+            zapisz_wyniki_bench(wiersze, args.format, sys.stdout)
+        return
+
+    l, r, liczba_watkow = args.od, args.do, args.watki
+    plik_indeksu = args.indeks
+    plik_pomiarow = args.pomiary
+    plik_sladu = args.slad
+    if liczba_watkow < 1:
+        raise ValueError("Liczba wątków musi być >= 1")
+    # Komunikaty o postępie tylko w trybie czytelnym dla człowieka
+    komunikaty = args.wyjscie == "podsumowanie"
+
+    if args.wyjscie == "liczba":
+        if plik_indeksu is not None:
+            with IndeksPierwszych(plik_indeksu) as indeks:
+                indeks.rozszerz(r, workers=liczba_watkow)
+                print(indeks.policz(l, r))
+        else:
+            print(count_primes(l, r, liczba_watkow))
+        return
+
+    komunikat(f"=== Wyszukiwanie liczb pierwszych w zakresie [{l}, {r}] ===")
+    if plik_indeksu is None:
+        komunikat(f"Liczba wątków: {liczba_watkow}")
+        komunikat(f"Metoda: {metoda} ({wybierz_metode(l, r)})")
+        komunikat(f"Tryb: {tryb}")
+        if rozmiar_porcji is None:
+            komunikat("Przydział pracy: statyczny\n")
+        else:
+            komunikat(f"Przydział pracy: porcje po {rozmiar_porcji}\n")
+
+    try:
+        czas = wyszukaj()
+        if plik_indeksu is not None:
+            komunikat(f"Czas wykonania: {czas:.4f} sekund")
+    finally:
+        # Zbuforowane komunikaty wypisywane są dopiero po obliczeniach
+        dziennik.oproznij()
 
-    print(f"\nZnalezione liczby pierwsze: {pierwsze}")
-    print(f"Liczba znalezionych liczb pierwszych: {len(pierwsze)}")
+    wypisz_wynik(args.wyjscie, args.plik, czas)
 
 
 if __name__ == "__main__":
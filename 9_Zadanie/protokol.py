@@ -0,0 +1,47 @@
+import json
+
+# Typy zapytań
+ZAPYTANIE_COUNT = "count"
+ZAPYTANIE_LIST = "list"
+ZAPYTANIE_IS_PRIME = "is_prime"
+
+ZAPYTANIA = [ZAPYTANIE_COUNT, ZAPYTANIE_LIST, ZAPYTANIE_IS_PRIME]
+
+# Statusy odpowiedzi
+STATUS_OK = "ok"
+STATUS_BLAD = "blad"
+
+# Domyślna ścieżka gniazda UNIX usługi
+GNIAZDO = "/tmp/pierwsze.sock"
+
+# Każda wiadomość to jeden wiersz JSON zakończony znakiem nowej linii
+
+
+def koduj_zapytanie(typ, **argumenty):
+    return (json.dumps({"typ": typ, **argumenty}) + "\n").encode("utf-8")
+
+
+def dekoduj_zapytanie(dane):
+    zapytanie = json.loads(dane.decode("utf-8"))
+    if not isinstance(zapytanie, dict):
+        raise ValueError("Zapytanie musi być obiektem JSON")
+    if zapytanie.get("typ") not in ZAPYTANIA:
+        raise ValueError(f"Nieznany typ zapytania: {zapytanie.get('typ')}")
+    if zapytanie["typ"] == ZAPYTANIE_IS_PRIME and not isinstance(
+        zapytanie.get("liczby"), list
+    ):
+        raise ValueError("Zapytanie is_prime wymaga listy liczb całkowitych")
+    return zapytanie
+
+
+def koduj_odpowiedz(wynik):
+    return (json.dumps({"status": STATUS_OK, "wynik": wynik}) + "\n").encode("utf-8")
+
+
+def koduj_blad(komunikat):
+    odpowiedz = {"status": STATUS_BLAD, "komunikat": komunikat}
+    return (json.dumps(odpowiedz) + "\n").encode("utf-8")
+
+
+def dekoduj_odpowiedz(dane):
+    return json.loads(dane.decode("utf-8"))
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Lokalna usługa zapytań o liczby pierwsze na gnieździe UNIX.
+
+Zapytania count / list dzielone są na segmenty o stałych granicach.
+Segmenty liczone są we wspólnej puli procesów i trzymane w pamięci
+podręcznej LRU z limitem pamięci; równoczesne zapytania o ten sam segment
+czekają na jedno obliczenie.
+"""
+
+import argparse
+import os
+import signal
+import socketserver
+import sys
+import traceback
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import RLock
+
+from pierwsze_wielowatkowe import (
+    GRANICA_ZAKRESU,
+    count_primes,
+    is_prime_many,
+    szukaj_w_procesie,
+    wybierz_metode,
+)
+from protokol import (
+    GNIAZDO,
+    ZAPYTANIE_COUNT,
+    ZAPYTANIE_LIST,
+    dekoduj_zapytanie,
+    koduj_blad,
+    koduj_odpowiedz,
+)
+from sito import BAJTY_SEGMENTU
+
+# Segment pamięci podręcznej - jeden segment sita
+LICZBY_SEGMENTU = 30 * BAJTY_SEGMENTU
+# Domyślny limit pamięci podręcznej (MB)
+PAMIEC_MB = 256
+# Zapytania count o więcej segmentów liczone są przez count_primes jako jedno
+# zadanie puli, bez pamięci podręcznej; zapytania list o więcej segmentów są
+# odrzucane
+MAKS_SEGMENTOW = 64
+
+
+def licz_segment(indeks):
+    """Zadanie puli: bufor array('Q') liczb pierwszych segmentu o danym indeksie"""
+    poczatek = indeks * LICZBY_SEGMENTU
+    # Ostatni segment przycięty do 2^64 - 1 (granica wyszukiwania)
+    koniec = min(poczatek + LICZBY_SEGMENTU - 1, GRANICA_ZAKRESU - 1)
+    return szukaj_w_procesie(poczatek, koniec, wybierz_metode(poczatek, koniec))[0]
+
+
+def _ignoruj_sigint():
+    """Ctrl+C obsługuje tylko proces serwera, który sam zamyka pulę"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class PamiecSegmentow:
+    """
+    Pamięć podręczna LRU buforów segmentów z limitem bajtów.
+
+    Segment liczony w danej chwili ma jedno zadanie w puli - kolejne
+    zapytania o niego dostają to samo zadanie (łączenie zapytań).
+    """
+
+    def __init__(self, pula, budzet_bajtow):
+        self.pula = pula
+        self.budzet_bajtow = budzet_bajtow
+        self.rozmiar_bajtow = 0
+        self._segmenty = OrderedDict()
+        self._w_toku = {}
+        # RLock: wywołanie zwrotne zakończonego zadania może przyjść w tym samym wątku
+        self._lock = RLock()
+        self.trafienia = 0
+        self.chybienia = 0
+        self.polaczone = 0
+
+    def zamow(self, indeks):
+        """Zwraca Future z buforem segmentu (gotowe, jeśli segment jest w pamięci)"""
+        with self._lock:
+            bufor = self._segmenty.get(indeks)
+            if bufor is not None:
+                self._segmenty.move_to_end(indeks)
+                self.trafienia += 1
+                gotowe = Future()
+                gotowe.set_result(bufor)
+                return gotowe
+
+            zadanie = self._w_toku.get(indeks)
+            if zadanie is not None:
+                self.polaczone += 1
+                return zadanie
+
+            self.chybienia += 1
+            zadanie = self.pula.submit(licz_segment, indeks)
+            self._w_toku[indeks] = zadanie
+            zadanie.add_done_callback(lambda z: self._zakonczone(indeks, z))
+            return zadanie
+
+    def _zakonczone(self, indeks, zadanie):
+        """Przenosi policzony segment do pamięci, usuwając najdawniej używane"""
+        with self._lock:
+            self._w_toku.pop(indeks, None)
+            if zadanie.cancelled() or zadanie.exception() is not None:
+                return
+
+            bufor = zadanie.result()
+            self._segmenty[indeks] = bufor
+            self.rozmiar_bajtow += bufor.itemsize * len(bufor)
+            while self.rozmiar_bajtow > self.budzet_bajtow and len(self._segmenty) > 1:
+                _, usuniety = self._segmenty.popitem(last=False)
+                self.rozmiar_bajtow -= usuniety.itemsize * len(usuniety)
+
+    def statystyki(self):
+        with self._lock:
+            return {
+                "segmenty": len(self._segmenty),
+                "bajty": self.rozmiar_bajtow,
+                "trafienia": self.trafienia,
+                "chybienia": self.chybienia,
+                "polaczone": self.polaczone,
+            }
+
+
+class UslugaPierwszych:
+    """Wykonuje zapytania korzystając ze wspólnej puli i pamięci segmentów"""
+
+    def __init__(self, workers, pamiec_mb=PAMIEC_MB):
+        self.workers = workers
+        self.pula = ProcessPoolExecutor(
+            max_workers=workers, initializer=_ignoruj_sigint
+        )
+        self.pamiec = PamiecSegmentow(self.pula, pamiec_mb * 1024 * 1024)
+        # Zliczania dużych zakresów w toku: (poczatek, koniec) -> Future;
+        # RLock z tego samego powodu co w PamiecSegmentow
+        self._zliczenia = {}
+        self._lock = RLock()
+
+    def zamknij(self):
+        self.pula.shutdown(cancel_futures=True)
+
+    def _segmenty(self, poczatek, koniec):
+        """Przycięte bufory segmentów pokrywających [poczatek, koniec]"""
+        # Najpierw zamawiamy wszystkie segmenty, aby liczyły się równolegle
+        zadania = [
+            self.pamiec.zamow(indeks)
+            for indeks in range(
+                poczatek // LICZBY_SEGMENTU, koniec // LICZBY_SEGMENTU + 1
+            )
+        ]
+        for zadanie in zadania:
+            bufor = zadanie.result()
+            yield bufor[bisect_left(bufor, poczatek) : bisect_right(bufor, koniec)]
+
+    def _policz_duzy(self, poczatek, koniec):
+        """
+        count_primes jako zadanie wspólnej puli (jeden proces, bez wątków);
+        równoczesne zapytania o ten sam zakres czekają na jedno zadanie.
+        """
+        klucz = (poczatek, koniec)
+        with self._lock:
+            zadanie = self._zliczenia.get(klucz)
+            if zadanie is None:
+                zadanie = self.pula.submit(count_primes, poczatek, koniec, 1)
+                self._zliczenia[klucz] = zadanie
+                zadanie.add_done_callback(lambda _: self._zakonczone(klucz))
+        return zadanie.result()
+
+    def _zakonczone(self, klucz):
+        with self._lock:
+            self._zliczenia.pop(klucz, None)
+
+    def policz(self, poczatek, koniec):
+        poczatek, koniec = sprawdz_zakres(poczatek, koniec)
+        if koniec // LICZBY_SEGMENTU - poczatek // LICZBY_SEGMENTU >= MAKS_SEGMENTOW:
+            return self._policz_duzy(poczatek, koniec)
+        return sum(len(bufor) for bufor in self._segmenty(poczatek, koniec))
+
+    def lista(self, poczatek, koniec):
+        poczatek, koniec = sprawdz_zakres(poczatek, koniec)
+        if koniec // LICZBY_SEGMENTU - poczatek // LICZBY_SEGMENTU >= MAKS_SEGMENTOW:
+            raise ValueError(
+                f"Zakres list może obejmować najwyżej {MAKS_SEGMENTOW} segmentów "
+                f"po {LICZBY_SEGMENTU} liczb"
+            )
+        wynik = []
+        for bufor in self._segmenty(poczatek, koniec):
+            wynik.extend(bufor)
+        return wynik
+
+    def czy_pierwsze(self, liczby):
+        if not isinstance(liczby, list) or not all(isinstance(k, int) for k in liczby):
+            raise ValueError("Zapytanie is_prime wymaga listy liczb całkowitych")
+        return is_prime_many(liczby)
+
+    def wykonaj(self, zapytanie):
+        """Wykonuje zdekodowane zapytanie i zwraca wynik do wysłania"""
+        typ = zapytanie["typ"]
+        if typ == ZAPYTANIE_COUNT:
+            return self.policz(zapytanie["od"], zapytanie["do"])
+        if typ == ZAPYTANIE_LIST:
+            return self.lista(zapytanie["od"], zapytanie["do"])
+        return self.czy_pierwsze(zapytanie["liczby"])
+
+
+def sprawdz_zakres(poczatek, koniec):
+    """Sprawdza granice zapytania; zakres pusty dla koniec < poczatek"""
+    if not isinstance(poczatek, int) or not isinstance(koniec, int):
+        raise ValueError("Granice zakresu muszą być liczbami całkowitymi")
+    if poczatek < 0:
+        raise ValueError("Początek zakresu musi być >= 0")
+    if koniec >= GRANICA_ZAKRESU:
+        raise ValueError(f"Koniec zakresu musi być mniejszy od 2^64 (podano {koniec})")
+    return poczatek, koniec
+
+
+class ObslugaKlienta(socketserver.StreamRequestHandler):
+    """Obsługa połączenia: kolejne wiersze JSON to kolejne zapytania"""
+
+    def handle(self):
+        for linia in self.rfile:
+            try:
+                zapytanie = dekoduj_zapytanie(linia)
+                odpowiedz = koduj_odpowiedz(self.server.usluga.wykonaj(zapytanie))
+            except (ValueError, KeyError) as blad:
+                odpowiedz = koduj_blad(str(blad))
+            except Exception as blad:
+                # Błąd obliczeń (np. MemoryError, brak NumPy) - klient dostaje
+                # odpowiedź z błędem, a ślad trafia do dziennika serwera
+                traceback.print_exc()
+                odpowiedz = koduj_blad(f"{type(blad).__name__}: {blad}")
+            self.wfile.write(odpowiedz)
+
+
+class SerwerPierwszych(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, sciezka, usluga):
+        if os.path.exists(sciezka):
+            os.remove(sciezka)
+        super().__init__(sciezka, ObslugaKlienta)
+        self.usluga = usluga
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Usługa zapytań o liczby pierwsze")
+    parser.add_argument("--gniazdo", default=GNIAZDO, help="ścieżka gniazda UNIX")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count(), help="liczba procesów"
+    )
+    parser.add_argument(
+        "--pamiec", type=int, default=PAMIEC_MB, help="limit pamięci segmentów (MB)"
+    )
+    args = parser.parse_args()
+
+    usluga = UslugaPierwszych(args.workers, args.pamiec)
+    serwer = SerwerPierwszych(args.gniazdo, usluga)
+    print(f"Usługa nasłuchuje na {args.gniazdo}")
+    print(f"Procesy: {args.workers}, pamięć segmentów: {args.pamiec} MB")
+    print("-" * 60)
+
+    # SIGTERM (np. od menedżera usług) zamyka serwer tak samo jak Ctrl+C
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        serwer.serve_forever()
+    except KeyboardInterrupt:
+        print("\nZatrzymywanie usługi...")
+    finally:
+        print(f"Pamięć segmentów: {usluga.pamiec.statystyki()}")
+        serwer.server_close()
+        usluga.zamknij()
+        os.remove(args.gniazdo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Segmentowane sito Eratostenesa z kołem mod 30.
+
+Przedział dzielony jest na segmenty mieszczące się w pamięci podręcznej L2.
+Wynik sita dla segmentu to upakowana bitowo bytearray: bajt j opisuje liczby
+[baza + 30*j, baza + 30*j + 30), a bit b odpowiada liczbie baza + 30*j + KOLO[b]
+(tylko reszty względnie pierwsze z 30 mogą być pierwsze, poza 2, 3 i 5).
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, compress, cycle, islice
+from math import isqrt
+
+# Reszty modulo 30 względnie pierwsze z 30 (kolejne bity w bajcie)
+KOLO = (1, 7, 11, 13, 17, 19, 23, 29)
+# Odstępy pomiędzy kolejnymi kandydatami koła (zaczynając od reszty 1)
+ODSTEPY = (6, 4, 2, 4, 2, 4, 6, 2)
+# Liczby pierwsze pominięte przez koło
+MALE_PIERWSZE = (2, 3, 5)
+
+# Budżet pamięci roboczej segmentu (8 płaszczyzn po jednym bajcie na kandydata)
+ROZMIAR_L2 = 256 * 1024
+BAJTY_SEGMENTU = ROZMIAR_L2 // len(KOLO)
+
+
+def pierwsze_bazowe(granica):
+    """
+    Zwraca listę liczb pierwszych <= granica (zwykłe sito, tylko liczby nieparzyste).
+
+    Wynik jest liczony raz i współdzielony przez wszystkie wątki jako
+    liczby bazowe do wykreślania w segmentach.
+    """
+    if granica < 2:
+        return []
+
+    # Indeks i odpowiada liczbie 2*i + 1
+    sito = bytearray(b"\x01") * (granica // 2 + 1)
+    sito[0] = 0
+    for i in range(1, (isqrt(granica) - 1) // 2 + 1):
+        if sito[i]:
+            p = 2 * i + 1
+            start = p * p // 2
+            sito[start::p] = bytes(len(range(start, len(sito), p)))
+
+    nieparzyste = [2 * i + 1 for i in compress(range(len(sito)), sito)]
+    if nieparzyste and nieparzyste[-1] > granica:
+        nieparzyste.pop()
+    return [2] + nieparzyste
+
+
+def sito_bitmapa(baza, liczba_bajtow, bazowe):
+    """
+    Przesiewa liczby z przedziału [baza, baza + 30 * liczba_bajtow).
+
+    Args:
+        baza: początek segmentu (wielokrotność 30)
+        liczba_bajtow: długość segmentu w bajtach bitmapy (30 liczb na bajt)
+        bazowe: rosnąca lista liczb pierwszych co najmniej do sqrt(końca segmentu)
+
+    Returns:
+        Upakowana bitowo bytearray (bit ustawiony = liczba pierwsza)
+    """
+    if baza % 30:
+        raise ValueError("Początek segmentu musi być wielokrotnością 30")
+
+    koniec = baza + 30 * liczba_bajtow
+    plaszczyzny = [bytearray(b"\x01") * liczba_bajtow for _ in KOLO]
+    zera = memoryview(bytes(liczba_bajtow))
+
+    for p in bazowe:
+        if p < 7:
+            continue
+        kwadrat = p * p
+        if kwadrat >= koniec:
+            break
+        odwrotnosc = pow(30, -1, p)
+        krok = 30 * p
+
+        for plaszczyzna, reszta in zip(plaszczyzny, KOLO):
+            pierwszy = baza + reszta
+            # Najmniejsze j, dla którego baza + 30*j + reszta dzieli się przez p
+            j = (-pierwszy * odwrotnosc) % p
+            # Wykreślanie zaczynamy od p*p, aby nie usunąć samej liczby p
+            liczba = pierwszy + 30 * j
+            if liczba < kwadrat:
+                j += (kwadrat - liczba + krok - 1) // krok * p
+            if j < liczba_bajtow:
+                plaszczyzna[j::p] = zera[: (liczba_bajtow - 1 - j) // p + 1]
+
+    # 1 nie jest liczbą pierwszą
+    if baza == 0:
+        plaszczyzny[0][0] = 0
+
+    # Upakowanie: bit b każdego bajtu pochodzi z płaszczyzny b
+    bity = 0
+    for b, plaszczyzna in enumerate(plaszczyzny):
+        bity |= int.from_bytes(plaszczyzna, "little") << b
+    return bytearray(bity.to_bytes(liczba_bajtow, "little"))
+
+
+def liczby_z_bitmapy(bitmapa, baza):
+    """Zwraca rosnący bufor array('Q') liczb pierwszych zapisanych w bitmapie."""
+    liczba_bajtow = len(bitmapa)
+    if liczba_bajtow == 0:
+        return array("Q")
+
+    bity = int.from_bytes(bitmapa, "little")
+    jedynki = int.from_bytes(b"\x01" * liczba_bajtow, "little")
+
+    # Rozpakowanie do jednego bajtu na kandydata, w kolejności rosnącej
+    przeplot = bytearray(len(KOLO) * liczba_bajtow)
+    for b in range(len(KOLO)):
+        przeplot[b :: len(KOLO)] = ((bity >> b) & jedynki).to_bytes(
+            liczba_bajtow, "little"
+        )
+
+    kandydaci = accumulate(
+        islice(cycle(ODSTEPY), len(przeplot) - 1), initial=baza + KOLO[0]
+    )
+    return array("Q", compress(kandydaci, przeplot))
+
+
+def sito_segmentowe(poczatek, koniec, bazowe=None, bajty_segmentu=BAJTY_SEGMENTU):
+    """
+    Znajduje liczby pierwsze w przedziale [poczatek, koniec] (włącznie).
+
+    Args:
+        poczatek: początek przedziału
+        koniec: koniec przedziału (włącznie)
+        bazowe: liczby pierwsze do sqrt(koniec); liczone lokalnie, gdy brak
+        bajty_segmentu: rozmiar segmentu w bajtach bitmapy
+
+    Returns:
+        Rosnący bufor array('Q') liczb pierwszych
+    """
+    if koniec < 2 or koniec < poczatek:
+        return array("Q")
+    if bazowe is None:
+        bazowe = pierwsze_bazowe(isqrt(koniec))
+
+    wynik = array("Q", [p for p in MALE_PIERWSZE if poczatek <= p <= koniec])
+
+    baza = poczatek - poczatek % 30
+    while baza <= koniec:
+        liczba_bajtow = min(bajty_segmentu, (koniec - baza) // 30 + 1)
+        bitmapa = sito_bitmapa(baza, liczba_bajtow, bazowe)
+        # Kandydaci ostatniego bajtu powyżej `koniec` - tuż pod 2^64 nie
+        # zmieściliby się w array('Q')
+        ostatni = baza + 30 * (liczba_bajtow - 1)
+        bitmapa[-1] &= sum(
+            1 << b for b, reszta in enumerate(KOLO) if ostatni + reszta <= koniec
+        )
+        segment = liczby_z_bitmapy(bitmapa, baza)
+
+        # Przycięcie segmentów brzegowych do [poczatek, koniec]
+        od = bisect_left(segment, poczatek) if baza < poczatek else 0
+        do = bisect_right(segment, koniec)
+        wynik.extend(segment[od:do])
+
+        baza += 30 * liczba_bajtow
+
+    return wynik
+
+
+try:
+    import numpy as np
+except (
+    ImportError
+):  # NumPy jest opcjonalny - bez niego działają metody czysto pythonowe
+    np = None
+
+NUMPY_DOSTEPNY = np is not None
+
+# Segment wersji NumPy: jeden bajt na liczbę nieparzystą, rozmiar ~ L2
+LICZBY_SEGMENTU_NUMPY = 2 * ROZMIAR_L2
+
+
+def sito_segmentowe_numpy(
+    poczatek, koniec, bazowe=None, liczby_segmentu=LICZBY_SEGMENTU_NUMPY
+):
+    """
+    Segmentowe sito na tablicach NumPy (tylko liczby nieparzyste).
+
+    Liczby bazowe mniejsze od segmentu wykreślane są przypisaniem do wycinka
+    z krokiem - pętla w Pythonie biegnie po liczbach bazowych, a po ich
+    wielokrotnościach już w NumPy. Większe liczby bazowe trafiają w segment
+    najwyżej raz, więc ich wielokrotności wykreślane są jednym przypisaniem
+    z indeksami, a liczby pierwsze odczytuje np.flatnonzero. Koszt
+    interpretera na segment rośnie więc z liczbą małych liczb bazowych,
+    a nie ze wszystkimi.
+
+    Wielokrotności liczone są jako przesunięcia względem początku segmentu
+    w uint64 (bez iloczynów rzędu `koniec`), więc sito działa do 2^64.
+
+    Returns:
+        Rosnący bufor array('Q') liczb pierwszych
+
+    Raises:
+        ValueError: gdy koniec >= 2^64 (wynik nie mieści się w array('Q'))
+    """
+    if np is None:
+        raise RuntimeError("Metoda wymaga pakietu NumPy")
+    if koniec >= 1 << 64:
+        raise ValueError(f"Sito obsługuje liczby mniejsze od 2^64 (podano {koniec})")
+    if koniec < 2 or koniec < poczatek:
+        return array("Q")
+    if bazowe is None:
+        bazowe = pierwsze_bazowe(isqrt(koniec))
+
+    wynik = array("Q", [2] if poczatek <= 2 <= koniec else [])
+    nieparzyste_bazowe = np.array(bazowe[1:], dtype=np.uint64)
+    # p < 2^32, więc kwadraty mieszczą się w uint64
+    kwadraty = nieparzyste_bazowe * nieparzyste_bazowe
+
+    # Pierwsza liczba nieparzysta >= max(poczatek, 3)
+    dol = max(poczatek, 3) | 1
+    while dol <= koniec:
+        gora = min(dol + liczby_segmentu - 2, koniec)
+        segment = np.ones((gora - dol) // 2 + 1, dtype=np.uint8)
+
+        # Przesunięcie (od dol) pierwszej nieparzystej wielokrotności każdej
+        # liczby bazowej, nie mniejszej niż p*p
+        ile = int(np.searchsorted(kwadraty, gora, side="right"))
+        p, kw = nieparzyste_bazowe[:ile], kwadraty[:ile]
+        d = np.uint64(dol)
+        przesuniecia = np.where(kw > d, kw - d, (p - d % p) % p)
+        # dol jest nieparzyste - nieparzysta wielokrotność ma parzyste przesunięcie
+        przesuniecia += (przesuniecia & 1) * p
+        indeksy = przesuniecia // 2
+        male = p < len(segment)
+        for indeks, krok in zip(indeksy[male].tolist(), p[male].tolist()):
+            segment[indeks::krok] = 0
+        duze = indeksy[~male]
+        segment[duze[duze < len(segment)]] = 0
+
+        liczby = np.flatnonzero(segment).astype(np.uint64) * 2 + d
+        wynik.frombytes(liczby.tobytes())
+        dol = gora + 2
+
+    return wynik
+
+
+def test_sita():
+    """Porównuje sito_segmentowe_numpy z sito_segmentowe"""
+    print("=" * 60)
+    print("TEST SITA NUMPY")
+    print("=" * 60)
+    if np is None:
+        print("NumPy niedostępny - pominięto")
+        return
+
+    przedzialy = [
+        (0, 1),
+        (0, 2),
+        (0, 100),
+        (3, 3),
+        (90, 97),
+        (1, 100_000),
+        (10**9, 10**9 + 200_000),
+        (10**12, 10**12 + 50_000),
+    ]
+    for poczatek, koniec in przedzialy:
+        oczekiwane = sito_segmentowe(poczatek, koniec).tolist()
+        # Mały segment - liczby bazowe większe od segmentu też są sprawdzane
+        for liczby_segmentu in (LICZBY_SEGMENTU_NUMPY, 1000):
+            wynik = sito_segmentowe_numpy(
+                poczatek, koniec, liczby_segmentu=liczby_segmentu
+            ).tolist()
+            print(
+                f"[{poczatek}, {koniec}] segment {liczby_segmentu}: "
+                f"{len(wynik)} liczb (poprawne: {wynik == oczekiwane})"
+            )
+
+    # Przy 2^63 i 2^64 pełne liczby bazowe (do 2^32) liczyłyby się zbyt długo -
+    # z bazowymi do 10^5 oba sita zwracają liczby bez dzielników <= 10^5,
+    # co sprawdza przesunięcia wielokrotności bez przepełnienia int64
+    bazowe = pierwsze_bazowe(10**5)
+    for poczatek, koniec in [
+        (2**63 - 10_000, 2**63 + 10_000),
+        (2**64 - 20_000, 2**64 - 1),
+    ]:
+        oczekiwane = sito_segmentowe(poczatek, koniec, bazowe).tolist()
+        wynik = sito_segmentowe_numpy(poczatek, koniec, bazowe, 1000).tolist()
+        print(
+            f"[{poczatek}, {koniec}] bazowe do 10^5: "
+            f"{len(wynik)} liczb (poprawne: {wynik == oczekiwane})"
+        )
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_sita()